@@ -5,11 +5,18 @@ import os
 import sys
 import json
 import re
+import struct
 import platform
 import subprocess
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
 from pathlib import Path
-from collections import defaultdict
-import ast
+from collections import defaultdict, OrderedDict, deque
+import codecs
+import hashlib
 import datetime
 import logging
 import tempfile
@@ -23,8 +30,9 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QHBoxLayout
                              QListWidgetItem, QColorDialog, QDialog, QDialogButtonBox,
                              QFormLayout, QComboBox, QTableWidget, QTableWidgetItem,
                              QHeaderView, QAbstractItemView, QMenu, QAction, QTabWidget,
-                             QSplitter, QTextBrowser, QScrollArea, QCheckBox, QInputDialog, QProgressBar)
-from PyQt5.QtCore import QThread, pyqtSignal, Qt, QSettings, QTimer, QPropertyAnimation, QObject
+                             QSplitter, QTextBrowser, QScrollArea, QCheckBox, QInputDialog, QProgressBar,
+                             QTableView)
+from PyQt5.QtCore import QThread, pyqtSignal, Qt, QSettings, QTimer, QPropertyAnimation, QObject, QRunnable, QThreadPool, QAbstractTableModel, QModelIndex, pyqtSlot
 from PyQt5.QtGui import QTextCursor, QColor, QTextCharFormat, QFont, QBrush, QPainter, QColor, QPen, QIntValidator
 from PyQt5.QtWidgets import QTreeWidget, QTreeWidgetItem, QPlainTextEdit
 
@@ -48,12 +56,34 @@ DEFAULT_COLUMN_WIDTHS = {  # Ширины столбцов по умолчани
     'metadata': [300, 500]  # Поле, Значение
 }
 
+# Максимальное число файлов в кэше результатов OpenEXR/FFprobe/MediaInfo
+METADATA_CACHE_SIZE = 256
+
+# Предварительное чтение заголовков EXR после поиска: сколько последовательностей и в сколько потоков
+METADATA_PREFETCH_COUNT = 64
+METADATA_PREFETCH_WORKERS = 4
+
 METADATA_TOOLS = {
     'mediainfo': 'MediaInfo',
     'ffprobe': 'FFprobe',
     'exiftool': 'ExifTool'
 }
 
+# Разделы, запрашиваемые у FFprobe (добавьте 'chapters' и 'programs', если они нужны)
+FFPROBE_SECTIONS = ['format', 'streams']
+
+# Чтение метаданных MP4/MOV встроенным парсером атомов вместо запуска FFprobe.
+# Парсер пишет поля под ключами FFprobe (длительность, размер кадра, кодек, теги формата и потоков),
+# но без параметров, требующих разбора потока (битрейт потока, fps, цвет, профиль кодека)
+MP4_NATIVE_PARSER = True
+MP4_NATIVE_EXTENSIONS = {'.mp4', '.m4v', '.mov', '.m4a'}
+
+# Число потоков, параллельно читающих содержимое папок при поиске последовательностей
+SCAN_WORKERS = 8
+
+# Задержка отложенного сохранения настроек (мс): серия правок подряд записывается в файл один раз
+SETTINGS_SAVE_DELAY_MS = 150
+
 # ===================================================
 
 # Попытка импорта exifread для чтения метаданных изображений
@@ -95,6 +125,145 @@ except ImportError:
     print("Библиотека PyExifTool не установлена. Метаданные через ExifTool не будут доступны.")
     print("Установите ее: pip install pyexiftool")
 
+# Попытка импорта orjson для быстрого разбора JSON (при отсутствии используется ujson или стандартный json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ujson
+    UJSON_AVAILABLE = True
+except ImportError:
+    UJSON_AVAILABLE = False
+
+
+def json_loads(data):
+    """Разбирает JSON из bytes или str, используя orjson или ujson при наличии"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if UJSON_AVAILABLE:
+        return ujson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps_pretty(obj):
+    """Сериализует объект в UTF-8 JSON с отступом 2, используя orjson или ujson при наличии"""
+    if ORJSON_AVAILABLE:
+        # OPT_NON_STR_KEYS повторяет поведение json: нестроковые ключи записываются как строки
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    if UJSON_AVAILABLE:
+        return ujson.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def unwrap_bytes_repr(text):
+    """Превращает строку вида b'...' в текст без разбора через ast.literal_eval"""
+    inner = text[2:-1]
+    if '\\' not in inner:
+        return inner
+    try:
+        # Escape-последовательности (\xNN, \n, ...) раскрываются в байты, как в байтовом литерале
+        return codecs.escape_decode(inner.encode('latin-1'))[0].decode('utf-8', errors='ignore')
+    except (UnicodeEncodeError, ValueError):
+        return inner
+
+
+# Разбор строкового представления TimeCode за один проход: time и флаги кадра
+_RE_TIMECODE_FIELDS = re.compile(r'(time):\s*([^,]+)|(dropFrame|colorFrame|fieldPhase):\s*(\d+)')
+
+# Поиск групп цифр (кандидаты в номер кадра, первое число в строке разрешения)
+_RE_DIGIT_RUNS = re.compile(r'\d+')
+# Префиксы номера кадра ('.r', '.c', '.v', '.f', '_r', '_c', '_v', '_f') одним шаблоном
+_RE_FRAME_PREFIXES = re.compile(r'[._][rcvf]')
+# Сильные индикаторы номера кадра в трех символах перед числом
+_FRAME_CONTEXT_INDICATORS = ('.', '_r', '_c', '_v', '_f', '.r', '.c', '.v', '.f', '_', '-')
+# Начала 8-значных чисел, похожих на дату
+_DATE_PREFIXES_2 = frozenset(('20', '19', '21', '22'))
+_DATE_PREFIXES_4 = frozenset(('2023', '2024', '2025', '2026'))
+
+# Разбор строковых Box/разрешений в правилах определения разрешения
+_RE_BOX_RANGE = re.compile(r'\((\d+),\s*(\d+)\)\s*-\s*\((\d+),\s*(\d+)\)')
+_RE_BOX_FOUR_NUMBERS = re.compile(r'(\d+)\s+(\d+)\s+(\d+)\s+(\d+)')
+_RE_BOX_DATA_WINDOW = re.compile(r'^(?:\w+\s*:\s*)?(\d+)\s+(\d+)\s+(\d+)\s+(\d+)$')
+_RE_COMBINED_RESOLUTION = re.compile(r'\(?\s*(\d+)\s*[xX×:]\s*(\d+)\s*\)?')
+_RE_WIDTH_FIELD = re.compile(r'[Ww]idth:\s*(\d+)')
+_RE_HEIGHT_FIELD = re.compile(r'[Hh]eight:\s*(\d+)')
+
+# Поиск даты съемки в значениях метаданных: ISO-дата (с временем) и группы из 6 цифр (YYMMDD, HHMMSS)
+_RE_ISO_DATETIME = re.compile(r'(\d{4}-\d{2}-\d{2})(?:\s+(\d{2}:\d{2}:\d{2}))?')
+_RE_SIX_DIGITS = re.compile(r'\b(\d{6})\b')
+
+# Ключи, обязательные в данных найденной последовательности, и ключи, которые не могут быть пустыми
+_SEQUENCE_REQUIRED_KEYS = ('path', 'name', 'frame_range', 'frame_count', 'files', 'extension', 'type')
+_SEQUENCE_NONEMPTY_KEYS = ('path', 'name', 'extension')
+
+# Атомы MP4/MOV, содержащие дочерние атомы, которые нужно обходить
+_MP4_CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl', b'udta', b'meta', b'ilst', b'edts'}
+# Максимальный размер листового атома, который читается целиком
+_MP4_MAX_LEAF_SIZE = 1024 * 1024
+# Начало отсчета времени в атомах mvhd/mdhd
+_MP4_EPOCH = datetime.datetime(1904, 1, 1, tzinfo=datetime.timezone.utc)
+# Тип потока FFprobe по типу обработчика трека (остальные — 'data')
+_MP4_CODEC_TYPES = {'vide': 'video', 'soun': 'audio', 'text': 'subtitle', 'sbtl': 'subtitle', 'subt': 'subtitle'}
+# Имя кодека FFprobe по коду записи stsd
+_MP4_CODEC_NAMES = {
+    'avc1': 'h264', 'avc3': 'h264', 'hvc1': 'hevc', 'hev1': 'hevc', 'av01': 'av1', 'vp09': 'vp9',
+    'mp4v': 'mpeg4', 'jpeg': 'mjpeg', 'mjpa': 'mjpeg', 'mjpb': 'mjpegb', 'raw ': 'rawvideo',
+    'apch': 'prores', 'apcn': 'prores', 'apcs': 'prores', 'apco': 'prores', 'ap4h': 'prores', 'ap4x': 'prores',
+    'AVdn': 'dnxhd', 'AVdh': 'dnxhd', 'mp4a': 'aac', 'ac-3': 'ac3', 'ec-3': 'eac3', 'Opus': 'opus', 'fLaC': 'flac',
+    'sowt': 'pcm_s16le', 'twos': 'pcm_s16be', 'in24': 'pcm_s24be', 'in32': 'pcm_s32be',
+    'fl32': 'pcm_f32be', 'fl64': 'pcm_f64be', 'tx3g': 'mov_text', 'c608': 'eia_608',
+}
+# Имена тегов FFprobe для текстовых атомов udta/ilst (неизвестные атомы выводятся под своим кодом)
+_MP4_TAG_NAMES = {
+    '\xa9nam': 'title', '\xa9ART': 'artist', 'aART': 'album_artist', '\xa9alb': 'album', '\xa9cmt': 'comment',
+    '\xa9inf': 'comment', '\xa9day': 'date', '\xa9too': 'encoder', '\xa9enc': 'encoder', '\xa9swr': 'encoder',
+    '\xa9gen': 'genre', 'cprt': 'copyright', '\xa9cpy': 'copyright', 'desc': 'description', '\xa9des': 'comment',
+    'ldes': 'synopsis', '\xa9wrt': 'composer', '\xa9lyr': 'lyrics', '\xa9grp': 'grouping', '\xa9mak': 'make',
+    '\xa9mod': 'model', '\xa9xyz': 'location',
+}
+# Коды языков Macintosh в mdhd QuickTime (по индексу) в виде ISO 639-2, как их выводит FFprobe
+_MP4_MAC_LANGUAGES = ('eng', 'fra', 'ger', 'ita', 'dut', 'sve', 'spa', 'dan', 'por', 'nor', 'heb', 'jpn',
+                      'ara', 'fin', 'gre', 'ice', 'mlt', 'tur')
+
+# Форматтеры значений EXIF по имени тега (None — использовать str(value))
+def _fmt_exif_exposure(value):
+    """Выдержка в виде дроби"""
+    if hasattr(value, 'num') and hasattr(value, 'den'):
+        return f"{value.num}/{value.den} сек"
+    return None
+
+
+def _fmt_exif_aperture(value):
+    """Диафрагменное число"""
+    if hasattr(value, 'num') and hasattr(value, 'den'):
+        return f"f/{value.num/value.den:.1f}"
+    return None
+
+
+def _fmt_exif_focal(value):
+    """Фокусное расстояние в мм"""
+    if hasattr(value, 'num') and hasattr(value, 'den'):
+        return f"{value.num/value.den} мм"
+    return None
+
+
+def _fmt_exif_iso(value):
+    """Значение ISO"""
+    return f"ISO {value}"
+
+
+_EXIF_FORMATTERS = {
+    'EXIF ExposureTime': _fmt_exif_exposure,
+    'EXIF ShutterSpeedValue': _fmt_exif_exposure,
+    'EXIF FNumber': _fmt_exif_aperture,
+    'EXIF ApertureValue': _fmt_exif_aperture,
+    'EXIF FocalLength': _fmt_exif_focal,
+    'EXIF ISOSpeedRatings': _fmt_exif_iso,
+}
+
 
 
 class ResolutionAnalyzerWorker(QObject):
@@ -145,7 +314,10 @@ class ResolutionAnalyzerWorker(QObject):
             if ext_lower == '.exr':
                 # Используем OpenEXR
                 exr_file = OpenEXR.InputFile(file_path)
-                header = exr_file.header()
+                try:
+                    header = exr_file.header()
+                finally:
+                    exr_file.close()
                 for key, value in header.items():
                     metadata[key] = str(value)  # упрощённо
             elif ext_lower == '.r3d':
@@ -168,11 +340,9 @@ class ResolutionAnalyzerWorker(QObject):
                 if not metadata and PYMEDIAINFO_AVAILABLE:
                     media_info = MediaInfo.parse(file_path)
                     for track in media_info.tracks:
-                        for attr in dir(track):
-                            if not attr.startswith('_') and attr not in ['to_data', 'to_json']:
-                                val = getattr(track, attr)
-                                if val:
-                                    metadata[f"{track.track_type}.{attr}"] = str(val)
+                        for attr, val in track.to_data().items():
+                            if val:
+                                metadata[f"{track.track_type}.{attr}"] = str(val)
             elif ext_lower in ['.mxf', '.arr', '.arx']:
                 if os.path.exists(ARRI_REFERENCE_TOOL_PATH):
                     # Запускаем ARRI Tool
@@ -184,8 +354,8 @@ class ResolutionAnalyzerWorker(QObject):
                             timeout=30
                         )
                         if os.path.exists(tmp_path):
-                            with open(tmp_path, 'r') as f:
-                                arri_data = json.load(f)
+                            with open(tmp_path, 'rb') as f:
+                                arri_data = json_loads(f.read())
                             # Упрощённая развёртка
                             def flatten(d, parent=''):
                                 items = {}
@@ -211,21 +381,17 @@ class ResolutionAnalyzerWorker(QObject):
                 if not metadata and PYMEDIAINFO_AVAILABLE:
                     media_info = MediaInfo.parse(file_path)
                     for track in media_info.tracks:
-                        for attr in dir(track):
-                            if not attr.startswith('_') and attr not in ['to_data', 'to_json']:
-                                val = getattr(track, attr)
-                                if val:
-                                    metadata[f"{track.track_type}.{attr}"] = str(val)
+                        for attr, val in track.to_data().items():
+                            if val:
+                                metadata[f"{track.track_type}.{attr}"] = str(val)
             else:
                 # Пытаемся через MediaInfo как fallback
                 if PYMEDIAINFO_AVAILABLE:
                     media_info = MediaInfo.parse(file_path)
                     for track in media_info.tracks:
-                        for attr in dir(track):
-                            if not attr.startswith('_') and attr not in ['to_data', 'to_json']:
-                                val = getattr(track, attr)
-                                if val:
-                                    metadata[f"{track.track_type}.{attr}"] = str(val)
+                        for attr, val in track.to_data().items():
+                            if val:
+                                metadata[f"{track.track_type}.{attr}"] = str(val)
         except Exception as e:
             # Игнорируем ошибки чтения отдельного файла
             pass
@@ -268,25 +434,25 @@ class ResolutionAnalyzerWorker(QObject):
         try:
             if rule_type == 'range':
                 # (min_x, min_y) - (max_x, max_y)
-                match = re.match(r'\((\d+),\s*(\d+)\)\s*-\s*\((\d+),\s*(\d+)\)', value_str)
+                match = _RE_BOX_RANGE.match(value_str)
                 if match:
                     min_x, min_y, max_x, max_y = map(int, match.groups())
                     return max_x - min_x + 1, max_y - min_y + 1
                 # 4 числа через пробел
-                match = re.match(r'(\d+)\s+(\d+)\s+(\d+)\s+(\d+)', value_str)
+                match = _RE_BOX_FOUR_NUMBERS.match(value_str)
                 if match:
                     min_x, min_y, max_x, max_y = map(int, match.groups())
                     return max_x - min_x + 1, max_y - min_y + 1
             elif rule_type == 'single_w':
-                nums = re.findall(r'\d+', value_str)
-                if nums:
-                    return int(nums[0])
+                num = _RE_DIGIT_RUNS.search(value_str)
+                if num:
+                    return int(num.group())
             elif rule_type == 'single_h':
-                nums = re.findall(r'\d+', value_str)
-                if nums:
-                    return int(nums[0])
+                num = _RE_DIGIT_RUNS.search(value_str)
+                if num:
+                    return int(num.group())
             elif rule_type == 'combined':
-                match = re.match(r'\(?\s*(\d+)\s*[xX×:]\s*(\d+)\s*\)?', value_str)
+                match = _RE_COMBINED_RESOLUTION.match(value_str)
                 if match:
                     return int(match.group(1)), int(match.group(2))
         except Exception:
@@ -482,12 +648,21 @@ class ResolutionAnalysisDialog(QDialog):
         self.stop_btn.setEnabled(False)
         self.stop_btn.setText("Остановлен")
 
+    # ------------------------------------------------------------------
+    def notify(self, message):
+        """Показывает сообщение toast-ом главного окна, без модального окна"""
+        parent = self.parent()
+        if parent is not None and hasattr(parent, 'show_toast'):
+            parent.show_toast(message)
+        else:
+            QMessageBox.information(self, "Информация", message)
+
     # ------------------------------------------------------------------
     def copy_to_clipboard(self):
         rows = self.table.rowCount()
         cols = self.table.columnCount()
         if rows == 0:
-            QMessageBox.information(self, "Информация", "Нет данных для копирования.")
+            self.notify("Нет данных для копирования.")
             return
 
         headers = [self.table.horizontalHeaderItem(i).text() for i in range(cols)]
@@ -502,14 +677,14 @@ class ResolutionAnalysisDialog(QDialog):
 
         clipboard = QApplication.clipboard()
         clipboard.setText("\n".join(lines))
-        QMessageBox.information(self, "Успех", "Таблица скопирована в буфер обмена (разделитель табуляция).")
+        self.notify("Таблица скопирована в буфер обмена (разделитель табуляция).")
 
     # ------------------------------------------------------------------
     def save_to_csv(self):
         rows = self.table.rowCount()
         cols = self.table.columnCount()
         if rows == 0:
-            QMessageBox.information(self, "Информация", "Нет данных для сохранения.")
+            self.notify("Нет данных для сохранения.")
             return
 
         filename, _ = QFileDialog.getSaveFileName(
@@ -530,7 +705,7 @@ class ResolutionAnalysisDialog(QDialog):
                     row_data.append(text)
                 f.write(",".join(row_data) + "\n")
 
-        QMessageBox.information(self, "Успех", f"Данные сохранены в {filename}")
+        self.notify(f"Данные сохранены в {filename}")
 
     # ------------------------------------------------------------------
     def closeEvent(self, event):
@@ -560,13 +735,13 @@ class ResolutionAnalysisDialog(QDialog):
 class ToastMessage(QLabel):
     """Всплывающее сообщение (Toast) с ручной отрисовкой фона"""
     
+    closed = pyqtSignal()
+    
     def __init__(self, message, parent=None, duration=2000, opacity=0.8):
         super().__init__(parent)
-        self.duration = duration
-        self.background_opacity = int(255 * opacity)  # Конвертируем в 0-255
+        self.set_message(message, duration, opacity)
         
         # Настройка текста
-        self.setText(message)
         self.setAlignment(Qt.AlignCenter)
         self.setWordWrap(True)
         self.setMargin(15)
@@ -595,6 +770,12 @@ class ToastMessage(QLabel):
         self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.hide_toast)
     
+    def set_message(self, message, duration=2000, opacity=0.8):
+        """Задает текст и параметры показа (виджет переиспользуется)"""
+        self.duration = duration
+        self.background_opacity = int(255 * opacity)  # Конвертируем в 0-255
+        self.setText(message)
+    
     def paintEvent(self, event):
         """Ручная отрисовка фона с прозрачностью"""
         painter = QPainter(self)
@@ -647,11 +828,15 @@ class ToastMessage(QLabel):
         self.animation.setEndValue(0.0)
         self.animation.start()
     
+    def is_hiding(self):
+        """Проверяет, идет ли анимация исчезновения"""
+        return self.animation.state() == QPropertyAnimation.Running and self.animation.endValue() == 0.0
+    
     def check_animation_finished(self):
         """Проверяет завершение анимации и скрывает виджет"""
         if self.windowOpacity() == 0.0:
             self.hide()
-            self.deleteLater()
+            self.closed.emit()
 
 
 
@@ -718,6 +903,71 @@ class DebugLogger(QObject):
         self.debug_enabled = enabled
 
 
+class DeferredLogger:
+    """Накапливает сообщения лога в фоновом потоке для последующей передачи в DebugLogger"""
+    
+    def __init__(self):
+        self.entries = []
+    
+    def log(self, message, level="INFO"):
+        self.entries.append((message, level))
+
+
+class MetadataReadSignals(QObject):
+    """Сигналы фонового чтения метаданных"""
+    finished = pyqtSignal(int, str, dict, list)  # request_id, metadata_source, metadata, log_entries
+
+
+class MetadataReadTask(QRunnable):
+    """Задача чтения метаданных файла в пуле потоков"""
+    
+    def __init__(self, request_id, reader, file_path, extension, metadata_tool):
+        super().__init__()
+        self.request_id = request_id
+        self.reader = reader
+        self.file_path = file_path
+        self.extension = extension
+        self.metadata_tool = metadata_tool
+        self.signals = MetadataReadSignals()
+    
+    def run(self):
+        try:
+            metadata_source, metadata = self.reader.read(self.file_path, self.extension, self.metadata_tool)
+        except Exception as e:
+            metadata = self.reader.metadata
+            metadata["Ошибка чтения метаданных"] = str(e)
+            self.reader.debug_logger.log(f"Ошибка фонового чтения метаданных для {self.file_path}: {str(e)}", "ERROR")
+            metadata_source = "Error"
+        self.signals.finished.emit(self.request_id, metadata_source or "Unknown",
+                                   metadata, self.reader.debug_logger.entries)
+
+
+class MetadataPrefetchSignals(QObject):
+    """Сигналы предварительного чтения заголовков"""
+    finished = pyqtSignal(list)  # log_entries
+
+
+class MetadataPrefetchTask(QRunnable):
+    """Задача предварительного чтения заголовков EXR в общий кэш метаданных"""
+    
+    def __init__(self, reader, file_paths, cancel_event):
+        super().__init__()
+        self.reader = reader
+        self.file_paths = file_paths
+        self.cancel_event = cancel_event
+        self.signals = MetadataPrefetchSignals()
+    
+    def run(self):
+        for file_path in self.file_paths:
+            if self.cancel_event.is_set():
+                break
+            try:
+                self.reader.cache_exr_header(file_path)
+            except Exception as e:
+                self.reader.debug_logger.log(f"Ошибка предварительного чтения EXR для {file_path}: {str(e)}", "WARNING")
+        self.signals.finished.emit(self.reader.debug_logger.entries)
+
+
 
 class LogViewerDialog(QDialog):
     """Диалог для просмотра логов в реальном времени с улучшенной производительностью"""
@@ -949,7 +1199,7 @@ class LogViewerDialog(QDialog):
 
 
 class SequenceFinder(QThread):
-    sequence_found = pyqtSignal(dict)
+    sequence_found = pyqtSignal(list)  # пакет словарей найденных последовательностей
     progress_update = pyqtSignal(str)
     finished_signal = pyqtSignal()
 
@@ -958,6 +1208,15 @@ class SequenceFinder(QThread):
         self.directory = directory
         self.debug_logger = debug_logger
         self._is_running = True
+        # Сообщения о прогрессе отправляются не чаще одного раза в _progress_interval секунд
+        self._progress_interval = 0.05
+        self._last_progress_ts = 0.0
+        # Найденные последовательности копятся между папками и уходят в интерфейс пакетом,
+        # когда набралось _batch_size штук или прошло _batch_interval секунд
+        self._pending_sequences = []
+        self._batch_size = 32
+        self._batch_interval = 0.05
+        self._last_batch_ts = 0.0
         # Ищем все файлы, независимо от расширения
         self.supported_extensions = set()  # Пустое множество означает все файлы
         # Видео расширения, которые всегда считаем одиночными
@@ -971,57 +1230,115 @@ class SequenceFinder(QThread):
     def continue_search(self):
         self._is_running = True
 
-    def find_sequences_in_directory(self, directory):
-        """Находит последовательности файлов в конкретной директории"""
-        files_by_extension = defaultdict(list)
+    def progress_due(self):
+        """Проверяет, пора ли отправлять очередное сообщение о прогрессе"""
+        now = time.monotonic()
+        if now - self._last_progress_ts < self._progress_interval:
+            return False
+        self._last_progress_ts = now
+        return True
+
+    def new_file_buckets(self):
+        """Создает структуру расширение -> ключ группы -> [(номер кадра, путь, имя файла)]"""
+        return defaultdict(lambda: defaultdict(list))
+
+    def add_file_to_buckets(self, files_by_extension, file, file_path):
+        """Сразу раскладывает файл по расширению и группе, возвращает (base_name, frame_num)"""
+        ext = os.path.splitext(file)[1].lower()
+        if ext in self.video_extensions:
+            # Каждый видеофайл - отдельная последовательность, номер кадра не нужен
+            base_name, frame_num, group_key = file, None, file
+        else:
+            base_name, frame_num = self.extract_sequence_info(file)
+            # Файлы без номера кадра группируются по полному имени (одиночные файлы)
+            group_key = base_name if frame_num is not None else file
+        files_by_extension[ext][group_key].append((frame_num, file_path, file))
+        return base_name, frame_num
+
+    def scan_directory(self, directory):
+        """Читает содержимое одной папки: (папка, имена файлов, пути подпапок) — как один шаг os.walk"""
+        files = []
+        subdirs = []
+        if not self._is_running:
+            return directory, files, subdirs
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry.name)
+                    elif not entry.is_symlink():
+                        subdirs.append(entry.path)
+        except OSError:
+            pass
+        return directory, files, subdirs
+
+    def find_sequences_optimized(self, directory):
+        """Оптимизированный гибридный подход: папки читаются параллельно, разбор идет в потоке поиска"""
+        # Результаты уходят в интерфейс сигналами, поэтому здесь накапливается только счетчик
+        found_count = 0
         
         try:
-            files = os.listdir(directory)
-            self.debug_logger.log(f"find_sequences_in_directory: В папке {directory} найдено {len(files)} файлов/папок")
-        except PermissionError:
-            self.debug_logger.log(f"find_sequences_in_directory: Нет доступа к папке {directory}", "WARNING")
+            # Чтение папок (ввод-вывод) перекрывается в пуле потоков; найденные подпапки
+            # сразу отправляются в пул, а файлы разбираются по мере готовности
+            with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+                pending = {executor.submit(self.scan_directory, directory)}
+                while pending:
+                    if not self._is_running:
+                        for future in pending:
+                            future.cancel()
+                        break
+                    
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        root, files, subdirs = future.result()
+                        if self._is_running:
+                            pending.update(executor.submit(self.scan_directory, subdir) for subdir in subdirs)
+                        found_count += len(self.process_directory_files(root, files))
+                    
+        except Exception as e:
+            self.debug_logger.log(f"Ошибка в оптимизированном поиске: {e}", "ERROR")
+        
+        return found_count
+
+    def process_directory_files(self, root, files):
+        """Формирует и отправляет последовательности для файлов одной папки"""
+        if not self._is_running:
             return {}
-            
+        
+        if self.progress_due():
+            self.progress_update.emit(f"Обработка: {os.path.basename(root)}")
+        
+        # Группируем файлы по расширениям и базовым именам за один проход
+        files_by_extension = self.new_file_buckets()
+        
+        # Префикс папки с разделителем считается один раз: путь файла — простая конкатенация
+        root_prefix = os.path.join(root, '')
         for file in files:
             if not self._is_running:
                 break
-                
-            file_path = os.path.join(directory, file)
-            if os.path.isfile(file_path):
-                _, ext = os.path.splitext(file)
-                ext = ext.lower()
-                
-                # ОТПРАВКА СООБЩЕНИЯ О ПРОГРЕССЕ - обработка файла
-                self.progress_update.emit(f"Обработка: {file}")
-                
-                base_name, frame_num = self.extract_sequence_info(file)
-                self.debug_logger.log(f"  Файл: {file} -> base_name: {base_name}, frame_num: {frame_num}")
-                
-                files_by_extension[ext].append((base_name, frame_num, file_path, file))
-        
-        self.debug_logger.log(f"find_sequences_in_directory: Для папки {directory} найдено:")
-        for ext, files in files_by_extension.items():
-            self.debug_logger.log(f"    {ext}: {len(files)} файлов")
-        
-        return files_by_extension
-
-    def find_sequences_recursive(self, directory):
-        """Рекурсивно ищет последовательности файлов во всех подпапках"""
-        all_sequences = {}
+            
+            self.add_file_to_buckets(files_by_extension, file, root_prefix + file)
         
-        # Обработка текущей директории
-        files_by_extension = self.find_sequences_in_directory(directory)
+        # Формируем последовательности для текущей папки
+        sequences = self.form_sequences(files_by_extension, root)
         
-        # Формирование последовательностей
-        sequences = self.form_sequences(files_by_extension, directory)
-        all_sequences.update(sequences)
+        # Отправляем найденные последовательности одним пакетом на папку
+        self.emit_sequences(sequences)
         
-        # Отправка найденных последовательностей
-        for seq_name, seq_info in sequences.items():
+        return sequences
+
+    def emit_sequences(self, sequences):
+        """Добавляет последовательности папки в пакет и отправляет его, когда он заполнен или устарел"""
+        batch = self._pending_sequences
+        for seq_info in sequences.values():
             if not self._is_running:
                 break
             
-            sequence_data = {
+            batch.append({
                 'path': seq_info['path'],
                 'name': seq_info['display_name'],
                 'frame_range': seq_info['frame_range'],
@@ -1029,95 +1346,32 @@ class SequenceFinder(QThread):
                 'files': seq_info['files'],
                 'extension': seq_info['extension'],
                 'type': seq_info['type']
-            }
-            
-            self.sequence_found.emit(sequence_data)
-            
-        if not self._is_running:
-            return all_sequences
-            
-        # Рекурсивный поиск в подпапках
-        try:
-            for item in os.listdir(directory):
-                if not self._is_running:
-                    break
-                    
-                item_path = os.path.join(directory, item)
-                if os.path.isdir(item_path):
-                    # ОТПРАВКА СООБЩЕНИЯ О ПРОГРЕССЕ - обработка папки
-                    self.progress_update.emit(f"Поиск в папке: {item}")
-                    sub_sequences = self.find_sequences_recursive(item_path)
-                    all_sequences.update(sub_sequences)
-        except PermissionError:
-            pass
-            
-        return all_sequences
-    
-    def find_sequences_optimized(self, directory):
-        """Оптимизированный гибридный подход"""
-        all_sequences = {}
-        
-        try:
-            # Используем os.walk для основного обхода
-            for root, dirs, files in os.walk(directory):
-                if not self._is_running:
-                    break
-                    
-                self.progress_update.emit(f"Обработка: {os.path.basename(root)}")
-                
-                # Группируем файлы по расширениям
-                files_by_extension = defaultdict(list)
-                
-                for file in files:
-                    if not self._is_running:
-                        break
-                        
-                    file_path = os.path.join(root, file)
-                    _, ext = os.path.splitext(file)
-                    ext = ext.lower()
-                    
-                    base_name, frame_num = self.extract_sequence_info(file)
-                    files_by_extension[ext].append((base_name, frame_num, file_path, file))
-                
-                # Формируем последовательности для текущей папки
-                sequences = self.form_sequences(files_by_extension, root)
-                all_sequences.update(sequences)
-                
-                # Отправляем найденные последовательности
-                for seq_name, seq_info in sequences.items():
-                    if not self._is_running:
-                        break
-                    
-                    sequence_data = {
-                        'path': seq_info['path'],
-                        'name': seq_info['display_name'],
-                        'frame_range': seq_info['frame_range'],
-                        'frame_count': len(seq_info['files']),
-                        'files': seq_info['files'],
-                        'extension': seq_info['extension'],
-                        'type': seq_info['type']
-                    }
-                    self.sequence_found.emit(sequence_data)
-                    
-        except Exception as e:
-            self.debug_logger.log(f"Ошибка в оптимизированном поиске: {e}", "ERROR")
+            })
         
-        return all_sequences
+        if len(batch) >= self._batch_size or time.monotonic() - self._last_batch_ts >= self._batch_interval:
+            self.flush_sequences()
+
+    def flush_sequences(self):
+        """Отправляет накопленный пакет последовательностей одним сигналом"""
+        if self._pending_sequences:
+            self.sequence_found.emit(self._pending_sequences)
+            self._pending_sequences = []
+        self._last_batch_ts = time.monotonic()
 
 
     def form_sequences(self, files_by_extension, directory):
-        """Формирует последовательности из найденных файлов"""
+        """Формирует последовательности из файлов, разложенных по расширениям и группам"""
         sequences = {}
         self.debug_logger.log(f"form_sequences: Начало формирования последовательностей для {directory}")
         
         # Обрабатываем каждый тип расширений отдельно
-        for ext, files_list in files_by_extension.items():
-            self.debug_logger.log(f"  Обрабатываем расширение {ext}: {len(files_list)} файлов")
+        for ext, files_by_base_name in files_by_extension.items():
+            self.debug_logger.log(f"  Обрабатываем расширение {ext}: {len(files_by_base_name)} групп")
             
             # Для видеофайлов каждый файл - отдельная последовательность
             if ext in self.video_extensions:
                 self.debug_logger.log(f"    Расширение {ext} является видео, обрабатываем каждый файл отдельно")
-                for base_name, frame_num, file_path, file_name in files_list:
+                for frame_num, file_path, file_name in (item for files in files_by_base_name.values() for item in files):
                     # Создаем отдельную последовательность для каждого видеофайла
                     unique_key = f"{directory}/{file_name}"
                     
@@ -1136,19 +1390,7 @@ class SequenceFinder(QThread):
                     self.debug_logger.log(f"      Создана видео-последовательность: {unique_key}")
                 continue  # Переходим к следующему расширению
             
-            # Для НЕ-видео файлов используем логику группировки по базовому имени
-            files_by_base_name = defaultdict(list)
-            for base_name, frame_num, file_path, file_name in files_list:
-                # Для группировки используем base_name только если есть frame_num
-                # Если frame_num None, то это одиночный файл
-                if frame_num is not None:
-                    group_key = base_name
-                else:
-                    # Для файлов без номера кадра используем полное имя как ключ группы
-                    group_key = file_name
-                files_by_base_name[group_key].append((frame_num, file_path, file_name))
-                self.debug_logger.log(f"    Файл {file_name} -> базовая группа: '{group_key}', номер кадра: {frame_num}")
-            
+            # Для НЕ-видео файлов группы по базовому имени уже собраны при обходе папки
             # Формируем последовательности для каждой группы
             for group_key, files in files_by_base_name.items():
                 self.debug_logger.log(f"    Формируем последовательность для группы: '{group_key}'")
@@ -1178,33 +1420,30 @@ class SequenceFinder(QThread):
                     files.sort(key=lambda x: x[0] if x[0] is not None else -1)
                     frame_numbers = [f[0] for f in files if f[0] is not None]  # Только валидные номера кадров
                     file_paths = [f[1] for f in files]
-                    file_names = [f[2] for f in files]
                     
-                    self.debug_logger.log(f"      Файлы: {file_names}")
-                    self.debug_logger.log(f"      Номера кадров: {frame_numbers}")
+                    # Списки имен и кадров форматируются только при включенной отладке
+                    if self.debug_logger.debug_enabled:
+                        self.debug_logger.log(f"      Файлы: {[f[2] for f in files]}")
+                        self.debug_logger.log(f"      Номера кадров: {frame_numbers}")
                     
                     # Проверяем, является ли это последовательностью
-                    if self.is_sequence(frame_numbers):
+                    # frame_numbers уже упорядочены сортировкой files выше
+                    if self.is_sequence(frame_numbers, already_sorted=True):
                         # Это последовательность
                         seq_type = f'sequence_{ext[1:]}'
                         
                         # Формируем диапазон кадров
                         if frame_numbers:
-                            min_frame = min(frame_numbers)
-                            max_frame = max(frame_numbers)
-                            
-                            # Определяем количество цифр для форматирования
-                            max_digits = max(len(str(f)) for f in frame_numbers)
+                            # Кадры отсортированы и неотрицательны: крайние значения и самое длинное
+                            # число берутся с концов списка без дополнительных проходов
+                            min_frame = frame_numbers[0]
+                            max_frame = frame_numbers[-1]
+                            max_digits = len(str(max_frame))
                             
                             self.debug_logger.log(f"      Минимальный кадр: {min_frame}, максимальный: {max_frame}, макс. цифр: {max_digits}")
                             
-                            # Проверяем, есть ли ведущие нули
-                            has_leading_zeros = any(len(str(f)) < max_digits for f in frame_numbers)
-                            
-                            if has_leading_zeros or all(len(str(f)) == max_digits for f in frame_numbers):
-                                frame_range = f"{min_frame:0{max_digits}d}-{max_frame:0{max_digits}d}"
-                            else:
-                                frame_range = f"{min_frame}-{max_frame}"
+                            # Оба конца дополняются нулями до ширины самого длинного номера
+                            frame_range = f"{min_frame:0{max_digits}d}-{max_frame:0{max_digits}d}"
                                 
                             self.debug_logger.log(f"      Диапазон кадров: {min_frame}..{max_frame} -> '{frame_range}'")
                         else:
@@ -1215,7 +1454,7 @@ class SequenceFinder(QThread):
                         frame_range = "группа файлов"
                     
                     # Имя последовательности - имя первого файла
-                    display_name = file_names[0]
+                    display_name = files[0][2]
                     
                     # Используем путь + имени группы как ключ для уникальности
                     unique_key = f"{directory}/{group_key}"
@@ -1251,21 +1490,31 @@ class SequenceFinder(QThread):
         """
         name_without_ext = os.path.splitext(filename)[0]
         
-        matches = []
-        for match in re.finditer(r'\d+', name_without_ext):
-            matches.append((match.start(), match.end(), match.group()))
+        # Быстрый путь для типичного name.0001: единственная группа цифр стоит в конце имени.
+        # Такое число всегда набирает счет выше порога, поэтому разбор с оценкой не нужен
+        head = name_without_ext.rstrip('0123456789')
+        if len(head) < len(name_without_ext) and _RE_DIGIT_RUNS.search(head) is None:
+            return head + "@@@", int(name_without_ext[len(head):])
+        
+        matches = [(match.start(), match.end(), match.group()) for match in _RE_DIGIT_RUNS.finditer(name_without_ext)]
             
         if not matches:
             return name_without_ext, None
 
+        # Позиции сразу после первого вхождения каждого префикса кадра: считаются один раз на имя
+        frame_prefix_ends = set()
+        seen_prefixes = set()
+        for prefix_match in _RE_FRAME_PREFIXES.finditer(name_without_ext.lower()):
+            prefix = prefix_match.group()
+            if prefix not in seen_prefixes:
+                seen_prefixes.add(prefix)
+                frame_prefix_ends.add(prefix_match.end())
+
         best_match = None
         best_score = -10000 
 
         for i, (start, end, num_str) in enumerate(matches):
-            try:
-                num_val = int(num_str)
-            except ValueError:
-                continue
+            num_val = int(num_str)
 
             score = 0
             length = len(num_str)
@@ -1281,8 +1530,7 @@ class SequenceFinder(QThread):
                 context = name_without_ext[context_start:start].lower()
                 
                 # Сильные индикаторы номера кадра
-                strong_frame_indicators = ['.', '_r', '_c', '_v', '_f', '.r', '.c', '.v', '.f', '_', '-']
-                if any(indicator in context for indicator in strong_frame_indicators):
+                if any(indicator in context for indicator in _FRAME_CONTEXT_INDICATORS):
                     prefix_bonus += 40
                     
                     # Особый бонус для точки как разделителя кадров
@@ -1338,7 +1586,7 @@ class SequenceFinder(QThread):
                 if num_str.startswith('0') and length > 1:
                     score += 40
                     # Дополнительный бонус если много ведущих нулей
-                    zero_count = len([c for c in num_str if c == '0'])
+                    zero_count = num_str.count('0')
                     if zero_count >= 3:
                         score += 20
             
@@ -1385,25 +1633,16 @@ class SequenceFinder(QThread):
             # Проверка на даты (штрафуем)
             if length == 8:
                 # Проверяем, не является ли это датой (YYYYMMDD или YYMMDDHH)
-                year_indicators = ['20', '19', '21', '22']
-                if (num_str[:2] in year_indicators or 
-                num_str[:4] in ['2023', '2024', '2025', '2026']):
+                if num_str[:2] in _DATE_PREFIXES_2 or num_str[:4] in _DATE_PREFIXES_4:
                     # Дополнительная проверка: если контекст не указывает на кадр
                     if prefix_bonus < 30:  # Если нет сильного контекста кадра
                         score -= 50  # Штраф за возможную дату
         
             # --- 6. Анализ общего паттерна имени файла ---
             # Бонус если имя файла содержит типичные паттерны для кадров
-            file_patterns = ['.r', '.c', '.v', '.f', '_r', '_c', '_v', '_f']  # Добавили подчеркивания
-            if any(pattern in name_without_ext.lower() for pattern in file_patterns):
-                # Особый бонус если наше число следует сразу после такого паттерна
-                pattern_bonus = 0
-                for pattern in file_patterns:
-                    pattern_pos = name_without_ext.lower().find(pattern)
-                    if pattern_pos != -1 and start == pattern_pos + len(pattern):
-                        pattern_bonus += 70  # Очень большой бонус
-                        break
-                score += pattern_bonus
+            # Особый бонус если наше число следует сразу после такого паттерна
+            if start in frame_prefix_ends:
+                score += 70  # Очень большой бонус
                 
             # --- 7. Эвристика для длинных последовательных номеров ---
             # Если число длинное и увеличивается на 1 в последовательности файлов
@@ -1451,8 +1690,8 @@ class SequenceFinder(QThread):
         return name_without_ext, None
 
 
-    def is_sequence(self, frame_numbers):
-        """Проверяет, являются ли номера кадров последовательными"""
+    def is_sequence(self, frame_numbers, already_sorted=False):
+        """Проверяет, являются ли номера кадров последовательными (already_sorted — список уже по возрастанию)"""
         if len(frame_numbers) < 2:
             self.debug_logger.log(f"is_sequence: недостаточно кадров ({len(frame_numbers)})")
             return False
@@ -1463,46 +1702,95 @@ class SequenceFinder(QThread):
             self.debug_logger.log(f"is_sequence: недостаточно валидных кадров ({len(valid_frames)})")
             return False
         
-        sorted_frames = sorted(valid_frames)
-        
-        # Проверяем, что разница между кадрами постоянная
-        differences = [sorted_frames[i] - sorted_frames[i-1] for i in range(1, len(sorted_frames))]
-        unique_differences = set(differences)
+        sorted_frames = valid_frames if already_sorted else sorted(valid_frames)
         
         # Допускаем последовательности с постоянным шагом (1, 2, 10 и т.д.)
         # Для больших чисел допускаем больший разброс в разнице (например, 10000001-10000002 = 1)
-        max_difference_variation = max(1, max(valid_frames) // 1000000)  # Автоматическая адаптация
-        
-        self.debug_logger.log(f"is_sequence: кадры {sorted_frames}, различия {differences}, уникальные различия {unique_differences}, max_variation={max_difference_variation}")
+        max_difference_variation = max(1, sorted_frames[-1] // 1000000)  # Автоматическая адаптация
+        
+        # Один проход по разностям соседних кадров с выходом при первом превышении разброса
+        min_diff = max_diff = sorted_frames[1] - sorted_frames[0]
+        result = True
+        for i in range(2, len(sorted_frames)):
+            diff = sorted_frames[i] - sorted_frames[i-1]
+            if diff < min_diff:
+                min_diff = diff
+            elif diff > max_diff:
+                max_diff = diff
+            else:
+                continue
+            if max_diff - min_diff > max_difference_variation:
+                result = False
+                break
         
-        # Если все различия одинаковые или отличаются не более чем на max_difference_variation
-        if len(unique_differences) == 1:
-            result = True
-        else:
-            min_diff = min(unique_differences)
-            max_diff = max(unique_differences)
-            result = (max_diff - min_diff) <= max_difference_variation
+        self.debug_logger.log(f"is_sequence: кадры {sorted_frames}, разброс различий {min_diff}..{max_diff}, max_variation={max_difference_variation}")
         
         self.debug_logger.log(f"is_sequence: результат {result}")
         return result
 
     def run(self):
         try:
-        #    self.find_sequences_recursive(self.directory)
             self.find_sequences_optimized(self.directory)
         except Exception as e:
             self.debug_logger.log(f"Ошибка в потоке поиска: {e}", "ERROR")
         finally:
+            # Остаток пакета уходит до сигнала завершения: порядок сигналов сохраняется
+            self.flush_sequences()
             self.finished_signal.emit()
 
 
 
+class ItemPickerDialog(QDialog):
+    """Переиспользуемый диалог выбора значения из списка"""
+    def __init__(self, title, label, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle(title)
+        self._items = ()
+        
+        layout = QFormLayout(self)
+        self.combo = QComboBox()
+        layout.addRow(label, self.combo)
+        
+        button_box = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        layout.addRow(button_box)
+
+    def set_items(self, items):
+        """Обновляет список только если он изменился"""
+        items = tuple(items)
+        if items != self._items:
+            self._items = items
+            self.combo.clear()
+            self.combo.addItems(items)
+        self.combo.setCurrentIndex(0)
+
+    def choose(self, items):
+        """Показывает диалог и возвращает (значение, ok)"""
+        self.set_items(items)
+        if self.exec_() == QDialog.Accepted:
+            return self.combo.currentText(), True
+        return "", False
+
+
 class SettingsDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
+        self._settings_changed = False
         self.setup_ui()
 
+    def mark_settings_changed(self):
+        """Отмечает изменение настроек; запись на диск выполняется при закрытии диалога"""
+        self._settings_changed = True
+
+    def done(self, result):
+        # Правки применяются сразу, поэтому файл пишется один раз при любом закрытии диалога
+        if self._settings_changed:
+            self._settings_changed = False
+            self.parent.settings_manager.schedule_save()
+        super().done(result)
+
     def setup_ui(self):
         self.setWindowTitle("Управление цветами")
         self.setGeometry(200, 200, 800, 600)
@@ -1660,53 +1948,96 @@ class SettingsDialog(QDialog):
 
     def load_current_settings(self):
         """Загружает текущие настройки из родительского окна"""
+        # Элементы списков диалога по имени: проверка дубликатов и точечные изменения без перебора списков
+        self._active_items = {}
+        self._trash_items = {}
+        self._sequence_items = {}
+        
+        settings_manager = self.parent.settings_manager
+        
         self.active_list.clear()
-        for field_name in self.parent.settings_manager.ordered_metadata_fields:
-            if field_name in self.parent.settings_manager.color_metadata:
-                color_data = self.parent.settings_manager.color_metadata[field_name]
-                if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                    if not color_data.get('removed', False):
-                        color = QColor(color_data['r'], color_data['g'], color_data['b'])
-                        item = QListWidgetItem(field_name)
-                        item.setBackground(color)
-                        self.active_list.addItem(item)
+        for field_name in settings_manager.ordered_metadata_fields:
+            color_data = settings_manager.color_metadata.get(field_name)
+            if color_data is not None and not color_data.get('removed', False):
+                self._append_list_item(self.active_list, self._active_items, field_name, color_data)
         
         self.trash_list.clear()
-        for field_name, color_data in self.parent.settings_manager.removed_metadata.items():
-            if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                color = QColor(color_data['r'], color_data['g'], color_data['b'])
-                item = QListWidgetItem(field_name)
-                item.setBackground(color)
-                self.trash_list.addItem(item)
+        for field_name, color_data in settings_manager.removed_metadata.items():
+            self._append_list_item(self.trash_list, self._trash_items, field_name, color_data)
         
         self.sequences_list.clear()
-        for seq_type, color_data in self.parent.settings_manager.sequence_colors.items():
-            if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                color = QColor(color_data['r'], color_data['g'], color_data['b'])
-                item = QListWidgetItem(seq_type)
-                item.setBackground(color)
-                self.sequences_list.addItem(item)
-
+        for seq_type, color_data in settings_manager.sequence_colors.items():
+            self._append_list_item(self.sequences_list, self._sequence_items, seq_type, color_data)
+
+    def _make_list_item(self, name, color_data):
+        """Создает элемент списка с общей кистью цвета из кэша настроек"""
+        item = QListWidgetItem(name)
+        item.setBackground(self.parent.settings_manager.cached_qbrush(color_data['r'], color_data['g'], color_data['b']))
+        return item
+
+    def _append_list_item(self, list_widget, items, name, color_data):
+        """Добавляет элемент в конец списка"""
+        item = self._make_list_item(name, color_data)
+        list_widget.addItem(item)
+        items[name] = item
+
+    def _insert_active_item(self, field_name, color_data):
+        """Вставляет поле в список активных на место, соответствующее порядку полей"""
+        ordered_fields = self.parent.settings_manager.ordered_metadata_fields
+        if ordered_fields and ordered_fields[-1] == field_name:
+            self._append_list_item(self.active_list, self._active_items, field_name, color_data)
+            return
+        
+        # Поле уже было в списке порядка — считаем видимые поля перед ним
+        row = 0
+        for name in ordered_fields:
+            if name == field_name:
+                break
+            if name in self._active_items:
+                row += 1
+        item = self._make_list_item(field_name, color_data)
+        self.active_list.insertItem(row, item)
+        self._active_items[field_name] = item
+
+    def _reposition_active_item(self, field_name):
+        """Переставляет поле в списке активных после изменения порядка и выделяет его"""
+        color_data = self.parent.settings_manager.color_metadata.get(field_name)
+        self._take_list_item(self.active_list, self._active_items, field_name)
+        if color_data is not None:
+            self._insert_active_item(field_name, color_data)
+            self.active_list.setCurrentItem(self._active_items[field_name])
+
+    def _take_list_item(self, list_widget, items, name):
+        """Убирает элемент из списка, если он там есть"""
+        item = items.pop(name, None)
+        if item is not None:
+            list_widget.takeItem(list_widget.row(item))
+
+    def _recolor_list_item(self, items, name, color_data):
+        """Меняет фон элемента списка на новый цвет"""
+        item = items.get(name)
+        if item is not None:
+            item.setBackground(self.parent.settings_manager.cached_qbrush(color_data['r'], color_data['g'], color_data['b']))
+
+    @pyqtSlot()
     def add_field_with_color(self):
         field_name = self.field_input.text().strip()
         if not field_name:
             QMessageBox.warning(self, "Ошибка", "Введите название поля")
             return
-        for i in range(self.active_list.count()):
-            if self.active_list.item(i).text() == field_name:
-                QMessageBox.warning(self, "Ошибка", "Это поле уже добавлено")
-                return
+        if field_name in self._active_items:
+            QMessageBox.warning(self, "Ошибка", "Это поле уже добавлено")
+            return
 
-        for i in range(self.trash_list.count()):
-            if self.trash_list.item(i).text() == field_name:
-                reply = QMessageBox.question(self, "Восстановить поле", 
-                                        f"Поле '{field_name}' находится в корзине. Восстановить его?",
-                                        QMessageBox.Yes | QMessageBox.No)
-                if reply == QMessageBox.Yes:
-                    self.restore_field_from_trash(field_name)
-                return
+        if field_name in self._trash_items:
+            reply = QMessageBox.question(self, "Восстановить поле", 
+                                    f"Поле '{field_name}' находится в корзине. Восстановить его?",
+                                    QMessageBox.Yes | QMessageBox.No)
+            if reply == QMessageBox.Yes:
+                self.restore_field_from_trash(field_name)
+            return
         
-        color = QColorDialog.getColor(QColor(200, 200, 255), self, "Выберите цвет для поля")
+        color = self.parent.pick_color(QColor(200, 200, 255), "Выберите цвет для поля")
         if color.isValid():
             self.parent.settings_manager.color_metadata[field_name] = {
                 'r': color.red(),
@@ -1715,15 +2046,14 @@ class SettingsDialog(QDialog):
                 'removed': False
             }
             
-            if field_name not in self.parent.settings_manager.ordered_metadata_fields:
-                self.parent.settings_manager.ordered_metadata_fields.append(field_name)
+            self.parent.settings_manager.append_ordered_field(field_name)
             
-            self.parent.settings_manager.save_settings()
+            self.mark_settings_changed()
             
-            self.load_current_settings()
+            self._insert_active_item(field_name, self.parent.settings_manager.color_metadata[field_name])
             
             if hasattr(self.parent, 'metadata_manager'):
-                self.parent.metadata_manager.update_metadata_colors()
+                self.parent.metadata_manager.schedule_color_refresh()
             
             self.field_input.clear()
 
@@ -1733,12 +2063,11 @@ class SettingsDialog(QDialog):
             QMessageBox.warning(self, "Ошибка", "Введите тип последовательности")
             return
         
-        for i in range(self.sequences_list.count()):
-            if self.sequences_list.item(i).text() == seq_type:
-                QMessageBox.warning(self, "Ошибка", "Этот тип уже добавлен")
-                return
+        if seq_type in self._sequence_items:
+            QMessageBox.warning(self, "Ошибка", "Этот тип уже добавлен")
+            return
 
-        color = QColorDialog.getColor(QColor(200, 200, 255), self, "Выберите цвет для типа последовательности")
+        color = self.parent.pick_color(QColor(200, 200, 255), "Выберите цвет для типа последовательности")
         if color.isValid():
             self.parent.settings_manager.sequence_colors[seq_type] = {
                 'r': color.red(),
@@ -1746,12 +2075,13 @@ class SettingsDialog(QDialog):
                 'b': color.blue()
             }
             
-            self.parent.settings_manager.save_settings()
+            self.mark_settings_changed()
             
-            self.load_current_settings()
+            self._append_list_item(self.sequences_list, self._sequence_items, seq_type,
+                                   self.parent.settings_manager.sequence_colors[seq_type])
             
             if hasattr(self.parent, 'tree_manager'):
-                self.parent.tree_manager.update_sequences_colors()
+                self.parent.tree_manager.schedule_colors_refresh()
             
             self.sequence_type_input.clear()
 
@@ -1769,36 +2099,30 @@ class SettingsDialog(QDialog):
 
     def move_field_to_trash(self, field_name):
         """Перемещает поле в корзину"""
-        if field_name in self.parent.settings_manager.color_metadata:
-            
-            color_data = self.parent.settings_manager.color_metadata[field_name]
+        color_data = self.parent.settings_manager.color_metadata.pop(field_name, None)
+        if color_data is not None:
             self.parent.settings_manager.removed_metadata[field_name] = color_data
             
+            self.parent.settings_manager.remove_ordered_field(field_name)
             
-            del self.parent.settings_manager.color_metadata[field_name]
-            
-            
-            if field_name in self.parent.settings_manager.ordered_metadata_fields:
-                self.parent.settings_manager.ordered_metadata_fields.remove(field_name)
-            
-            self.parent.settings_manager.save_settings()
+            self.mark_settings_changed()
             
-            self.load_current_settings()
+            self._take_list_item(self.active_list, self._active_items, field_name)
+            self._take_list_item(self.trash_list, self._trash_items, field_name)
+            self._append_list_item(self.trash_list, self._trash_items, field_name, color_data)
             
             if hasattr(self.parent, 'metadata_manager'):
-                self.parent.metadata_manager.update_metadata_colors()
+                self.parent.metadata_manager.schedule_color_refresh()
 
     def delete_sequence_type(self, seq_type):
         """Удаляет тип последовательности"""
-        if seq_type in self.parent.settings_manager.sequence_colors:
-            del self.parent.settings_manager.sequence_colors[seq_type]
-            
-            self.parent.settings_manager.save_settings()
+        if self.parent.settings_manager.sequence_colors.pop(seq_type, None) is not None:
+            self.mark_settings_changed()
             
-            self.load_current_settings()
+            self._take_list_item(self.sequences_list, self._sequence_items, seq_type)
             
             if hasattr(self.parent, 'tree_manager'):
-                self.parent.tree_manager.update_sequences_colors()
+                self.parent.tree_manager.schedule_colors_refresh()
 
     def restore_selected(self):
         current_row = self.trash_list.currentRow()
@@ -1808,21 +2132,22 @@ class SettingsDialog(QDialog):
 
     def restore_field_from_trash(self, field_name):
         """Восстанавливает поле из корзины"""
-        if field_name in self.parent.settings_manager.removed_metadata:
-            color_data = self.parent.settings_manager.removed_metadata[field_name]
+        color_data = self.parent.settings_manager.removed_metadata.pop(field_name, None)
+        if color_data is not None:
             self.parent.settings_manager.color_metadata[field_name] = color_data
             
-            if field_name not in self.parent.settings_manager.ordered_metadata_fields:
-                self.parent.settings_manager.ordered_metadata_fields.append(field_name)
+            self.parent.settings_manager.append_ordered_field(field_name)
             
-            del self.parent.settings_manager.removed_metadata[field_name]
+            self.mark_settings_changed()
             
-            self.parent.settings_manager.save_settings()
-            self.load_current_settings()
+            self._take_list_item(self.trash_list, self._trash_items, field_name)
+            self._take_list_item(self.active_list, self._active_items, field_name)
+            if not color_data.get('removed', False):
+                self._insert_active_item(field_name, color_data)
 
             if hasattr(self.parent, 'metadata_manager'):
                 # ИСПОЛЬЗОВАТЬ update_metadata_colors вместо перечитывания
-                self.parent.metadata_manager.update_metadata_colors()
+                self.parent.metadata_manager.schedule_color_refresh()
 
     def delete_permanently_selected(self):
         current_row = self.trash_list.currentRow()
@@ -1832,12 +2157,10 @@ class SettingsDialog(QDialog):
 
     def delete_field_permanently(self, field_name):
         """Окончательно удаляет поле"""
-        if field_name in self.parent.settings_manager.removed_metadata:
-            del self.parent.settings_manager.removed_metadata[field_name]
-            
-            self.parent.settings_manager.save_settings()
+        if self.parent.settings_manager.removed_metadata.pop(field_name, None) is not None:
+            self.mark_settings_changed()
             
-            self.load_current_settings()
+            self._take_list_item(self.trash_list, self._trash_items, field_name)
 
     def empty_trash(self):
         """Очищает корзину"""
@@ -1848,11 +2171,10 @@ class SettingsDialog(QDialog):
             # ИСПРАВЛЕНИЕ: Используем settings_manager
             self.parent.settings_manager.removed_metadata.clear()
             
+            self.mark_settings_changed()
             
-            self.parent.settings_manager.save_settings()
-            
-            
-            self.load_current_settings()
+            self.trash_list.clear()
+            self._trash_items = {}
 
     def move_field_up(self):
         """Перемещает выбранное поле вверх в списке"""
@@ -1865,9 +2187,8 @@ class SettingsDialog(QDialog):
             if index > 0:
                 self.parent.settings_manager.ordered_metadata_fields[index], self.parent.settings_manager.ordered_metadata_fields[index-1] = \
                     self.parent.settings_manager.ordered_metadata_fields[index-1], self.parent.settings_manager.ordered_metadata_fields[index]
-                self.parent.settings_manager.save_settings()
-                self.load_current_settings()
-                self.active_list.setCurrentRow(current_row - 1)
+                self.mark_settings_changed()
+                self._reposition_active_item(field_name)
 
     def move_field_down(self):
         """Перемещает выбранное поле вниз в списке"""
@@ -1880,9 +2201,8 @@ class SettingsDialog(QDialog):
             if index < len(self.parent.settings_manager.ordered_metadata_fields) - 1:
                 self.parent.settings_manager.ordered_metadata_fields[index], self.parent.settings_manager.ordered_metadata_fields[index+1] = \
                     self.parent.settings_manager.ordered_metadata_fields[index+1], self.parent.settings_manager.ordered_metadata_fields[index]
-                self.parent.settings_manager.save_settings()
-                self.load_current_settings()
-                self.active_list.setCurrentRow(current_row + 1)
+                self.mark_settings_changed()
+                self._reposition_active_item(field_name)
 
     def move_field_top(self):
         """Перемещает выбранное поле в начало списка"""
@@ -1891,12 +2211,11 @@ class SettingsDialog(QDialog):
             field_name = self.active_list.item(current_row).text()
             
             # ИСПРАВЛЕНИЕ: Используем settings_manager
-            if field_name in self.parent.settings_manager.ordered_metadata_fields:
+            if self.parent.settings_manager.has_ordered_field(field_name):
                 self.parent.settings_manager.ordered_metadata_fields.remove(field_name)
                 self.parent.settings_manager.ordered_metadata_fields.insert(0, field_name)
-                self.parent.settings_manager.save_settings()
-                self.load_current_settings()
-                self.active_list.setCurrentRow(0)
+                self.mark_settings_changed()
+                self._reposition_active_item(field_name)
 
     def move_field_bottom(self):
         """Перемещает выбранное поле в конец списка"""
@@ -1905,12 +2224,11 @@ class SettingsDialog(QDialog):
             field_name = self.active_list.item(current_row).text()
             
             # ИСПРАВЛЕНИЕ: Используем settings_manager
-            if field_name in self.parent.settings_manager.ordered_metadata_fields:
+            if self.parent.settings_manager.has_ordered_field(field_name):
                 self.parent.settings_manager.ordered_metadata_fields.remove(field_name)
                 self.parent.settings_manager.ordered_metadata_fields.append(field_name)
-                self.parent.settings_manager.save_settings()
-                self.load_current_settings()
-                self.active_list.setCurrentRow(self.active_list.count() - 1)
+                self.mark_settings_changed()
+                self._reposition_active_item(field_name)
 
     def show_active_list_context_menu(self, position):
         current_row = self.active_list.currentRow()
@@ -1970,7 +2288,7 @@ class SettingsDialog(QDialog):
             current_color_data = self.parent.settings_manager.color_metadata[field_name]
             current_color = QColor(current_color_data['r'], current_color_data['g'], current_color_data['b'])
             
-            color = QColorDialog.getColor(current_color, self, f"Выберите цвет для поля '{field_name}'")
+            color = self.parent.pick_color(current_color, f"Выберите цвет для поля '{field_name}'")
             if color.isValid():
                 self.parent.settings_manager.color_metadata[field_name] = {
                     'r': color.red(),
@@ -1979,12 +2297,13 @@ class SettingsDialog(QDialog):
                     'removed': False
                 }
                 
-                self.parent.settings_manager.save_settings()
-                self.load_current_settings()
+                self.mark_settings_changed()
+                self._recolor_list_item(self._active_items, field_name,
+                                        self.parent.settings_manager.color_metadata[field_name])
                 
                 if hasattr(self.parent, 'metadata_manager'):
-                    # ИСПОЛЬЗОВАТЬ update_metadata_colors вместо перечитывания
-                    self.parent.metadata_manager.update_metadata_colors()
+                    # Меняется только цвет — перекрашиваем строку без перестройки таблицы
+                    self.parent.metadata_manager.recolor_field(field_name)
 
     def change_sequence_color(self, seq_type):
         """Изменяет цвет типа последовательности"""
@@ -1993,7 +2312,7 @@ class SettingsDialog(QDialog):
             current_color_data = self.parent.settings_manager.sequence_colors[seq_type]
             current_color = QColor(current_color_data['r'], current_color_data['g'], current_color_data['b'])
             
-            color = QColorDialog.getColor(current_color, self, f"Выберите цвет для типа '{seq_type}'")
+            color = self.parent.pick_color(current_color, f"Выберите цвет для типа '{seq_type}'")
             if color.isValid():
                 self.parent.settings_manager.sequence_colors[seq_type] = {
                     'r': color.red(),
@@ -2001,15 +2320,13 @@ class SettingsDialog(QDialog):
                     'b': color.blue()
                 }
                 
+                self.mark_settings_changed()
                 
-                self.parent.settings_manager.save_settings()
-                
-                
-                self.load_current_settings()
-                
+                self._recolor_list_item(self._sequence_items, seq_type,
+                                        self.parent.settings_manager.sequence_colors[seq_type])
                 
                 if hasattr(self.parent, 'tree_manager'):
-                    self.parent.tree_manager.update_sequences_colors()
+                    self.parent.tree_manager.schedule_colors_refresh()
 
 
 
@@ -2675,8 +2992,8 @@ class CameraEditorDialog(QDialog):
         """Загружает данные камер из JSON файла"""
         try:
             if os.path.exists(CAMERA_SENSOR_DATA_FILE):
-                with open(CAMERA_SENSOR_DATA_FILE, 'r', encoding='utf-8') as f:
-                    self.camera_data = json.load(f)
+                with open(CAMERA_SENSOR_DATA_FILE, 'rb') as f:
+                    self.camera_data = json_loads(f.read())
                 if self.parent_window and hasattr(self.parent_window, 'debug_logger'):
                     self.parent_window.debug_logger.log(f"Данные камер загружены из {CAMERA_SENSOR_DATA_FILE}")
             else:
@@ -2701,8 +3018,7 @@ class CameraEditorDialog(QDialog):
     def save_camera_data(self):
         """Сохраняет данные камер в JSON файл"""
         try:
-            with open(CAMERA_SENSOR_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.camera_data, f, ensure_ascii=False, indent=2)
+            write_settings_file(CAMERA_SENSOR_DATA_FILE, self.camera_data)
             if self.parent_window and hasattr(self.parent_window, 'debug_logger'):
                 self.parent_window.debug_logger.log(f"Данные камер сохранены в {CAMERA_SENSOR_DATA_FILE}")
         except Exception as e:
@@ -2781,7 +3097,7 @@ class CameraEditorDialog(QDialog):
                 'resolution_rules': resolution_rules
             }
             # ДОБАВИТЬ: сразу сохраняем настройки
-            self.parent_window.settings_manager.save_settings()
+            self.parent_window.settings_manager.schedule_save()
 
 
     def load_rules_from_settings(self):
@@ -2925,7 +3241,7 @@ class CameraEditorDialog(QDialog):
         # Уведомляем родительское окно об изменениях
         if self.parent_window:
             self.parent_window.camera_manager.load_camera_data()
-            self.parent_window.settings_manager.save_settings()
+            self.parent_window.settings_manager.schedule_save()
         
         super().accept()
 
@@ -3093,6 +3409,67 @@ class CameraEditorDialog(QDialog):
 
 
 
+def is_rgb_dict(value):
+    """Проверяет, что значение — словарь цвета с ключами r, g, b"""
+    return isinstance(value, dict) and 'r' in value and 'g' in value and 'b' in value
+
+
+def clean_rgb_dict(colors):
+    """Возвращает копию словаря цветов только с корректными записями"""
+    if not isinstance(colors, dict):
+        return {}
+    return {name: color_data for name, color_data in colors.items() if is_rgb_dict(color_data)}
+
+
+def write_settings_file(settings_file, settings):
+    """Сериализует настройки в JSON и атомарно записывает их в файл"""
+    write_file_atomic(settings_file, json_dumps_pretty(settings))
+
+
+def write_file_atomic(path, data):
+    """Атомарно записывает готовые байты в файл через временный файл и os.replace"""
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.replace(tmp_path, path)
+        except PermissionError:
+            # Windows не дает заменить файл, открытый другим процессом (антивирус, индексатор) — пишем напрямую
+            with open(path, 'wb') as f:
+                f.write(data)
+            os.remove(tmp_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SettingsSaveSignals(QObject):
+    """Сигналы фонового сохранения настроек"""
+    error = pyqtSignal(str)
+
+
+class SettingsSaveTask(QRunnable):
+    """Задача записи файла настроек в пуле потоков"""
+    
+    def __init__(self, settings_file, data):
+        super().__init__()
+        self.settings_file = settings_file
+        self.data = data
+        self.signals = SettingsSaveSignals()
+    
+    def run(self):
+        try:
+            write_file_atomic(self.settings_file, self.data)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+
+
 class SettingsManager:
     """Менеджер настроек приложения"""
     
@@ -3105,6 +3482,33 @@ class SettingsManager:
         self.removed_metadata = {}
         self.sequence_colors = {}
         self.ordered_metadata_fields = []
+        # Кэш QColor/QBrush по значению (r, g, b): не зависит от изменений color_metadata
+        self._qcolor_cache = {}
+        self._qbrush_cache = {}
+        # Кэш кисти по имени поля: поле -> (словарь цвета из color_metadata, QBrush или None).
+        # Записи color_metadata всегда заменяются новым словарем, поэтому запись валидна,
+        # пока в color_metadata лежит тот же самый объект
+        self._field_brush_cache = {}
+        # Отложенное сохранение: несколько изменений подряд записываются в файл один раз
+        self._save_pending = False
+        # Хеш последнего записанного содержимого: повторная запись тех же данных пропускается
+        self._last_saved_digest = None
+        self._save_timer = QTimer()
+        self._save_timer.setSingleShot(True)
+        self._save_timer.timeout.connect(self.flush_pending_save)
+        # Запись файла выполняется в отдельном пуле из одного потока: сохранения идут строго по порядку
+        self._save_pool = QThreadPool()
+        self._save_pool.setMaxThreadCount(1)
+        app = QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush_pending_save)
+        
+        # Индексы правил определения для проверки дубликатов за O(1):
+        # имя списка -> (список правил, его длина, множество ключей)
+        self._rule_indexes = {}
+        # Множество полей ordered_metadata_fields для проверки принадлежности за O(1):
+        # (список, его длина, множество). Перестановки внутри списка состав не меняют
+        self._ordered_fields_index = None
         self.use_art_for_mxf = False
         self.default_metadata_tool = 'mediainfo'
         self.camera_detection_settings = {
@@ -3123,94 +3527,217 @@ class SettingsManager:
         else:
             self.settings_file = "exr_viewer_settings.json"
         
+        # Папка настроек создается один раз, а не при каждой загрузке/сохранении
+        settings_dir = os.path.dirname(self.settings_file)
+        if settings_dir:
+            try:
+                os.makedirs(settings_dir, exist_ok=True)
+            except OSError as e:
+                self.debug_logger.log(f"Не удалось создать папку настроек: {e}", "ERROR")
+        
         self.load_settings()
 
     def load_settings(self):
         """Загружает настройки из файла"""
         try:
-            if SETTINGS_FILE_HARD:
-                settings_dir = os.path.dirname(SETTINGS_FILE_HARD)
-                if settings_dir and not os.path.exists(settings_dir):
-                    os.makedirs(settings_dir, exist_ok=True)
-                    
-            if os.path.exists(self.settings_file):
-                with open(self.settings_file, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
-                    
-                    self.color_metadata = settings.get('color_metadata', {})
-                    self.removed_metadata = settings.get('removed_metadata', {})
-                    self.sequence_colors = settings.get('sequence_colors', {})
-                    self.ordered_metadata_fields = settings.get('ordered_metadata_fields', [])
-                    self.use_art_for_mxf = settings.get('use_art_for_mxf', False)
-                    self.default_metadata_tool = settings.get('default_metadata_tool', 'mediainfo')
-                    
-                    if not self.ordered_metadata_fields and self.color_metadata:
-                        self.ordered_metadata_fields = list(self.color_metadata.keys())
-
-                    self.camera_detection_settings = settings.get('camera_detection', {
-                        'camera_rules': [],
-                        'resolution_rules': [
-                            {'field': 'dataWindow', 'type': 'range'},
-                            {'field': 'displayWindow', 'type': 'range'},
-                            {'field': 'DataWindow', 'type': 'range'},  # Добавляем с большой буквы
-                            {'field': 'DisplayWindow', 'type': 'range'},  # Добавляем с большой буквы
-                            {'field': 'width', 'type': 'single_w'},
-                            {'field': 'height', 'type': 'single_h'}
-                        ]
-                    })
-                        
+            try:
+                settings = json_loads(Path(self.settings_file).read_bytes())
+            except FileNotFoundError:
+                return
+            
+            # Записи цветов проверяются один раз при загрузке: дальше словари цветов содержат
+            # только корректные записи, и чтение цвета обходится проверкой на None
+            self.color_metadata = clean_rgb_dict(settings.get('color_metadata', {}))
+            self.removed_metadata = clean_rgb_dict(settings.get('removed_metadata', {}))
+            self.sequence_colors = clean_rgb_dict(settings.get('sequence_colors', {}))
+            # Повторы в сохраненном порядке убираются при загрузке (иначе поле попадает в таблицу дважды)
+            self.ordered_metadata_fields = list(dict.fromkeys(settings.get('ordered_metadata_fields', [])))
+            self.use_art_for_mxf = settings.get('use_art_for_mxf', False)
+            self.default_metadata_tool = settings.get('default_metadata_tool', 'mediainfo')
+            
+            if not self.ordered_metadata_fields and self.color_metadata:
+                self.ordered_metadata_fields = list(self.color_metadata.keys())
+            
+            self.warm_field_brush_cache()
+
+            self.camera_detection_settings = settings.get('camera_detection', {
+                'camera_rules': [],
+                'resolution_rules': [
+                    {'field': 'dataWindow', 'type': 'range'},
+                    {'field': 'displayWindow', 'type': 'range'},
+                    {'field': 'DataWindow', 'type': 'range'},  # Добавляем с большой буквы
+                    {'field': 'DisplayWindow', 'type': 'range'},  # Добавляем с большой буквы
+                    {'field': 'width', 'type': 'single_w'},
+                    {'field': 'height', 'type': 'single_h'}
+                ]
+            })
+            self.ensure_rule_lists()
+            
         except Exception as e:
             self.debug_logger.log(f"Ошибка загрузки настроек: {e}", "ERROR")
             # Оставляем значения по умолчанию
+            self.ensure_rule_lists()
+
+    def ensure_rule_lists(self):
+        """Гарантирует наличие списков правил, чтобы добавление не требовало проверок"""
+        settings = self.camera_detection_settings
+        if not isinstance(settings, dict):
+            settings = self.camera_detection_settings = {}
+        for key in ('camera_rules', 'resolution_rules'):
+            if not isinstance(settings.get(key), list):
+                settings[key] = []
+
+    def schedule_save(self):
+        """Планирует сохранение настроек; каждое новое изменение откладывает запись"""
+        self._save_pending = True
+        self._save_timer.start(SETTINGS_SAVE_DELAY_MS)
+
+    def flush_pending_save(self):
+        """Немедленно выполняет запланированное сохранение и дожидается записи файла"""
+        if self._save_pending:
+            self._save_timer.stop()
+            self.save_settings(wait=True)
+        else:
+            self._save_pool.waitForDone()
 
-    def save_settings(self):
-        """Сохраняет настройки в файл"""
+    def save_settings(self, wait=False):
+        """Сохраняет настройки в файл (запись выполняется в отдельном потоке)"""
+        self._save_pending = False
         try:
-            if SETTINGS_FILE_HARD:
-                settings_dir = os.path.dirname(SETTINGS_FILE_HARD)
-                if settings_dir and not os.path.exists(settings_dir):
-                    os.makedirs(settings_dir, exist_ok=True)
-
             # Очистка данных цветов
-            cleaned_color_metadata = {}
-            for field_name, color_data in self.color_metadata.items():
-                if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                    cleaned_color_metadata[field_name] = color_data
-            
-            cleaned_removed_metadata = {}
-            for field_name, color_data in self.removed_metadata.items():
-                if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                    cleaned_removed_metadata[field_name] = color_data
-            
-            cleaned_sequence_colors = {}
-            for seq_type, color_data in self.sequence_colors.items():
-                if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                    cleaned_sequence_colors[seq_type] = color_data
+            cleaned_color_metadata = clean_rgb_dict(self.color_metadata)
+            cleaned_removed_metadata = clean_rgb_dict(self.removed_metadata)
+            cleaned_sequence_colors = clean_rgb_dict(self.sequence_colors)
             
+            # Снимок настроек сериализуется в потоке интерфейса: дальнейшие правки не влияют на запись
             settings = {
                 'color_metadata': cleaned_color_metadata,
                 'removed_metadata': cleaned_removed_metadata,
                 'sequence_colors': cleaned_sequence_colors,
-                'ordered_metadata_fields': self.ordered_metadata_fields,
+                'ordered_metadata_fields': list(self.ordered_metadata_fields),
                 'use_art_for_mxf': self.use_art_for_mxf,
                 'default_metadata_tool': self.default_metadata_tool,
                 'camera_detection': self.camera_detection_settings
             }
-            
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
+            data = json_dumps_pretty(settings)
+            
+            # Содержимое не изменилось с последней записи — файл не переписываем
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if digest != self._last_saved_digest:
+                self._last_saved_digest = digest
+                task = SettingsSaveTask(self.settings_file, data)
+                task.signals.error.connect(self.on_settings_save_error)
+                self._save_pool.start(task)
+            if wait:
+                self._save_pool.waitForDone()
                 
         except Exception as e:
             self.debug_logger.log(f"Ошибка сохранения настроек: {e}", "ERROR")
 
-    def get_field_color(self, field_name):
-        """Возвращает цвет для поля метаданных"""
-        if field_name in self.color_metadata:
-            color_data = self.color_metadata[field_name]
-            if isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-                if not color_data.get('removed', False):
-                    return QColor(color_data['r'], color_data['g'], color_data['b'])
-        return None
+    def on_settings_save_error(self, message):
+        """Сообщает об ошибке записи; следующее сохранение запишет файл заново"""
+        self._last_saved_digest = None
+        self.debug_logger.log(f"Ошибка сохранения настроек: {message}", "ERROR")
+
+    def _rule_index(self, rules_key, key_fields):
+        """Возвращает множество ключей правил, перестраивая его, если список правил был заменен или изменен"""
+        rules = self.camera_detection_settings.get(rules_key, [])
+        cached = self._rule_indexes.get(rules_key)
+        if cached is not None and cached[0] is rules and cached[1] == len(rules):
+            return cached[2]
+        index = {tuple(rule.get(field) for field in key_fields) for rule in rules}
+        self._rule_indexes[rules_key] = (rules, len(rules), index)
+        return index
+
+    def index_added_rule(self, rules_key, key_fields, rule):
+        """Добавляет в индекс только что добавленное правило без полного перестроения"""
+        cached = self._rule_indexes.get(rules_key)
+        rules = self.camera_detection_settings.get(rules_key, [])
+        if cached is not None and cached[0] is rules and cached[1] == len(rules) - 1:
+            cached[2].add(tuple(rule.get(field) for field in key_fields))
+            self._rule_indexes[rules_key] = (rules, len(rules), cached[2])
+
+    def has_camera_rule(self, field, value):
+        """Проверяет, существует ли правило камеры для пары поле/значение"""
+        return (field, value) in self._rule_index('camera_rules', ('field', 'value'))
+
+    def has_resolution_rule(self, field, rule_type):
+        """Проверяет, существует ли правило разрешения для пары поле/тип"""
+        return (field, rule_type) in self._rule_index('resolution_rules', ('field', 'type'))
+
+    def _ordered_fields_set(self):
+        """Возвращает множество полей порядка, перестраивая его, если список был заменен или изменилась длина"""
+        fields = self.ordered_metadata_fields
+        cached = self._ordered_fields_index
+        if cached is not None and cached[0] is fields and cached[1] == len(fields):
+            return cached[2]
+        index = set(fields)
+        self._ordered_fields_index = (fields, len(fields), index)
+        return index
+
+    def has_ordered_field(self, field_name):
+        """Проверяет за O(1), есть ли поле в списке порядка цветных полей"""
+        return field_name in self._ordered_fields_set()
+
+    def append_ordered_field(self, field_name):
+        """Добавляет поле в конец списка порядка, если его там нет"""
+        index = self._ordered_fields_set()
+        if field_name not in index:
+            self.ordered_metadata_fields.append(field_name)
+            index.add(field_name)
+            self._ordered_fields_index = (self.ordered_metadata_fields, len(self.ordered_metadata_fields), index)
+
+    def remove_ordered_field(self, field_name):
+        """Удаляет поле из списка порядка, если оно там есть"""
+        index = self._ordered_fields_set()
+        if field_name in index:
+            self.ordered_metadata_fields.remove(field_name)
+            index.discard(field_name)
+            self._ordered_fields_index = (self.ordered_metadata_fields, len(self.ordered_metadata_fields), index)
+
+    def get_sequence_brush(self, seq_type):
+        """Возвращает общую кисть фона для типа последовательности (или кисть по умолчанию)"""
+        color_data = self.sequence_colors.get(seq_type)
+        if color_data is not None:
+            return self.cached_qbrush(color_data['r'], color_data['g'], color_data['b'])
+        return self.cached_qbrush(240, 240, 240)
+
+    def get_field_brush(self, field_name):
+        """Возвращает общую кисть фона для поля метаданных (None, если поле не цветное)"""
+        color_data = self.color_metadata.get(field_name)
+        if color_data is None:
+            return None
+        cached = self._field_brush_cache.get(field_name)
+        if cached is not None and cached[0] is color_data:
+            return cached[1]
+        
+        brush = None
+        if not color_data.get('removed', False):
+            brush = self.cached_qbrush(color_data['r'], color_data['g'], color_data['b'])
+        self._field_brush_cache[field_name] = (color_data, brush)
+        return brush
+
+    def warm_field_brush_cache(self):
+        """Заранее строит кисти для всех цветных полей"""
+        self._field_brush_cache = {}
+        for field_name in self.color_metadata:
+            self.get_field_brush(field_name)
+
+    def cached_qbrush(self, r, g, b):
+        """Возвращает общий экземпляр QBrush для заданного RGB, создавая его один раз"""
+        rgb = (r, g, b)
+        brush = self._qbrush_cache.get(rgb)
+        if brush is None:
+            brush = self._qbrush_cache[rgb] = QBrush(self.cached_qcolor(r, g, b))
+        return brush
+
+    def cached_qcolor(self, r, g, b):
+        """Возвращает общий экземпляр QColor для заданного RGB, создавая его один раз"""
+        rgb = (r, g, b)
+        color = self._qcolor_cache.get(rgb)
+        if color is None:
+            color = self._qcolor_cache[rgb] = QColor(r, g, b)
+        return color
 
     def add_field_with_color(self, field_name, color):
         """Добавляет поле с выбранным цветом"""
@@ -3221,10 +3748,9 @@ class SettingsManager:
             'removed': False
         }
         
-        if field_name not in self.ordered_metadata_fields:
-            self.ordered_metadata_fields.append(field_name)
+        self.append_ordered_field(field_name)
         
-        self.save_settings()
+        self.schedule_save()
 
     def change_field_color(self, field_name, color):
         """Изменяет цвет поля"""
@@ -3235,42 +3761,37 @@ class SettingsManager:
                 'b': color.blue(),
                 'removed': False
             }
-            self.save_settings()
+            self.schedule_save()
 
     def remove_field_from_colors(self, field_name):
         """Удаляет поле из цветных в корзину"""
-        if field_name in self.color_metadata:
-            color_data = self.color_metadata[field_name]
+        color_data = self.color_metadata.pop(field_name, None)
+        if color_data is not None:
             self.removed_metadata[field_name] = color_data
-            del self.color_metadata[field_name]
             
-            if field_name in self.ordered_metadata_fields:
-                self.ordered_metadata_fields.remove(field_name)
+            self.remove_ordered_field(field_name)
             
-            self.save_settings()
+            self.schedule_save()
 
     def restore_field_from_trash(self, field_name):
         """Восстанавливает поле из корзины"""
-        if field_name in self.removed_metadata:
-            color_data = self.removed_metadata[field_name]
+        color_data = self.removed_metadata.pop(field_name, None)
+        if color_data is not None:
             self.color_metadata[field_name] = color_data
             
-            if field_name not in self.ordered_metadata_fields:
-                self.ordered_metadata_fields.append(field_name)
+            self.append_ordered_field(field_name)
             
-            del self.removed_metadata[field_name]
-            self.save_settings()
+            self.schedule_save()
 
     def delete_field_permanently(self, field_name):
         """Окончательно удаляет поле"""
-        if field_name in self.removed_metadata:
-            del self.removed_metadata[field_name]
-            self.save_settings()
+        if self.removed_metadata.pop(field_name, None) is not None:
+            self.schedule_save()
 
     def empty_trash(self):
         """Очищает корзину"""
         self.removed_metadata.clear()
-        self.save_settings()
+        self.schedule_save()
 
     def add_sequence_color(self, seq_type, color):
         """Добавляет цвет для типа последовательности"""
@@ -3279,7 +3800,7 @@ class SettingsManager:
             'g': color.green(),
             'b': color.blue()
         }
-        self.save_settings()
+        self.schedule_save()
 
     def change_sequence_color(self, seq_type, color):
         """Изменяет цвет типа последовательности"""
@@ -3289,13 +3810,13 @@ class SettingsManager:
                 'g': color.green(),
                 'b': color.blue()
             }
-            self.save_settings()
+            self.schedule_save()
 
     def delete_sequence_color(self, seq_type):
         """Удаляет цвет типа последовательности"""
         if seq_type in self.sequence_colors:
             del self.sequence_colors[seq_type]
-            self.save_settings()
+            self.schedule_save()
 
 
 
@@ -3317,8 +3838,8 @@ class CameraManager:
         """Загружает данные камер из JSON файла"""
         try:
             if os.path.exists(CAMERA_SENSOR_DATA_FILE):
-                with open(CAMERA_SENSOR_DATA_FILE, 'r', encoding='utf-8') as f:
-                    self.camera_data = json.load(f)
+                with open(CAMERA_SENSOR_DATA_FILE, 'rb') as f:
+                    self.camera_data = json_loads(f.read())
                 self.debug_logger.log(f"Данные камер загружены из {CAMERA_SENSOR_DATA_FILE}")
             else:
                 self.camera_data = {"cameras": {}}
@@ -3331,8 +3852,7 @@ class CameraManager:
     def save_camera_data(self):
         """Сохраняет данные камер в JSON файл"""
         try:
-            with open(CAMERA_SENSOR_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self.camera_data, f, ensure_ascii=False, indent=2)
+            write_settings_file(CAMERA_SENSOR_DATA_FILE, self.camera_data)
             self.debug_logger.log(f"Данные камер сохранены в {CAMERA_SENSOR_DATA_FILE}")
         except Exception as e:
             self.debug_logger.log(f"Ошибка сохранения данных камер: {e}", "ERROR")
@@ -3494,7 +4014,7 @@ class CameraManager:
             
             if rule_type == 'range':
                 # Ищем формат (min_x, min_y) - (max_x, max_y)
-                match = re.match(r'\((\d+),\s*(\d+)\)\s*-\s*\((\d+),\s*(\d+)\)', value_str)
+                match = _RE_BOX_RANGE.match(value_str)
                 if match:
                     min_x, min_y, max_x, max_y = map(int, match.groups())
                     width = max_x - min_x + 1
@@ -3503,7 +4023,7 @@ class CameraManager:
                     return width, height
                 
                 # Ищем формат четыре числа через пробелы
-                match = re.match(r'(\d+)\s+(\d+)\s+(\d+)\s+(\d+)', value_str)
+                match = _RE_BOX_FOUR_NUMBERS.match(value_str)
                 if match:
                     min_x, min_y, max_x, max_y = map(int, match.groups())
                     width = max_x - min_x + 1
@@ -3512,7 +4032,7 @@ class CameraManager:
                     return width, height
                 
                 # Ищем формат DataWindow: x1 y1 x2 y2
-                match = re.match(r'^(?:\w+\s*:\s*)?(\d+)\s+(\d+)\s+(\d+)\s+(\d+)$', value_str.strip())
+                match = _RE_BOX_DATA_WINDOW.match(value_str.strip())
                 if match:
                     min_x, min_y, max_x, max_y = map(int, match.groups())
                     width = max_x - min_x + 1
@@ -3524,33 +4044,33 @@ class CameraManager:
                 
             elif rule_type == 'single_w':
                 # Ищем только ширину
-                numbers = re.findall(r'\d+', value_str)
-                if numbers:
-                    width = int(numbers[0])
+                number = _RE_DIGIT_RUNS.search(value_str)
+                if number:
+                    width = int(number.group())
                     self.debug_logger.log(f"  [УСПЕХ] Распознана ширина: {width}")
                     return width
                 self.debug_logger.log(f"  [НЕУДАЧА] Не удалось распознать ширину")
                 
             elif rule_type == 'single_h':
                 # Ищем только высоту
-                numbers = re.findall(r'\d+', value_str)
-                if numbers:
-                    height = int(numbers[0])
+                number = _RE_DIGIT_RUNS.search(value_str)
+                if number:
+                    height = int(number.group())
                     self.debug_logger.log(f"  [УСПЕХ] Распознана высота: {height}")
                     return height
                 self.debug_logger.log(f"  [НЕУДАЧА] Не удалось распознать высоту")
                 
             elif rule_type == 'combined':
                 # Ищем формат WxH или W x H, включая символ × и скобки
-                match = re.match(r'\(?\s*(\d+)\s*[xX×:]\s*(\d+)\s*\)?', value_str)
+                match = _RE_COMBINED_RESOLUTION.match(value_str)
                 if match:
                     width, height = map(int, match.groups())
                     self.debug_logger.log(f"  [УСПЕХ] Распознан combined формат: {width}x{height}")
                     return width, height
                 
                 # Ищем отдельно ширину и высоту в тексте
-                width_match = re.search(r'[Ww]idth:\s*(\d+)', value_str)
-                height_match = re.search(r'[Hh]eight:\s*(\d+)', value_str)
+                width_match = _RE_WIDTH_FIELD.search(value_str)
+                height_match = _RE_HEIGHT_FIELD.search(value_str)
                 if width_match and height_match:
                     width = int(width_match.group(1))
                     height = int(height_match.group(1))
@@ -3579,8 +4099,9 @@ class CameraManager:
             'value': value,
             'camera': camera
         }
-        self.settings_manager.camera_detection_settings.setdefault('camera_rules', []).append(new_rule)
-        self.settings_manager.save_settings()
+        self.settings_manager.camera_detection_settings['camera_rules'].append(new_rule)
+        self.settings_manager.index_added_rule('camera_rules', ('field', 'value'), new_rule)
+        self.settings_manager.schedule_save()
 
     def add_resolution_rule(self, field, rule_type):
         """Добавляет правило для разрешения"""
@@ -3588,8 +4109,9 @@ class CameraManager:
             'field': field,
             'type': rule_type
         }
-        self.settings_manager.camera_detection_settings.setdefault('resolution_rules', []).append(new_rule)
-        self.settings_manager.save_settings()
+        self.settings_manager.camera_detection_settings['resolution_rules'].append(new_rule)
+        self.settings_manager.index_added_rule('resolution_rules', ('field', 'type'), new_rule)
+        self.settings_manager.schedule_save()
 
 
 
@@ -3610,6 +4132,14 @@ class TreeManager:
         
         # Ссылки на UI элементы
         self.sequences_tree = None
+        
+        # Сортировка дерева отключается на время поиска и включается один раз в конце
+        self._sorting_suspended = False
+        
+        # Отложенная перекраска: серия правок цветов приводит к одному обходу дерева
+        self._colors_refresh_timer = QTimer()
+        self._colors_refresh_timer.setSingleShot(True)
+        self._colors_refresh_timer.timeout.connect(self.update_sequences_colors)
 
     def setup_ui(self, sequences_tree):
         """Настраивает UI элементы дерева"""
@@ -3631,6 +4161,18 @@ class TreeManager:
         self.sequences_tree.setSortingEnabled(True)
         self.sequences_tree.setContextMenuPolicy(Qt.CustomContextMenu)
 
+    def suspend_sorting(self):
+        """Отключает сортировку дерева на время массового добавления последовательностей"""
+        if not self._sorting_suspended:
+            self._sorting_suspended = True
+            self.sequences_tree.setSortingEnabled(False)
+
+    def resume_sorting(self):
+        """Включает сортировку обратно: дерево сортируется один раз"""
+        if self._sorting_suspended:
+            self._sorting_suspended = False
+            self.sequences_tree.setSortingEnabled(True)
+
     def clear_tree(self):
         """Очищает дерево"""
         self.sequences_tree.clear()
@@ -3657,35 +4199,10 @@ class TreeManager:
     def add_sequence_to_tree(self, seq_info):
         """Добавляет последовательность в дерево в реальном времени"""
         try:
-            seq_path = seq_info['path']
-            display_name = seq_info.get('display_name', seq_info.get('name', 'Unknown'))
-            frame_range = seq_info.get('frame_range', '')
-            frame_count = seq_info.get('frame_count', 0)
-            seq_type = seq_info.get('type', 'unknown')
-            
-            self.debug_logger.log(f"add_sequence_to_tree: Добавляем '{display_name}' в папку '{seq_path}'")
-            
-            # Проверяем, что путь находится в корневой папке
-            root_path = self.main_window.ui_manager.folder_path.text()
-            if not seq_path.startswith(root_path):
-                self.debug_logger.log(f"  Пропускаем последовательность вне корневой папки: {seq_path}")
+            created = self.create_sequence_item(seq_info)
+            if created is None:
                 return
-            
-            # Находим или создаем родительскую папку
-            parent_item = self.find_or_create_folder_item(seq_path)
-            
-            # Создаем элемент последовательности
-            seq_item = QTreeWidgetItem([
-                display_name,
-                seq_type,
-                frame_range,
-                str(frame_count),
-                seq_path
-            ])
-            seq_item.setData(0, Qt.UserRole, {"type": "sequence", "info": seq_info})
-            
-            # Применяем цвет
-            self.color_tree_item_by_type(seq_item, seq_type)
+            parent_item, seq_item = created
             
             # Добавляем к родителю
             parent_item.addChild(seq_item)
@@ -3693,21 +4210,75 @@ class TreeManager:
             # Раскрываем путь до корня
             self.expand_path_to_root(parent_item)
             
-            self.debug_logger.log(f"Успешно добавлено в дерево: {display_name}")
+            self.debug_logger.log(f"Успешно добавлено в дерево: {seq_item.text(0)}")
             
         except Exception as e:
             self.debug_logger.log(f"Ошибка при добавлении в дерево: {str(e)}", "ERROR")
-            import traceback
             self.debug_logger.log(f"Трассировка: {traceback.format_exc()}", "ERROR")
 
-    def find_or_create_folder_item(self, folder_path):
-        """Находит или создает элементы папок для указанного пути"""
-        # Если папка уже существует, возвращаем ее
-        if folder_path in self.folder_items:
-            item = self.folder_items[folder_path]
-            item.setExpanded(True)
-            return item
-        
+    def add_sequences_to_tree(self, seq_infos):
+        """Добавляет пакет последовательностей: одна вставка дочерних элементов на папку"""
+        children_by_parent = {}
+        for seq_info in seq_infos:
+            try:
+                created = self.create_sequence_item(seq_info)
+            except Exception as e:
+                self.debug_logger.log(f"Ошибка при добавлении в дерево: {str(e)}", "ERROR")
+                self.debug_logger.log(f"Трассировка: {traceback.format_exc()}", "ERROR")
+                continue
+            if created is None:
+                continue
+            parent_item, seq_item = created
+            children_by_parent.setdefault(id(parent_item), (parent_item, []))[1].append(seq_item)
+        
+        for parent_item, seq_items in children_by_parent.values():
+            parent_item.addChildren(seq_items)
+            self.expand_path_to_root(parent_item)
+        
+        self.debug_logger.log(f"Пакет добавлен в дерево: {sum(len(items) for _, items in children_by_parent.values())} элементов")
+
+    def create_sequence_item(self, seq_info):
+        """Создает элемент последовательности и находит его папку; возвращает (папка, элемент) или None"""
+        seq_path = seq_info['path']
+        display_name = seq_info.get('display_name', seq_info.get('name', 'Unknown'))
+        frame_range = seq_info.get('frame_range', '')
+        frame_count = seq_info.get('frame_count', 0)
+        seq_type = seq_info.get('type', 'unknown')
+        
+        self.debug_logger.log(f"add_sequence_to_tree: Добавляем '{display_name}' в папку '{seq_path}'")
+        
+        # Проверяем, что путь находится в корневой папке
+        root_path = self.main_window.ui_manager.folder_path.text()
+        if not seq_path.startswith(root_path):
+            self.debug_logger.log(f"  Пропускаем последовательность вне корневой папки: {seq_path}")
+            return None
+        
+        # Находим или создаем родительскую папку
+        parent_item = self.find_or_create_folder_item(seq_path)
+        
+        # Создаем элемент последовательности
+        seq_item = QTreeWidgetItem([
+            display_name,
+            seq_type,
+            frame_range,
+            str(frame_count),
+            seq_path
+        ])
+        seq_item.setData(0, Qt.UserRole, {"type": "sequence", "info": seq_info})
+        
+        # Применяем цвет
+        self.color_tree_item_by_type(seq_item, seq_type)
+        
+        return parent_item, seq_item
+
+    def find_or_create_folder_item(self, folder_path):
+        """Находит или создает элементы папок для указанного пути"""
+        # Если папка уже существует, возвращаем ее
+        if folder_path in self.folder_items:
+            item = self.folder_items[folder_path]
+            item.setExpanded(True)
+            return item
+        
         self.debug_logger.log(f"find_or_create_folder_item: Создаем папку '{folder_path}'")
         
         root_path = self.main_window.ui_manager.folder_path.text()
@@ -3767,21 +4338,18 @@ class TreeManager:
         """Рекурсивно раскрывает все родительские элементы до корня"""
         current_item = item
         while current_item is not None:
-            current_item.setExpanded(True)
+            if not current_item.isExpanded():
+                current_item.setExpanded(True)
             current_item = current_item.parent()
 
     def color_tree_item_by_type(self, item, seq_type):
         """Подкрашивает элемент дерева в зависимости от типа последовательности"""
-        color_data = self.settings_manager.sequence_colors.get(seq_type)
-        if color_data and isinstance(color_data, dict) and 'r' in color_data and 'g' in color_data and 'b' in color_data:
-            color = QColor(color_data['r'], color_data['g'], color_data['b'])
-        else:
-            # Цвет по умолчанию
-            color = QColor(240, 240, 240)
+        # Одна общая кисть на тип: элементы не создают собственных QBrush из QColor
+        brush = self.settings_manager.get_sequence_brush(seq_type)
         
         # Применяем цвет ко всем столбцам
-        for col in range(self.sequences_tree.columnCount()):
-            item.setBackground(col, color)
+        for col in range(item.columnCount()):
+            item.setBackground(col, brush)
 
     def expand_all_tree_items(self):
         """Раскрывает все элементы дерева"""
@@ -4013,8 +4581,14 @@ class TreeManager:
             return None
         return selected_items[0].data(0, Qt.UserRole)
 
+    def schedule_colors_refresh(self):
+        """Планирует обновление цветов дерева на следующую итерацию цикла событий"""
+        if not self._colors_refresh_timer.isActive():
+            self._colors_refresh_timer.start(0)
+
     def update_sequences_colors(self):
         """Обновляет цвета в дереве последовательностей"""
+        self._colors_refresh_timer.stop()
         for i in range(self.sequences_tree.topLevelItemCount()):
             top_item = self.sequences_tree.topLevelItem(i)
             self.update_tree_item_colors(top_item)
@@ -4032,169 +4606,172 @@ class TreeManager:
 
 
 
-class MetadataManager:
-    """Менеджер для работы с метаданными файлов"""
+class MetadataModel(QAbstractTableModel):
+    """Модель таблицы метаданных: строки (поле, значение) с цветом фона и подсказками"""
     
-    def __init__(self, main_window, camera_manager, tool_manager):
-        self.main_window = main_window
-        self.camera_manager = camera_manager
-        self.tool_manager = tool_manager
-        self.debug_logger = main_window.debug_logger
-        self.settings_manager = main_window.settings_manager
-        
-        # Текущие метаданные
-        self.current_metadata = {}
-        self.current_sensor_info = {}
-        
-        # Принудительные настройки чтения
-        self.forced_metadata_tool = None
-        self.forced_metadata_file = None
-        
-        # Ссылки на UI элементы
-        self.metadata_table = None
-        self.metadata_source_label = None
-        self.search_input = None
-
-    def setup_ui(self, metadata_table, metadata_source_label, search_input):
-        """Настраивает UI элементы для метаданных"""
-        self.metadata_table = metadata_table
-        self.metadata_source_label = metadata_source_label
-        self.search_input = search_input
-        
-        # Настройка таблицы метаданных
-        self.metadata_table.setColumnCount(2)
-        self.metadata_table.setHorizontalHeaderLabels(["Поле", "Значение"])
-        
-        # Настройка размеров столбцов
-        for i, width in enumerate(DEFAULT_COLUMN_WIDTHS['metadata']):
-            self.metadata_table.setColumnWidth(i, width)
-        
-        # Настройка поведения заголовков
-        self.metadata_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
-        self.metadata_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.metadata_table.setColumnWidth(0, DEFAULT_COLUMN_WIDTHS['metadata'][0])
-        
-        self.metadata_table.setSelectionBehavior(QAbstractItemView.SelectRows)
-        self.metadata_table.setContextMenuPolicy(Qt.CustomContextMenu)
-
-
-    def _extract_shoot_datetime(self, metadata):
-        """Извлекает самую раннюю дату/время съёмки из метаданных."""
-        import datetime
-        import re
-
-        excluded_keys = ["Дата изменения", "Дата создания"]
-        candidate_datetimes = []
-
-        for key, value in metadata.items():
-            if key in excluded_keys:
-                continue
-
-            value_str = str(value)
-
-            # 1) ISO формат: YYYY-MM-DD HH:MM:SS или YYYY-MM-DD
-            iso_match = re.search(r'(\d{4}-\d{2}-\d{2})(?:\s+(\d{2}:\d{2}:\d{2}))?', value_str)
-            if iso_match:
-                date_part = iso_match.group(1)
-                time_part = iso_match.group(2)
-                try:
-                    if time_part:
-                        dt = datetime.datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
-                    else:
-                        dt = datetime.datetime.strptime(date_part, "%Y-%m-%d")
-                    candidate_datetimes.append(dt)
-                    continue
-                except Exception:
-                    pass
-
-            # 2) Поиск 6-значных групп: YYMMDD и, возможно, HHMMSS
-            six_digit_matches = re.findall(r'\b(\d{6})\b', value_str)
-            if six_digit_matches:
-                # Первая группа — дата (YYMMDD)
-                date_match = six_digit_matches[0]
-                try:
-                    y = int(date_match[0:2])
-                    m = int(date_match[2:4])
-                    d = int(date_match[4:6])
-                    year = 2000 + y   # предположим год 20xx
-                    dt = datetime.datetime(year, m, d)
+    HEADERS = ["Поле", "Значение"]
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._backgrounds = []
+        self._tooltips = {}
+        # Текст значений строится при первом обращении (отрисовка, поиск, копирование)
+        self._value_texts = {}
+        # Строки для поиска в нижнем регистре строятся при первом поиске по текущему набору строк
+        self._search_texts = None
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+    
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return self._rows[row][0]
+            return self.field_value(row)
+        if role == Qt.BackgroundRole:
+            return self._backgrounds[row]
+        if role == Qt.ToolTipRole:
+            return self._tooltips.get(row)
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+    
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+    
+    def set_rows(self, rows, backgrounds=None, tooltips=None):
+        """Заменяет содержимое модели (строки, кисти фона, подсказки по строкам) одним сбросом"""
+        self.beginResetModel()
+        self._rows = rows
+        self._backgrounds = backgrounds if backgrounds is not None else [None] * len(rows)
+        self._tooltips = tooltips or {}
+        self._value_texts = {}
+        self._search_texts = None
+        self.endResetModel()
+    
+    def clear(self):
+        """Очищает модель"""
+        self.set_rows([])
+    
+    def field_name(self, row):
+        return self._rows[row][0]
+    
+    def field_value(self, row):
+        """Возвращает текст значения строки, преобразуя его в строку при первом обращении"""
+        text = self._value_texts.get(row)
+        if text is None:
+            value = self._rows[row][1]
+            text = self._value_texts[row] = value if type(value) is str else str(value)
+        return text
+    
+    def search_texts(self):
+        """Возвращает пары (имя, значение) в нижнем регистре для поиска, вычисляя их один раз"""
+        if self._search_texts is None:
+            self._search_texts = [(name.lower(), self.field_value(row).lower())
+                                  for row, (name, _) in enumerate(self._rows)]
+        return self._search_texts
+    
+    def set_backgrounds(self, backgrounds):
+        """Заменяет фон всех строк без сброса модели (порядок строк не меняется)"""
+        self._backgrounds = backgrounds
+        if self._rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._rows) - 1, 1), [Qt.BackgroundRole])
+    
+    def set_row_background(self, row, brush):
+        """Меняет фон строки и уведомляет представление только об этой строке"""
+        self._backgrounds[row] = brush
+        self.dataChanged.emit(self.index(row, 0), self.index(row, 1), [Qt.BackgroundRole])
 
-                    # Вторая группа, если есть — время (HHMMSS)
-                    if len(six_digit_matches) > 1:
-                        time_match = six_digit_matches[1]
-                        h = int(time_match[0:2])
-                        mn = int(time_match[2:4])
-                        s = int(time_match[4:6])
-                        if 0 <= h < 24 and 0 <= mn < 60 and 0 <= s < 60:
-                            dt = dt.replace(hour=h, minute=mn, second=s)
-                    candidate_datetimes.append(dt)
-                except Exception:
-                    pass
 
-        if candidate_datetimes:
-            earliest = min(candidate_datetimes)
-            if earliest.time() == datetime.time(0, 0, 0):
-                return earliest.strftime("%d.%m.%Y")
-            else:
-                return earliest.strftime("%d.%m.%Y %H:%M:%S")
-        return None
+class MetadataCache:
+    """LRU-кэш результатов чтения (инструмент, путь, mtime_ns, размер) -> метаданные, общий для потоков"""
+    
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
 
+    def _key(self, tool, file_path):
+        """Возвращает ключ кэша для файла (меняется при изменении файла)"""
+        file_stats = os.stat(file_path)
+        return (tool, file_path, file_stats.st_mtime_ns, file_stats.st_size)
 
-    def display_metadata(self, file_path, extension, forced_tool=None):
-        """Отображает метаданные для файла"""
+    def get(self, tool, file_path):
+        """Возвращает закэшированные метаданные инструмента для файла или None"""
         try:
-            if not os.path.exists(file_path):
-                self.show_error(f"Файл не найден: {file_path}")
-                return
-            
-            # Сбрасываем принудительные настройки, если файл изменился
-            # ИСПРАВЛЕНИЕ: Используем sequence_manager вместо прямого обращения к current_sequence_files
-            current_files = self.main_window.sequence_manager.get_current_sequence_files()
-            if forced_tool is None and self.forced_metadata_file != file_path:
-                self.forced_metadata_tool = None
-                self.forced_metadata_file = None
-            
-            # Определяем инструмент для чтения
-            if forced_tool:
-                metadata_tool = forced_tool
-            elif self.forced_metadata_tool and self.forced_metadata_file == file_path:
-                metadata_tool = self.forced_metadata_tool
-            else:
-                metadata_tool = None
-            
-            self.debug_logger.log(f"Чтение метаданных для {file_path} с помощью {metadata_tool if metadata_tool else 'автоматического выбора'}")
-            
-            # Читаем метаданные
-            self.current_metadata = {}
-            metadata_source = self.read_metadata(file_path, extension, metadata_tool)
-            
-            # Добавляем базовую информацию о файле
-            self.add_file_info(file_path)
-            
-            # Определяем камеру и сенсор
-            sensor_size, detection_info, resolution_str = self.camera_manager.detect_camera_and_sensor(self.current_metadata)
-            self.current_sensor_info = {
-                'size': sensor_size,
-                'detection_info': detection_info
-            }
-            self.current_resolution_str = resolution_str   # сохраняем разрешение
-
-            # Форматируем и отображаем метаданные
-            self.format_and_display_metadata(metadata_source, forced_tool)
-            
-        except Exception as e:
-            self.show_error(f"Ошибка чтения метаданных: {str(e)}")
-            self.debug_logger.log(f"Общая ошибка чтения метаданных для {file_path}: {str(e)}", "ERROR")
+            key = self._key(tool, file_path)
+        except OSError:
+            return None
+        with self._lock:
+            metadata = self._entries.get(key)
+            if metadata is not None:
+                self._entries.move_to_end(key)
+        return metadata
 
-    def update_metadata_colors(self):
-        """Обновляет цвета в таблице метаданных"""
-        if not self.current_metadata:
+    def store(self, tool, file_path, metadata):
+        """Сохраняет метаданные инструмента для файла, вытесняя самые старые записи"""
+        try:
+            key = self._key(tool, file_path)
+        except OSError:
             return
-        
-        # Перерисовываем таблицу с текущими метаданными
-        if hasattr(self, 'last_metadata_source'):
-            self.format_and_display_metadata(self.last_metadata_source, None)
+        with self._lock:
+            self._entries[key] = metadata
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, file_path):
+        """Удаляет из кэша все результаты для указанного файла"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == file_path]:
+                del self._entries[key]
+
+    def clear(self):
+        """Очищает кэш целиком"""
+        with self._lock:
+            self._entries.clear()
+
+
+class MetadataReader:
+    """Читает метаданные файла по снимку настроек инструментов, без обращения к интерфейсу (работает в любом потоке)"""
+    
+    def __init__(self, tool_settings, cache, debug_logger):
+        self.tool_settings = tool_settings
+        self.cache = cache
+        self.debug_logger = debug_logger
+        self.metadata = {}
+        
+        # Форматтеры значений заголовка по имени класса: атрибуты OpenEXR/Imath и строки/байты
+        self._VALUE_FORMATTERS = {
+            'bytes': self._fmt_bytes,
+            'str': self._fmt_str,
+            'TimeCode': self._fmt_timecode,
+            'Box2i': self._fmt_box,
+            'Box2f': self._fmt_box,
+            'V2i': self._fmt_v2,
+            'V2f': self._fmt_v2,
+            'V3i': self._fmt_v3,
+            'V3f': self._fmt_v3,
+            'Rational': self._fmt_rational,
+        }
 
+    def read(self, file_path, extension, metadata_tool=None):
+        """Читает метаданные файла и возвращает пару (источник, словарь метаданных)"""
+        self.metadata = {}
+        metadata_source = self.read_metadata(file_path, extension, metadata_tool)
+        return metadata_source, self.metadata
 
     def read_metadata(self, file_path, extension, metadata_tool=None):
         """Читает метаданные файла с помощью указанного инструмента"""
@@ -4211,14 +4788,14 @@ class MetadataManager:
                     self.add_mediainfo_metadata(file_path)
                     metadata_source = f"MediaInfo ({'принудительно' if metadata_tool else 'сохранено'})"
                 else:
-                    self.current_metadata["MediaInfo Error"] = "MediaInfo не доступен"
+                    self.metadata["MediaInfo Error"] = "MediaInfo не доступен"
                     metadata_source = "MediaInfo Not Available"
             elif metadata_tool == 'exiftool':
-                if self.tool_manager.exiftool_available:
+                if self.tool_settings['exiftool_available']:
                     self.add_exiftool_metadata(file_path)
                     metadata_source = f"ExifTool ({'принудительно' if metadata_tool else 'сохранено'})"
                 else:
-                    self.current_metadata["ExifTool Error"] = "ExifTool не доступен"
+                    self.metadata["ExifTool Error"] = "ExifTool не доступен"
                     metadata_source = "ExifTool Not Available"
         else:
             # Автоматический выбор инструмента на основе типа файла
@@ -4241,30 +4818,43 @@ class MetadataManager:
     def read_exr_metadata(self, file_path):
         """Читает метаданные EXR файла"""
         try:
-            exr_file = OpenEXR.InputFile(file_path)
-            header = exr_file.header()
-            
-            for key, value in header.items():
-                self.current_metadata[key] = self.format_metadata_value(value)
-            
-            self.debug_logger.log(f"Прочитано {len(header)} метаданных EXR из {file_path}")
+            self.metadata.update(self.cache_exr_header(file_path))
             return "OpenEXR"
-            
         except Exception as e:
-            self.current_metadata["Ошибка чтения EXR"] = f"Не удалось прочитать EXR метаданные: {str(e)}"
+            self.metadata["Ошибка чтения EXR"] = f"Не удалось прочитать EXR метаданные: {str(e)}"
             self.debug_logger.log(f"Ошибка чтения EXR для {file_path}: {str(e)}", "ERROR")
             return "OpenEXR Error"
 
+    def cache_exr_header(self, file_path):
+        """Возвращает отформатированный заголовок EXR из кэша, при промахе читает его и сохраняет в кэш"""
+        cached = self.cache.get('openexr', file_path)
+        if cached is not None:
+            self.debug_logger.log(f"Метаданные EXR для {file_path} взяты из кэша")
+            return cached
+        
+        # Нужен только заголовок: файл закрывается сразу после его чтения.
+        # OpenEXR.File(header_only=True) не подходит — он возвращает значения numpy вместо Imath
+        exr_file = OpenEXR.InputFile(file_path)
+        try:
+            header = exr_file.header()
+        finally:
+            exr_file.close()
+        
+        exr_metadata = {key: self.format_metadata_value(value) for key, value in header.items()}
+        self.cache.store('openexr', file_path, exr_metadata)
+        self.debug_logger.log(f"Прочитано {len(header)} метаданных EXR из {file_path}")
+        return exr_metadata
+
     def read_r3d_metadata(self, file_path):
         """Читает метаданные R3D файла"""
-        if self.settings_manager.use_art_for_mxf and os.path.exists(REDLINE_TOOL_PATH):
+        if self.tool_settings['use_art_for_mxf'] and os.path.exists(REDLINE_TOOL_PATH):
             return self.read_redline_metadata(file_path)
         else:
             if PYMEDIAINFO_AVAILABLE:
                 self.add_mediainfo_metadata(file_path)
                 return "MediaInfo"
             else:
-                self.current_metadata["MediaInfo Error"] = "MediaInfo не доступен"
+                self.metadata["MediaInfo Error"] = "MediaInfo не доступен"
                 return "MediaInfo Not Available"
 
     def read_redline_metadata(self, file_path):
@@ -4316,7 +4906,7 @@ class MetadataManager:
                             if key.startswith("==="):
                                 continue
                                 
-                            self.current_metadata[f"RED {key}"] = value
+                            self.metadata[f"RED {key}"] = value
                             redline_metadata_count += 1
                     
                     if redline_metadata_count > 0:
@@ -4325,7 +4915,7 @@ class MetadataManager:
                     else:
                         error_msg = f"REDline не вернул метаданные (код {result.returncode})"
                         self.debug_logger.log(error_msg, "WARNING")
-                        self.current_metadata["REDline Error"] = error_msg
+                        self.metadata["REDline Error"] = error_msg
                         
                         # Fallback на MediaInfo
                         if PYMEDIAINFO_AVAILABLE:
@@ -4337,7 +4927,7 @@ class MetadataManager:
                 else:
                     error_msg = f"REDline не вернул данных (код {result.returncode})"
                     self.debug_logger.log(error_msg, "WARNING")
-                    self.current_metadata["REDline Error"] = error_msg
+                    self.metadata["REDline Error"] = error_msg
                     
                     # Fallback на MediaInfo
                     if PYMEDIAINFO_AVAILABLE:
@@ -4353,7 +4943,7 @@ class MetadataManager:
                     self.add_mediainfo_metadata(file_path)
                     return "MediaInfo (REDline timeout fallback)"
                 else:
-                    self.current_metadata["REDline Error"] = "REDline timeout"
+                    self.metadata["REDline Error"] = "REDline timeout"
                     return "REDline Timeout"
             except Exception as e:
                 self.debug_logger.log(f"Ошибка REDline: {str(e)}", "WARNING")
@@ -4361,7 +4951,7 @@ class MetadataManager:
                     self.add_mediainfo_metadata(file_path)
                     return "MediaInfo (REDline error fallback)"
                 else:
-                    self.current_metadata["REDline Error"] = f"REDline error: {str(e)}"
+                    self.metadata["REDline Error"] = f"REDline error: {str(e)}"
                     return "REDline Error"
             finally:
                 # Удаляем временный файл
@@ -4373,10 +4963,9 @@ class MetadataManager:
                         self.debug_logger.log(f"Ошибка удаления временного файла: {e}", "WARNING")
         except Exception as e:
             self.debug_logger.log(f"Общая ошибка в read_redline_metadata: {str(e)}", "ERROR")
-            self.current_metadata["REDline Error"] = f"Общая ошибка: {str(e)}"
+            self.metadata["REDline Error"] = f"Общая ошибка: {str(e)}"
             return "REDline Error"
 
-
     def read_exif_metadata(self, file_path):
         """Читает EXIF метаданные изображений"""
         try:
@@ -4386,16 +4975,16 @@ class MetadataManager:
             if tags:
                 for tag, value in tags.items():
                     formatted_value = self.format_exif_value(tag, value)
-                    self.current_metadata[f"EXIF {tag}"] = formatted_value
+                    self.metadata[f"EXIF {tag}"] = formatted_value
                 self.debug_logger.log(f"Прочитано {len(tags)} EXIF тегов из {file_path}")
                 return "exifread"
             else:
-                self.current_metadata["EXIF"] = "EXIF данные не найдены"
+                self.metadata["EXIF"] = "EXIF данные не найдены"
                 self.debug_logger.log(f"EXIF данные не найдены в {file_path}")
                 return "exifread"
                 
         except Exception as e:
-            self.current_metadata["Ошибка чтения EXIF"] = f"Не удалось прочитать EXIF метаданные: {str(e)}"
+            self.metadata["Ошибка чтения EXIF"] = f"Не удалось прочитать EXIF метаданные: {str(e)}"
             self.debug_logger.log(f"Ошибка чтения EXIF для {file_path}: {str(e)}", "ERROR")
             return "exifread Error"
 
@@ -4403,9 +4992,9 @@ class MetadataManager:
         """Читает метаданные изображений через Pillow"""
         try:
             with Image.open(file_path) as img:
-                self.current_metadata["Формат"] = img.format
-                self.current_metadata["Режим"] = img.mode
-                self.current_metadata["Размер"] = f"{img.width} x {img.height}"
+                self.metadata["Формат"] = img.format
+                self.metadata["Режим"] = img.mode
+                self.metadata["Размер"] = f"{img.width} x {img.height}"
                 
                 # Читаем EXIF данные
                 exif_data = img._getexif()
@@ -4413,35 +5002,35 @@ class MetadataManager:
                     for tag_id, value in exif_data.items():
                         tag_name = TAGS.get(tag_id, tag_id)
                         formatted_value = self.format_exif_value(tag_name, value)
-                        self.current_metadata[f"EXIF {tag_name}"] = formatted_value
+                        self.metadata[f"EXIF {tag_name}"] = formatted_value
                     self.debug_logger.log(f"Прочитано {len(exif_data)} EXIF тегов из {file_path}")
                 else:
-                    self.current_metadata["EXIF"] = "EXIF данные не найдены"
+                    self.metadata["EXIF"] = "EXIF данные не найдены"
                     self.debug_logger.log(f"EXIF данные не найдены в {file_path}")
                 
                 # Дополнительная информация
                 info = img.info
                 for key, value in info.items():
                     if key != 'exif':  # EXIF уже обработали
-                        self.current_metadata[key] = str(value)
+                        self.metadata[key] = str(value)
                         
             return "Pillow"
             
         except Exception as e:
-            self.current_metadata["Ошибка чтения"] = f"Не удалось прочитать метаданные изображения: {str(e)}"
+            self.metadata["Ошибка чтения"] = f"Не удалось прочитать метаданные изображения: {str(e)}"
             self.debug_logger.log(f"Ошибка чтения изображения для {file_path}: {str(e)}", "ERROR")
             return "Pillow Error"
 
     def read_mxf_metadata(self, file_path):
         """Читает метаданные MXF файлов"""
-        if self.settings_manager.use_art_for_mxf and os.path.exists(ARRI_REFERENCE_TOOL_PATH):
+        if self.tool_settings['use_art_for_mxf'] and os.path.exists(ARRI_REFERENCE_TOOL_PATH):
             return self.read_arri_metadata(file_path)
         else:
             if PYMEDIAINFO_AVAILABLE:
                 self.add_mediainfo_metadata(file_path)
                 return "MediaInfo"
             else:
-                self.current_metadata["MediaInfo Error"] = "MediaInfo не доступен"
+                self.metadata["MediaInfo Error"] = "MediaInfo не доступен"
                 return "MediaInfo Not Available"
 
     def read_arri_metadata(self, file_path):
@@ -4468,15 +5057,15 @@ class MetadataManager:
                 
                 if result.returncode == 0 and os.path.exists(temp_json_path):
                     # Читаем JSON с метаданными
-                    with open(temp_json_path, 'r', encoding='utf-8') as f:
-                        arri_metadata = json.load(f)
+                    with open(temp_json_path, 'rb') as f:
+                        arri_metadata = json_loads(f.read())
                     
                     # Разбираем JSON на отдельные ключи
                     flattened_metadata = self.flatten_json(arri_metadata)
                     
                     # Добавляем метаданные
                     for key, value in flattened_metadata.items():
-                        self.current_metadata[f"ARRI.{key}"] = self.format_metadata_value(value)
+                        self.metadata[f"ARRI.{key}"] = self.format_metadata_value(value)
                     
                     self.debug_logger.log(f"Прочитано {len(flattened_metadata)} метаданных ARRI из {file_path}")
                     return "ARRI Reference Tool"
@@ -4490,7 +5079,7 @@ class MetadataManager:
                         self.add_mediainfo_metadata(file_path)
                         return "MediaInfo (ART fallback)"
                     else:
-                        self.current_metadata["ARRI Tool Error"] = f"ARRI Tool failed: {result.stderr}"
+                        self.metadata["ARRI Tool Error"] = f"ARRI Tool failed: {result.stderr}"
                         return "ARRI Tool Failed"
                         
             except subprocess.TimeoutExpired:
@@ -4499,7 +5088,7 @@ class MetadataManager:
                     self.add_mediainfo_metadata(file_path)
                     return "MediaInfo (ART timeout fallback)"
                 else:
-                    self.current_metadata["ARRI Tool Error"] = "ARRI Tool timeout"
+                    self.metadata["ARRI Tool Error"] = "ARRI Tool timeout"
                     return "ARRI Tool Timeout"
             except Exception as e:
                 self.debug_logger.log(f"Ошибка ARRI Tool: {str(e)}", "WARNING")
@@ -4507,7 +5096,7 @@ class MetadataManager:
                     self.add_mediainfo_metadata(file_path)
                     return "MediaInfo (ART error fallback)"
                 else:
-                    self.current_metadata["ARRI Tool Error"] = f"ARRI Tool error: {str(e)}"
+                    self.metadata["ARRI Tool Error"] = f"ARRI Tool error: {str(e)}"
                     return "ARRI Tool Error"
             finally:
                 # Удаляем временный файл
@@ -4519,443 +5108,410 @@ class MetadataManager:
                         self.debug_logger.log(f"Ошибка удаления временного файла: {e}", "WARNING")
         except Exception as e:
             self.debug_logger.log(f"Общая ошибка в read_arri_metadata: {str(e)}", "ERROR")
-            self.current_metadata["ARRI Tool Error"] = f"Общая ошибка: {str(e)}"
+            self.metadata["ARRI Tool Error"] = f"Общая ошибка: {str(e)}"
             return "ARRI Tool Error"
 
-
     def read_with_default_tool(self, file_path):
         """Читает метаданные с помощью инструмента по умолчанию"""
-        if self.settings_manager.default_metadata_tool == 'ffprobe':
+        if self.tool_settings['default_metadata_tool'] == 'ffprobe':
+            # Для MP4/MOV сначала пробуем встроенный парсер атомов, чтобы не запускать процесс
+            if MP4_NATIVE_PARSER and os.path.splitext(file_path)[1].lower() in MP4_NATIVE_EXTENSIONS:
+                try:
+                    self.add_mp4_native_metadata(file_path)
+                    return "MP4 (встроенный парсер)"
+                except Exception as e:
+                    self.debug_logger.log(f"Встроенный парсер MP4 не справился с {file_path}: {str(e)}, используем FFprobe", "WARNING")
             self.add_ffprobe_metadata(file_path)
             return "FFprobe"
-        elif self.settings_manager.default_metadata_tool == 'mediainfo':
+        elif self.tool_settings['default_metadata_tool'] == 'mediainfo':
             if PYMEDIAINFO_AVAILABLE:
                 self.add_mediainfo_metadata(file_path)
                 return "MediaInfo"
             else:
-                self.current_metadata["MediaInfo Error"] = "MediaInfo не доступен"
+                self.metadata["MediaInfo Error"] = "MediaInfo не доступен"
                 return "MediaInfo Not Available"
-        elif self.settings_manager.default_metadata_tool == 'exiftool':
-            if self.tool_manager.exiftool_available:
+        elif self.tool_settings['default_metadata_tool'] == 'exiftool':
+            if self.tool_settings['exiftool_available']:
                 self.add_exiftool_metadata(file_path)
                 return "ExifTool"
             else:
-                self.current_metadata["ExifTool Error"] = "ExifTool не доступен"
+                self.metadata["ExifTool Error"] = "ExifTool не доступен"
                 return "ExifTool Not Available"
 
-    def add_file_info(self, file_path):
-        """Добавляет базовую информацию о файле"""
-        file_stats = os.stat(file_path)
-        self.current_metadata["Имя файла"] = os.path.basename(file_path)
-        self.current_metadata["Путь"] = file_path
-        self.current_metadata["Размер файла"] = f"{file_stats.st_size} байт ({file_stats.st_size / 1024 / 1024:.2f} MB)"
-        self.current_metadata["Дата создания"] = datetime.datetime.fromtimestamp(file_stats.st_ctime).strftime("%Y-%m-%d %H:%M:%S")
-        self.current_metadata["Дата изменения"] = datetime.datetime.fromtimestamp(file_stats.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-
-    def format_and_display_metadata(self, metadata_source, forced_tool=None):
-        """Форматирует и отображает метаданные в таблице"""
-
-            # Сохраняем источник для возможного обновления
-        self.last_metadata_source = metadata_source
-
-        self.debug_logger.log(f"Всего собрано {len(self.current_metadata)} метаданных")
-
-        # Добавляем принудительную пометку к источнику
-        if forced_tool:
-            metadata_source = f"{metadata_source} (принудительно)"
-
-        # Сортируем метаданные с учетом цветов
-        colored_metadata = {}
-        normal_metadata = {}
-        
-        for key, value in self.current_metadata.items():
-            if key in self.settings_manager.color_metadata and not self.settings_manager.color_metadata[key].get('removed', False):
-                colored_metadata[key] = value
-            else:
-                normal_metadata[key] = value
-        
-        # Сортируем цветные метаданные по порядку
-        sorted_colored = []
-        for field_name in self.settings_manager.ordered_metadata_fields:
-            if field_name in colored_metadata:
-                sorted_colored.append((field_name, colored_metadata[field_name]))
-        
-        # Добавляем остальные цветные метаданные
-        for field_name, value in colored_metadata.items():
-            if field_name not in self.settings_manager.ordered_metadata_fields:
-                sorted_colored.append((field_name, value))
-        
-        # Сортируем обычные метаданные
-        sorted_normal = sorted(normal_metadata.items())
-        
-        # Объединяем с информацией о сенсоре в начале
-        sorted_metadata = []
+    # Методы для чтения метаданных различными инструментами
+    def add_ffprobe_metadata(self, file_path):
+        """Добавляет метаданные через FFprobe"""
+        cached = self.cache.get('ffprobe', file_path)
+        if cached is not None:
+            self.metadata.update(cached)
+            self.debug_logger.log(f"FFprobe метаданные для {file_path} взяты из кэша")
+            return
         
-        sensor_display_value = self.current_sensor_info['size'] if self.current_sensor_info['size'] else "не определено"
-        sorted_metadata.append(("Detected Sensor", sensor_display_value))
-
-        sorted_metadata.extend(sorted_colored)
-        sorted_metadata.extend(sorted_normal)
-        
-        # Отображаем в таблице
-        self.metadata_table.setRowCount(len(sorted_metadata))
-        
-        for row, (key, value) in enumerate(sorted_metadata):
-            key_item = QTableWidgetItem(key)
-            key_item.setFlags(key_item.flags() & ~Qt.ItemIsEditable)
-            
-            value_item = QTableWidgetItem(str(value))
-            value_item.setFlags(value_item.flags() & ~Qt.ItemIsEditable)
-            
-            # Добавляем подсказку для сенсора
-            if key == "Detected Sensor":
-                detection_info = self.current_sensor_info.get('detection_info', [])
-                if detection_info:
-                    resolution_info = []
-                    camera_info = []
-                    actual_resolution = None
-                    actual_camera = None
-                    
-                    for info in detection_info:
-                        if "разрешение:" in info.lower():
-                            actual_resolution = info.replace("Разрешение:", "").strip()
-                        elif "камера:" in info.lower():
-                            actual_camera = info.replace("Камера:", "").strip()
-                        elif "разрешение" in info.lower() or "width" in info.lower() or "height" in info.lower():
-                            resolution_info.append(info)
-                        else:
-                            camera_info.append(info)
-                    
-                    tooltip_parts = []
-                    
-                    if actual_camera:
-                        tooltip_parts.append(f"Камера: {actual_camera}")
-                    if actual_resolution:
-                        tooltip_parts.append(f"Разрешение: {actual_resolution}")
-                    
-                    if tooltip_parts:
-                        tooltip_parts.append("")  
-                    
-                    if any("выбрано:" in info for info in resolution_info):
-                        tooltip_parts.append("Стратегия выбора: наибольшее разрешение")
-                    
-                    if camera_info:
-                        tooltip_parts.append("Камера определена по:")
-                        tooltip_parts.extend(camera_info)
-                    if resolution_info:
-                        if tooltip_parts:
-                            tooltip_parts.append("")  
-                        tooltip_parts.append("Разрешение определено по:")
-                        tooltip_parts.extend(resolution_info)
-                    
-                    tooltip_text = "\n".join(tooltip_parts)
-                else:
-                    tooltip_text = "Не удалось определить камеру или разрешение"
-                
-                key_item.setToolTip(tooltip_text)
-                value_item.setToolTip(tooltip_text)
-            
-            self.metadata_table.setItem(row, 0, key_item)
-            self.metadata_table.setItem(row, 1, value_item)
-            
-            # Применяем цвет
-            self.apply_field_color(row, key)
-
-
-        source_res = self.current_resolution_str if self.current_resolution_str else "не определено"
-
-        # Вычисляем реформат и аспект
-        reformat_res = "не определено"
-        aspect_str = "?"
-        if self.current_resolution_str and 'x' in self.current_resolution_str:
-            try:
-                w_str, h_str = self.current_resolution_str.split('x')
-                w = int(w_str)
-                h = int(h_str)
-                aspect = w / h
-                new_w = 2048
-                new_h = int(round(new_w / aspect))
-                reformat_res = f"{new_w}x{new_h}"
-                aspect_str = f"{aspect:.2f}"
-            except Exception:
-                pass
-
-
-
-        detection_info = self.current_sensor_info.get('detection_info', [])
-            
-
-        if detection_info:
-            # Форматируем информацию так же, как и в tooltip
-            resolution_info = []
-            camera_info = []
-            actual_resolution = None
-            actual_camera = None
-            
-            for info in detection_info:
-                if "разрешение:" in info.lower():
-                    actual_resolution = info.replace("Разрешение:", "").strip()
-                elif "камера:" in info.lower():
-                    actual_camera = info.replace("Камера:", "").strip()
-                elif "разрешение" in info.lower() or "width" in info.lower() or "height" in info.lower():
-                    resolution_info.append(info)
-                else:
-                    camera_info.append(info)
-            
-            detection_text = ""
-            
-            if actual_camera:
-                detection_text += f"Камера: {actual_camera}\n"
-            if actual_resolution:
-                detection_text += f"Разрешение: {actual_resolution}\n"
-            
-            if camera_info:
-                detection_text += "\nКамера определена по:\n"
-                detection_text += "\n".join(camera_info) + "\n"
-            
-            if resolution_info:
-                detection_text += "\nРазрешение определено по:\n"
-                detection_text += "\n".join(resolution_info)
-            
-            if "выбрано:" in detection_text.lower():
-                detection_text += "\nСтратегия выбора: наибольшее разрешение"
-            
-            self.main_window.detection_info_text.setPlainText(detection_text)
-        else:
-            self.main_window.detection_info_text.setPlainText("Не удалось определить камеру или разрешение")
-        
-    # Обновляем правое нижнее поле (итоговые значения) с новым форматом
-        sensor_size = self.current_sensor_info.get('size', 'не определено')
-        camera_name = None
-        for info in detection_info:
-            if info.startswith("Камера:"):
-                camera_name = info.replace("Камера:", "").strip()
-                break
-        
-    # Получаем информацию о количестве кадров из текущей последовательности
-        frame_count = "N/A"
-        if hasattr(self.main_window, 'sequence_manager') and self.main_window.sequence_manager.current_sequence_files:
-            frame_count = len(self.main_window.sequence_manager.current_sequence_files)
-        elif self.current_metadata.get("Имя файла"):
-            # Для одиночного файла
-            frame_count = 1
-
-        # Новый формат текста
-        result_text = f"FOCAL LENGTH:\n"
-        result_text += " \n"
-        result_text += f"FILMBACK: {camera_name if camera_name else 'не определена'}\n"
-        result_text += " \n"
-        result_text += f"DETECTED SENSOR {sensor_size}\n"
-        result_text += " \n"
-        result_text += f"SOURCE FRAMES: {frame_count}\n"
-        result_text += " \n"  # пустая строка перед блоком разрешений
-                # Получаем дату съёмки
-        shoot_datetime = self._extract_shoot_datetime(self.current_metadata)
-        if shoot_datetime:
-            result_text += f"Shoot Date: {shoot_datetime}\n"
-        result_text += " \n"   # пустая строка перед блоком разрешений
-        result_text += f"Source Resolution: {source_res}\n"
-        result_text += f"Reformat Resolution: {reformat_res}\n"
-        result_text += f"Aspect: {aspect_str}"
-        
-        self.main_window.sensor_camera_text.setPlainText(result_text)
-        
-        # Обновляем источник метаданных
-        current_files = self.main_window.sequence_manager.get_current_sequence_files()
-        if self.forced_metadata_tool and self.forced_metadata_file == (current_files[0] if current_files else None):
-            tool_name = METADATA_TOOLS.get(self.forced_metadata_tool, self.forced_metadata_tool)
-            self.metadata_source_label.setText(f"Метаданные выбранного элемента ({tool_name} - принудительно):")
-        else:
-            self.metadata_source_label.setText(f"Метаданные выбранного элемента ({metadata_source}):")
-        
-        self.clear_search()
-
-    def apply_field_color(self, row, field_name):
-        """Применяет цвет к полю в таблице"""
-        color = self.settings_manager.get_field_color(field_name)
-        if color:
-            for col in range(2):
-                item = self.metadata_table.item(row, col)
-                if item:
-                    item.setBackground(color)
-
-    def show_error(self, message):
-        """Показывает сообщение об ошибке в таблице"""
-        self.metadata_table.setRowCount(1)
-        self.metadata_table.setItem(0, 0, QTableWidgetItem("Ошибка"))
-        self.metadata_table.setItem(0, 1, QTableWidgetItem(message))
-        self.metadata_source_label.setText("Метаданные выбранного элемента: Ошибка")
-
-    def filter_metadata(self, search_text):
-        """Фильтрует таблицу метаданных по введенному тексту"""
-        search_text = search_text.lower().strip()
-        
-        if not search_text:
-            for row in range(self.metadata_table.rowCount()):
-                self.metadata_table.setRowHidden(row, False)
-            return
-        
-        for row in range(self.metadata_table.rowCount()):
-            field_item = self.metadata_table.item(row, 0)
-            value_item = self.metadata_table.item(row, 1)
-            
-            field_text = field_item.text().lower() if field_item else ""
-            value_text = value_item.text().lower() if value_item else ""
-            
-            if search_text in field_text or search_text in value_text:
-                self.metadata_table.setRowHidden(row, False)
-            else:
-                self.metadata_table.setRowHidden(row, True)
-
-    def clear_search(self):
-        """Очищает поле поиска и показывает все строки"""
-        self.search_input.clear()
-        for row in range(self.metadata_table.rowCount()):
-            self.metadata_table.setRowHidden(row, False)
-
-    def force_read_metadata(self, file_path, extension, tool):
-        """Принудительно читает метаданные с помощью указанного инструмента"""
-        self.debug_logger.log(f"Принудительное чтение метаданных для {file_path} с помощью {tool}")
-        
-        self.forced_metadata_tool = tool
-        self.forced_metadata_file = file_path
-        
-        self.display_metadata(file_path, extension, forced_tool=tool)
-
-    # Методы для чтения метаданных различными инструментами
-    def add_ffprobe_metadata(self, file_path):
-        """Добавляет метаданные через FFprobe"""
         try:
-            # Проверяем доступность FFprobe
-            result = subprocess.run(['ffprobe', '-version'], capture_output=True, text=True)
-            if result.returncode != 0:
-                self.current_metadata["Ошибка FFprobe"] = "FFprobe не доступен в системе"
-                self.debug_logger.log("FFprobe не доступен в системе", "WARNING")
-                return
-            
             cmd = [
                 'ffprobe', 
                 '-v', 'quiet',
                 '-print_format', 'json',
-                '-show_format',
-                '-show_streams',
-                '-show_chapters',
-                '-show_programs',
-                file_path
             ]
+            cmd += [f'-show_{section}' for section in FFPROBE_SECTIONS]
+            cmd.append(file_path)
             
             self.debug_logger.log(f"Запуск FFprobe: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            # Доступность FFprobe не проверяем отдельным запуском '-version':
+            # отсутствие программы видно по FileNotFoundError при старте процесса
+            try:
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except FileNotFoundError:
+                self.metadata["Ошибка FFprobe"] = "FFprobe не доступен в системе"
+                self.debug_logger.log("FFprobe не доступен в системе", "WARNING")
+                return
+            
+            # Читаем вывод как bytes: JSON разбирается напрямую, без промежуточного декодирования в str
+            try:
+                stdout, stderr = proc.communicate(timeout=30)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.communicate()
+                raise
             
-            if result.returncode == 0:
-                ffprobe_data = json.loads(result.stdout)
+            if proc.returncode == 0:
+                ffprobe_data = json_loads(stdout)
+                
+                # Собираем метаданные в локальный словарь и переносим их одним update
+                md = {}
+                format_value = self.format_ffprobe_value
                 
                 # Обрабатываем формат
                 if 'format' in ffprobe_data:
                     format_data = ffprobe_data['format']
                     for key, value in format_data.items():
                         if key != 'tags':  
-                            self.current_metadata[f"FFprobe Format - {key}"] = self.format_ffprobe_value(value)
+                            md[f"FFprobe Format - {key}"] = format_value(value)
                     
                     # Теги формата
                     if 'tags' in format_data:
                         for tag_key, tag_value in format_data['tags'].items():
-                            self.current_metadata[f"FFprobe Format Tag - {tag_key}"] = self.format_ffprobe_value(tag_value)
+                            md[f"FFprobe Format Tag - {tag_key}"] = format_value(tag_value)
                 
                 # Обрабатываем потоки
                 if 'streams' in ffprobe_data:
                     for i, stream in enumerate(ffprobe_data['streams']):
                         stream_type = stream.get('codec_type', 'unknown')
+                        # Префикс ключа формируем один раз на поток, а не на каждый тег
+                        prefix = f"FFprobe Stream {i} ({stream_type})"
                         for key, value in stream.items():
                             if key != 'tags' and key != 'disposition':
-                                self.current_metadata[f"FFprobe Stream {i} ({stream_type}) - {key}"] = self.format_ffprobe_value(value)
+                                md[f"{prefix} - {key}"] = format_value(value)
                         
                         # Теги потока
                         if 'tags' in stream:
                             for tag_key, tag_value in stream['tags'].items():
-                                self.current_metadata[f"FFprobe Stream {i} ({stream_type}) Tag - {tag_key}"] = self.format_ffprobe_value(tag_value)
+                                md[f"{prefix} Tag - {tag_key}"] = format_value(tag_value)
                         
                         # Диспозиции
                         if 'disposition' in stream:
                             for disp_key, disp_value in stream['disposition'].items():
                                 if disp_value == 1:  
-                                    self.current_metadata[f"FFprobe Stream {i} ({stream_type}) Disposition - {disp_key}"] = "Да"
+                                    md[f"{prefix} Disposition - {disp_key}"] = "Да"
                 
                 # Обрабатываем программы
                 if 'programs' in ffprobe_data:
                     for i, program in enumerate(ffprobe_data['programs']):
+                        prefix = f"FFprobe Program {i}"
                         for key, value in program.items():
                             if key != 'streams' and key != 'tags':
-                                self.current_metadata[f"FFprobe Program {i} - {key}"] = self.format_ffprobe_value(value)
+                                md[f"{prefix} - {key}"] = format_value(value)
                         
                         if 'tags' in program:
                             for tag_key, tag_value in program['tags'].items():
-                                self.current_metadata[f"FFprobe Program {i} Tag - {tag_key}"] = self.format_ffprobe_value(tag_value)
+                                md[f"{prefix} Tag - {tag_key}"] = format_value(tag_value)
                 
                 # Обрабатываем главы
                 if 'chapters' in ffprobe_data:
                     for i, chapter in enumerate(ffprobe_data['chapters']):
+                        prefix = f"FFprobe Chapter {i}"
                         for key, value in chapter.items():
                             if key != 'tags':
-                                self.current_metadata[f"FFprobe Chapter {i} - {key}"] = self.format_ffprobe_value(value)
+                                md[f"{prefix} - {key}"] = format_value(value)
                         
                         if 'tags' in chapter:
                             for tag_key, tag_value in chapter['tags'].items():
-                                self.current_metadata[f"FFprobe Chapter {i} Tag - {tag_key}"] = self.format_ffprobe_value(tag_value)
+                                md[f"{prefix} Tag - {tag_key}"] = format_value(tag_value)
+                
+                self.metadata.update(md)
+                self.cache.store('ffprobe', file_path, md)
                 
                 self.debug_logger.log(f"Прочитано {len(ffprobe_data)} разделов FFprobe из {file_path}")
                 
             else:
-                self.current_metadata["Ошибка FFprobe"] = f"FFprobe вернул ошибку: {result.stderr}"
-                self.debug_logger.log(f"Ошибка FFprobe для {file_path}: {result.stderr}", "ERROR")
+                stderr_text = stderr.decode('utf-8', 'replace')
+                self.metadata["Ошибка FFprobe"] = f"FFprobe вернул ошибку: {stderr_text}"
+                self.debug_logger.log(f"Ошибка FFprobe для {file_path}: {stderr_text}", "ERROR")
                 
         except subprocess.TimeoutExpired:
-            self.current_metadata["Ошибка FFprobe"] = "Таймаут выполнения FFprobe"
+            self.metadata["Ошибка FFprobe"] = "Таймаут выполнения FFprobe"
             self.debug_logger.log(f"Таймаут FFprobe для {file_path}", "ERROR")
         except Exception as e:
-            self.current_metadata["Ошибка FFprobe"] = f"Не удалось прочитать FFprobe метаданные: {str(e)}"
+            self.metadata["Ошибка FFprobe"] = f"Не удалось прочитать FFprobe метаданные: {str(e)}"
             self.debug_logger.log(f"Ошибка чтения FFprobe для {file_path}: {str(e)}", "ERROR")
 
+    def add_mp4_native_metadata(self, file_path):
+        """Читает метаданные MP4/MOV напрямую из атомов файла, без запуска FFprobe, с ключами как у FFprobe"""
+        info = {'format_tags': {}, 'streams': [], 'keys': []}
+        with open(file_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            self._walk_mp4_boxes(f, 0, file_size, [], info)
+        
+        if not info.get('timescale'):
+            raise ValueError("атом moov не найден")
+        
+        # Длительность потока, как и в FFprobe, берется из списка правок (elst), если он есть,
+        # а длительность файла — по самому позднему концу потока
+        movie_timescale = info['timescale']
+        duration = info['duration'] / movie_timescale
+        stream_ends = []
+        for stream in info['streams']:
+            fields = stream['fields']
+            timescale = stream.get('timescale')
+            if not timescale:
+                continue
+            if stream.get('edit_duration') is not None:
+                stream_duration = stream['edit_duration'] / movie_timescale
+                duration_ts = round(stream_duration * timescale)
+                stream_ends.append(stream['edit_start'] / movie_timescale + stream_duration)
+            else:
+                stream_duration = stream['duration'] / timescale
+                duration_ts = stream['duration']
+                stream_ends.append(stream_duration)
+            fields['time_base'] = f"1/{timescale}"
+            fields['duration_ts'] = str(duration_ts)
+            fields['duration'] = f"{stream_duration:.6f}"
+        if stream_ends:
+            duration = max(stream_ends)
+        
+        file_format = {
+            'filename': file_path,
+            'nb_streams': str(len(info['streams'])),
+            'format_name': 'mov,mp4,m4a,3gp,3g2,mj2',
+            'duration': f"{duration:.6f}",
+            'size': str(file_size),
+        }
+        if duration:
+            file_format['bit_rate'] = str(int(file_size * 8 / duration))
+        
+        md = {f"FFprobe Format - {key}": value for key, value in file_format.items()}
+        md.update((f"FFprobe Format Tag - {key}", value) for key, value in info['format_tags'].items())
+        for i, stream in enumerate(info['streams']):
+            fields = stream['fields']
+            prefix = f"FFprobe Stream {i} ({fields['codec_type']})"
+            md.update((f"{prefix} - {key}", value) for key, value in fields.items())
+            md.update((f"{prefix} Tag - {key}", value) for key, value in stream['tags'].items())
+        
+        self.metadata.update(md)
+        self.debug_logger.log(f"Прочитано {len(md)} полей MP4 из {file_path}")
+
+    def _walk_mp4_boxes(self, f, start, end, path, info):
+        """Рекурсивно обходит атомы MP4 в диапазоне [start, end)"""
+        pos = start
+        while pos + 8 <= end:
+            f.seek(pos)
+            size, name = struct.unpack('>I4s', f.read(8))
+            header_size = 8
+            if size == 1:
+                size = struct.unpack('>Q', f.read(8))[0]
+                header_size = 16
+            elif size == 0:
+                size = end - pos
+            if size < header_size or pos + size > end:
+                raise ValueError(f"повреждённый атом на смещении {pos}")
+            
+            body_start = pos + header_size
+            body_end = pos + size
+            box_path = path + [name.decode('latin-1')]
+            
+            if name in _MP4_CONTAINER_BOXES:
+                if name == b'trak':
+                    # Потоки нумеруются в порядке треков, тип потока известен только после hdlr
+                    info['streams'].append({'fields': {'index': str(len(info['streams'])), 'codec_type': 'data'}, 'tags': {}})
+                elif name == b'meta':
+                    info['keys'] = []
+                    # В MP4 meta — FullBox с 4 байтами версии/флагов, в QuickTime — обычный контейнер
+                    f.seek(body_start)
+                    peek = f.read(8)
+                    if len(peek) == 8 and peek[4:8] != b'hdlr':
+                        body_start += 4
+                self._walk_mp4_boxes(f, body_start, body_end, box_path, info)
+            elif (path and path[-1] == 'ilst') or name in (b'ftyp', b'mvhd', b'mdhd', b'elst', b'hdlr', b'stsd', b'keys') \
+                    or (path and path[-1] == 'udta' and (name[:1] == b'\xa9' or box_path[-1] in _MP4_TAG_NAMES)):
+                if body_end - body_start <= _MP4_MAX_LEAF_SIZE:
+                    f.seek(body_start)
+                    payload = f.read(body_end - body_start)
+                    self._parse_mp4_leaf(name, payload, path, info)
+            
+            pos = body_end
+
+    def _parse_mp4_leaf(self, name, payload, path, info):
+        """Извлекает значения из известных листовых атомов MP4 под теми же именами полей, что и FFprobe"""
+        in_trak = 'trak' in path
+        stream = info['streams'][-1] if in_trak and info['streams'] else None
+        tags = stream['tags'] if stream else info['format_tags']
+        atom = name.decode('latin-1')
+        parent = path[-1] if path else ''
+        
+        if parent == 'ilst':
+            # Элемент iTunes-метаданных: дочерний атом data с типом и значением.
+            # В метаданных QuickTime (mdta) имя элемента — номер ключа из атома keys
+            if len(payload) >= 16 and payload[4:8] == b'data':
+                index = struct.unpack('>I', name)[0]
+                if info['keys'] and 0 < index <= len(info['keys']):
+                    tag = info['keys'][index - 1]
+                else:
+                    tag = _MP4_TAG_NAMES.get(atom, atom)
+                data_type = struct.unpack('>I', payload[8:12])[0] & 0xFFFFFF
+                value = payload[16:]
+                if data_type == 1:
+                    tags[tag] = value.decode('utf-8', errors='replace')
+                elif data_type in (21, 22) and 0 < len(value) <= 8:
+                    tags[tag] = str(int.from_bytes(value, 'big', signed=data_type == 21))
+        elif parent == 'udta':
+            # Текстовый атом QuickTime в udta: длина, язык, текст
+            if len(payload) >= 4:
+                text_size = struct.unpack('>H', payload[:2])[0]
+                tags[_MP4_TAG_NAMES.get(atom, atom)] = payload[4:4 + text_size].decode('utf-8', errors='replace')
+        elif name == b'keys':
+            # Ключи метаданных mdta: размер, пространство имен, имя
+            keys = info['keys']
+            pos = 8
+            while pos + 8 <= len(payload):
+                key_size = struct.unpack('>I', payload[pos:pos + 4])[0]
+                if key_size < 8:
+                    break
+                keys.append(payload[pos + 8:pos + key_size].decode('utf-8', errors='replace'))
+                pos += key_size
+        elif name == b'ftyp':
+            if len(payload) >= 8:
+                tags['major_brand'] = payload[:4].decode('latin-1')
+                tags['minor_version'] = str(struct.unpack('>I', payload[4:8])[0])
+                tags['compatible_brands'] = payload[8:].decode('latin-1')
+        elif name in (b'mvhd', b'mdhd'):
+            if payload[0] == 1:
+                created, _, timescale, duration = struct.unpack('>QQIQ', payload[4:32])
+                language_offset = 32
+            else:
+                created, _, timescale, duration = struct.unpack('>IIII', payload[4:20])
+                language_offset = 20
+            if created:
+                created_at = _MP4_EPOCH + datetime.timedelta(seconds=created)
+                tags['creation_time'] = created_at.strftime('%Y-%m-%dT%H:%M:%S.000000Z')
+            if name == b'mvhd':
+                info['timescale'] = timescale
+                info['duration'] = duration
+            elif stream:
+                stream['timescale'] = timescale
+                stream['duration'] = duration
+                # Язык ISO 639-2 упакован тремя 5-битными буквами со смещением 0x60,
+                # в QuickTime вместо него может быть код языка Macintosh; 0x7FFF — язык не задан
+                language = struct.unpack('>H', payload[language_offset:language_offset + 2])[0]
+                if language < len(_MP4_MAC_LANGUAGES):
+                    tags['language'] = _MP4_MAC_LANGUAGES[language]
+                elif language >= 0x400 and language != 0x7FFF:
+                    tags['language'] = ''.join(chr(((language >> shift) & 0x1F) + 0x60) for shift in (10, 5, 0))
+        elif name == b'elst':
+            # Список правок: пустые правки (media_time = -1) сдвигают начало потока
+            if stream and len(payload) >= 8:
+                version = payload[0]
+                entry_format, entry_size = ('>Qq', 20) if version == 1 else ('>Ii', 12)
+                entry_count = struct.unpack('>I', payload[4:8])[0]
+                edit_start = edit_duration = 0
+                for pos in range(8, min(8 + entry_count * entry_size, len(payload) - entry_size + 1), entry_size):
+                    segment_duration, media_time = struct.unpack(entry_format, payload[pos:pos + entry_size - 4])
+                    if media_time == -1:
+                        edit_start += segment_duration
+                    else:
+                        edit_duration += segment_duration
+                stream['edit_start'] = edit_start
+                stream['edit_duration'] = edit_duration
+        elif name == b'hdlr':
+            # Тип и имя обработчика трека; hdlr атомов meta относится не к потоку
+            if stream and parent == 'mdia':
+                stream['fields']['codec_type'] = _MP4_CODEC_TYPES.get(payload[8:12].decode('latin-1'), 'data')
+                handler_name = payload[24:]
+                # В QuickTime имя — строка с байтом длины (тип компонента 'mhlr'/'dhlr' вместо нулей),
+                # в MP4 — строка, завершенная нулем
+                if handler_name and (payload[4:8] != b'\x00\x00\x00\x00' or handler_name[0] == len(handler_name) - 1):
+                    handler_name = handler_name[1:1 + handler_name[0]]
+                handler_name = handler_name.strip(b'\x00')
+                if handler_name:
+                    tags['handler_name'] = handler_name.decode('utf-8', errors='replace')
+        elif name == b'stsd':
+            # Кодек и параметры из первой записи описания сэмплов
+            if stream and len(payload) >= 16:
+                fields = stream['fields']
+                codec_tag = payload[12:16].decode('latin-1')
+                if codec_tag in _MP4_CODEC_NAMES:
+                    fields['codec_name'] = _MP4_CODEC_NAMES[codec_tag]
+                fields['codec_tag_string'] = codec_tag
+                if fields['codec_type'] == 'video' and len(payload) >= 44:
+                    width, height = struct.unpack('>HH', payload[40:44])
+                    fields['width'] = str(width)
+                    fields['height'] = str(height)
+                elif fields['codec_type'] == 'audio' and len(payload) >= 44:
+                    fields['sample_rate'] = str(struct.unpack('>I', payload[40:44])[0] >> 16)
+                # Код производителя кодека FFprobe выводит только для файлов QuickTime
+                if info['format_tags'].get('major_brand', 'qt  ') == 'qt  ' and len(payload) >= 32 \
+                        and fields['codec_type'] in ('video', 'audio'):
+                    tags['vendor_id'] = ''.join(
+                        chr(byte) if chr(byte).isalnum() or chr(byte) in ' ._-' else f"[{byte}]" for byte in payload[28:32])
+
     def add_mediainfo_metadata(self, file_path):
         """Добавляет метаданные через MediaInfo"""
+        cached = self.cache.get('mediainfo', file_path)
+        if cached is not None:
+            self.metadata.update(cached)
+            self.debug_logger.log(f"MediaInfo метаданные для {file_path} взяты из кэша")
+            return
+        
+        # Пары (ключ, значение) копим в списке и переносим в current_metadata одним update
+        items = []
         try:
             media_info = MediaInfo.parse(file_path)
             self.debug_logger.log(f"Прочитано {len(media_info.tracks)} треков MediaInfo из {file_path}")
             
             for track in media_info.tracks:
                 track_type = track.track_type
+                prefix = f"MediaInfo {track_type} - "
                 
                 # Разделитель для типа трека
-                self.current_metadata[f"MediaInfo - {track_type} Track"] = "---"
+                items.append((f"MediaInfo - {track_type} Track", "---"))
                 
-                # Читаем все атрибуты трека
-                for attribute_name in dir(track):
-                    # Пропускаем служебные атрибуты
-                    if attribute_name.startswith('_') or attribute_name in ['to_data', 'to_json']:
+                # Читаем все атрибуты трека напрямую из разобранного словаря (без обхода dir())
+                for attribute_name, attribute_value in track.to_data().items():
+                    # Добавляем только непустые значения
+                    if attribute_value is None:
+                        continue
+                    str_value = str(attribute_value)
+                    if not str_value.strip():
                         continue
                     
-                    try:
-                        attribute_value = getattr(track, attribute_name)
-                        
-                        # Добавляем только непустые значения
-                        if attribute_value is not None and str(attribute_value).strip() != '':
-                            # Ограничиваем длину значения
-                            str_value = str(attribute_value)
-                            if len(str_value) > 500:
-                                str_value = str_value[:500] + "... [урезано]"
-                            
-                            self.current_metadata[f"MediaInfo {track_type} - {attribute_name}"] = str_value
-                    except Exception as e:
-                        self.debug_logger.log(f"Ошибка чтения атрибута {attribute_name} для трека {track_type}: {str(e)}", "WARNING")
+                    # Ограничиваем длину значения
+                    if len(str_value) > 500:
+                        str_value = str_value[:500] + "... [урезано]"
+                    
+                    items.append((prefix + attribute_name, str_value))
+            
+            md = dict(items)
+            self.metadata.update(md)
+            self.cache.store('mediainfo', file_path, md)
                         
         except Exception as e:
-            self.current_metadata["Ошибка чтения MediaInfo"] = f"Не удалось прочитать MediaInfo метаданные: {str(e)}"
+            self.metadata.update(items)
+            self.metadata["Ошибка чтения MediaInfo"] = f"Не удалось прочитать MediaInfo метаданные: {str(e)}"
             self.debug_logger.log(f"Ошибка чтения MediaInfo для {file_path}: {str(e)}", "ERROR")
 
     def add_exiftool_metadata(self, file_path):
         """Добавляет метаданные через ExifTool"""
-        if not self.tool_manager.exiftool_available:
-            self.current_metadata["ExifTool Error"] = "ExifTool не доступен"
+        if not self.tool_settings['exiftool_available']:
+            self.metadata["ExifTool Error"] = "ExifTool не доступен"
             self.debug_logger.log("Попытка использовать недоступный ExifTool", "WARNING")
             return
 
@@ -4966,10 +5522,12 @@ class MetadataManager:
                 metadata_json = et.execute("-j", file_path)
             
             if metadata_json:
-                metadata_list = json.loads(metadata_json)
+                metadata_list = json_loads(metadata_json)
                 if metadata_list:
                     metadata = metadata_list[0]  # Берем первый (и обычно единственный) результат
                     
+                    items = []
+                    format_value = self.format_exiftool_value
                     for tag, value in metadata.items():
                         # Упрощаем имя тега
                         if ':' in tag:
@@ -4977,33 +5535,33 @@ class MetadataManager:
                         else:
                             display_tag = tag
                         
-                        formatted_value = self.format_exiftool_value(value)
-                        self.current_metadata[f"ExifTool {display_tag}"] = formatted_value
+                        items.append((f"ExifTool {display_tag}", format_value(value)))
+                    self.metadata.update(items)
                     
                     self.debug_logger.log(f"Прочитано {len(metadata)} метаданных ExifTool из {file_path}")
                 else:
-                    self.current_metadata["ExifTool"] = "Метаданные не найдены"
+                    self.metadata["ExifTool"] = "Метаданные не найдены"
                     self.debug_logger.log(f"ExifTool не нашел метаданных для {file_path}")
             else:
-                self.current_metadata["ExifTool"] = "Метаданные не найдены"
+                self.metadata["ExifTool"] = "Метаданные не найдены"
                 self.debug_logger.log(f"ExifTool не вернул данных для {file_path}")
                     
         except Exception as e:
             error_msg = f"Ошибка чтения ExifTool: {str(e)}"
-            self.current_metadata["ExifTool Error"] = error_msg
+            self.metadata["ExifTool Error"] = error_msg
             self.debug_logger.log(f"Ошибка чтения ExifTool для {file_path}: {str(e)}", "ERROR")
 
     # Методы форматирования значений
     def format_ffprobe_value(self, value):
         """Форматирует значение FFprobe для лучшего отображения"""
-        if isinstance(value, (int, float)):
-            return str(value)
-        elif isinstance(value, str):
+        # FFprobe отдает большинство значений строками, поэтому str проверяется первым
+        value_type = type(value)
+        if value_type is str:
             return value
-        elif isinstance(value, dict):
+        elif value_type is dict:
             return json.dumps(value, ensure_ascii=False)
-        elif isinstance(value, list):
-            return ", ".join(str(item) for item in value)
+        elif value_type is list:
+            return ", ".join(map(str, value))
         else:
             return str(value)
 
@@ -5042,178 +5600,749 @@ class MetadataManager:
         
         return str(value)
 
-    def format_exif_value(self, tag, value):
-        """Форматирует значение EXIF для лучшего отображения"""
-        try:
-            if isinstance(value, bytes):
-                try:
-                    return value.decode('utf-8').strip()
-                except UnicodeDecodeError:
-                    return str(value)
-            
-            # Специальное форматирование для определенных тегов
-            if tag in ['EXIF ExposureTime', 'EXIF ShutterSpeedValue']:
-                if hasattr(value, 'num') and hasattr(value, 'den'):
-                    return f"{value.num}/{value.den} сек"
-            
-            if tag in ['EXIF FNumber', 'EXIF ApertureValue']:
-                if hasattr(value, 'num') and hasattr(value, 'den'):
-                    return f"f/{value.num/value.den:.1f}"
-            
-            if tag == 'EXIF FocalLength':
-                if hasattr(value, 'num') and hasattr(value, 'den'):
-                    return f"{value.num/value.den} мм"
-            
-            if tag == 'EXIF ISOSpeedRatings':
-                return f"ISO {value}"
-            
-            return str(value)
+    def format_exif_value(self, tag, value):
+        """Форматирует значение EXIF для лучшего отображения"""
+        try:
+            if isinstance(value, bytes):
+                try:
+                    return value.decode('utf-8').strip()
+                except UnicodeDecodeError:
+                    return str(value)
+            
+            # Специальное форматирование для определенных тегов
+            formatter = _EXIF_FORMATTERS.get(tag)
+            if formatter is not None:
+                formatted = formatter(value)
+                if formatted is not None:
+                    return formatted
+            
+            return str(value)
+            
+        except Exception as e:
+            self.debug_logger.log(f"Ошибка форматирования EXIF тега {tag}: {str(e)}", "WARNING")
+            return str(value)
+
+    def _fmt_timecode(self, value):
+        """Форматирует TimeCode как ЧЧ:ММ:СС:КК с флагами"""
+        try:
+            time_str = f"{value.hours:02d}:{value.minutes:02d}:{value.seconds:02d}:{value.frame:02d}"
+            return f"{time_str} (dropFrame: {value.dropFrame}, colorFrame: {value.colorFrame}, fieldPhase: {value.fieldPhase})"
+        except Exception:
+            return self._fmt_timecode_from_str(str(value))
+
+    def _fmt_timecode_from_str(self, str_repr):
+        """Медленный путь: разбирает строковое представление TimeCode"""
+        fields = {}
+        for match in _RE_TIMECODE_FIELDS.finditer(str_repr):
+            if match.group(1):
+                fields.setdefault('time', match.group(2).strip())
+            else:
+                fields.setdefault(match.group(3), match.group(4))
+        
+        if 'time' in fields:
+            return (f"{fields['time']} (dropFrame: {fields.get('dropFrame', '?')}, "
+                    f"colorFrame: {fields.get('colorFrame', '?')}, fieldPhase: {fields.get('fieldPhase', '?')})")
+        return str_repr
+
+    def _fmt_box(self, value):
+        """Форматирует Box2i/Box2f"""
+        try:
+            return f"({value.min.x}, {value.min.y}) - ({value.max.x}, {value.max.y})"
+        except Exception:
+            return str(value)
+
+    def _fmt_v2(self, value):
+        """Форматирует V2i/V2f"""
+        try:
+            return f"({value.x}, {value.y})"
+        except Exception:
+            return str(value)
+
+    def _fmt_v3(self, value):
+        """Форматирует V3i/V3f"""
+        try:
+            return f"({value.x}, {value.y}, {value.z})"
+        except Exception:
+            return str(value)
+
+    def _fmt_rational(self, value):
+        """Форматирует Rational как дробь"""
+        try:
+            return f"{value.n}/{value.d}"
+        except Exception:
+            return str(value)
+
+    def format_metadata_value(self, value):
+        """Форматирует значение метаданных, убирая лишние символы"""
+        formatter = self._VALUE_FORMATTERS.get(type(value).__name__)
+        if formatter is not None:
+            return formatter(value)
+        
+        # Подклассы bytes/str не попадают в таблицу по имени класса
+        if isinstance(value, bytes):
+            return self._fmt_bytes(value)
+        if isinstance(value, str):
+            return self._fmt_str(value)
+        
+        return str(value)
+
+    def _fmt_bytes(self, value):
+        """Декодирует байтовое значение заголовка в строку"""
+        try:
+            decoded = value.decode('utf-8', errors='ignore').strip()
+            
+            if decoded.startswith("b'") and decoded.endswith("'"):
+                return unwrap_bytes_repr(decoded)
+            return decoded
+        except:
+            return str(value)
+
+    def _fmt_str(self, value):
+        """Снимает обертку b'...' со строкового значения"""
+        if value.startswith("b'") and value.endswith("'"):
+            return unwrap_bytes_repr(value)
+        return value
+
+    def flatten_json(self, json_data, parent_key='', separator='.'):
+        """
+        Рекурсивно разбирает JSON на отдельные ключи и значения
+        """
+        items = {}
+        if isinstance(json_data, dict):
+            for key, value in json_data.items():
+                new_key = f"{parent_key}{separator}{key}" if parent_key else key
+                if isinstance(value, (dict, list)):
+                    items.update(self.flatten_json(value, new_key, separator))
+                else:
+                    items[new_key] = value
+        elif isinstance(json_data, list):
+            for i, value in enumerate(json_data):
+                new_key = f"{parent_key}{separator}{i}" if parent_key else str(i)
+                if isinstance(value, (dict, list)):
+                    items.update(self.flatten_json(value, new_key, separator))
+                else:
+                    items[new_key] = value
+        else:
+            items[parent_key] = json_data
+        return items
+
+
+class MetadataManager:
+    """Менеджер для работы с метаданными файлов"""
+    
+    def __init__(self, main_window, camera_manager, tool_manager):
+        self.main_window = main_window
+        self.camera_manager = camera_manager
+        self.tool_manager = tool_manager
+        self.debug_logger = main_window.debug_logger
+        self.settings_manager = main_window.settings_manager
+        
+        # Текущие метаданные
+        self.current_metadata = {}
+        self.current_sensor_info = {}
+        
+        # Принудительные настройки чтения
+        self.forced_metadata_tool = None
+        self.forced_metadata_file = None
+        
+        # Фоновое чтение: номер актуального запроса (ответы на устаревшие запросы отбрасываются)
+        self._metadata_request_id = 0
+        self._metadata_task = None
+        
+        # Отложенная перерисовка цветов: серия правок приводит к одной перестройке таблицы
+        self._colors_refresh_timer = QTimer()
+        self._colors_refresh_timer.setSingleShot(True)
+        self._colors_refresh_timer.timeout.connect(self.update_metadata_colors)
+        
+        # Отложенный поиск: быстрый набор текста приводит к одной фильтрации таблицы
+        self._filter_timer = QTimer()
+        self._filter_timer.setSingleShot(True)
+        self._filter_timer.setInterval(50)
+        self._filter_timer.timeout.connect(self.apply_search_filter)
+        # Текст последней примененной фильтрации: уточнение запроса проверяет только видимые строки
+        self._last_filter_text = ''
+        
+        # Кэш результатов чтения, общий для читателей в фоновых задачах
+        self.metadata_cache = MetadataCache(METADATA_CACHE_SIZE)
+        
+        # Отдельный пул для предварительного чтения, чтобы оно не задерживало чтение по выбору пользователя
+        self._prefetch_pool = QThreadPool()
+        self._prefetch_pool.setMaxThreadCount(METADATA_PREFETCH_WORKERS)
+        self._prefetch_cancel = threading.Event()
+        self._prefetch_tasks = []
+        
+        # Строка таблицы для каждого поля и набор цветных полей на момент последнего отображения
+        self._row_by_field = {}
+        self._colored_fields = set()
+        
+        # Ссылки на UI элементы
+        self.metadata_table = None
+        self.metadata_model = None
+        self.metadata_source_label = None
+        self.search_input = None
+
+    def setup_ui(self, metadata_table, metadata_source_label, search_input):
+        """Настраивает UI элементы для метаданных"""
+        self.metadata_table = metadata_table
+        self.metadata_model = metadata_table.model()
+        self.metadata_source_label = metadata_source_label
+        self.search_input = search_input
+        
+        # Настройка размеров столбцов
+        for i, width in enumerate(DEFAULT_COLUMN_WIDTHS['metadata']):
+            self.metadata_table.setColumnWidth(i, width)
+        
+        # Настройка поведения заголовков
+        self.metadata_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Interactive)
+        self.metadata_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.metadata_table.setColumnWidth(0, DEFAULT_COLUMN_WIDTHS['metadata'][0])
+        
+        # Строки одинаковой высоты: заголовку строк не нужно пересчитывать размеры при заполнении
+        self.metadata_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        
+        self.metadata_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.metadata_table.setContextMenuPolicy(Qt.CustomContextMenu)
+
+    def _extract_shoot_datetime(self, metadata):
+        """Извлекает самую раннюю дату/время съёмки из метаданных."""
+        excluded_keys = ["Дата изменения", "Дата создания"]
+        candidate_datetimes = []
+
+        for key, value in metadata.items():
+            if key in excluded_keys:
+                continue
+
+            value_str = str(value)
+
+            # 1) ISO формат: YYYY-MM-DD HH:MM:SS или YYYY-MM-DD (без дефиса в строке разбор не нужен)
+            iso_match = _RE_ISO_DATETIME.search(value_str) if '-' in value_str else None
+            if iso_match:
+                date_part = iso_match.group(1)
+                time_part = iso_match.group(2)
+                try:
+                    if time_part:
+                        dt = datetime.datetime.strptime(f"{date_part} {time_part}", "%Y-%m-%d %H:%M:%S")
+                    else:
+                        dt = datetime.datetime.strptime(date_part, "%Y-%m-%d")
+                    candidate_datetimes.append(dt)
+                    continue
+                except Exception:
+                    pass
+
+            # 2) Поиск 6-значных групп: YYMMDD и, возможно, HHMMSS
+            six_digit_matches = _RE_SIX_DIGITS.findall(value_str)
+            if six_digit_matches:
+                # Первая группа — дата (YYMMDD)
+                date_match = six_digit_matches[0]
+                try:
+                    y = int(date_match[0:2])
+                    m = int(date_match[2:4])
+                    d = int(date_match[4:6])
+                    year = 2000 + y   # предположим год 20xx
+                    dt = datetime.datetime(year, m, d)
+
+                    # Вторая группа, если есть — время (HHMMSS)
+                    if len(six_digit_matches) > 1:
+                        time_match = six_digit_matches[1]
+                        h = int(time_match[0:2])
+                        mn = int(time_match[2:4])
+                        s = int(time_match[4:6])
+                        if 0 <= h < 24 and 0 <= mn < 60 and 0 <= s < 60:
+                            dt = dt.replace(hour=h, minute=mn, second=s)
+                    candidate_datetimes.append(dt)
+                except Exception:
+                    pass
+
+        if candidate_datetimes:
+            earliest = min(candidate_datetimes)
+            if earliest.time() == datetime.time(0, 0, 0):
+                return earliest.strftime("%d.%m.%Y")
+            else:
+                return earliest.strftime("%d.%m.%Y %H:%M:%S")
+        return None
+
+    def display_metadata(self, file_path, extension, forced_tool=None):
+        """Отображает метаданные для файла"""
+        try:
+            if not os.path.exists(file_path):
+                self.show_error(f"Файл не найден: {file_path}")
+                return
+            
+            # Сбрасываем принудительные настройки, если файл изменился
+            # ИСПРАВЛЕНИЕ: Используем sequence_manager вместо прямого обращения к current_sequence_files
+            current_files = self.main_window.sequence_manager.get_current_sequence_files()
+            if forced_tool is None and self.forced_metadata_file != file_path:
+                self.forced_metadata_tool = None
+                self.forced_metadata_file = None
+            
+            # Определяем инструмент для чтения
+            if forced_tool:
+                metadata_tool = forced_tool
+            elif self.forced_metadata_tool and self.forced_metadata_file == file_path:
+                metadata_tool = self.forced_metadata_tool
+            else:
+                metadata_tool = None
+            
+            self.debug_logger.log(f"Чтение метаданных для {file_path} с помощью {metadata_tool if metadata_tool else 'автоматического выбора'}")
+            
+            # Новый запрос делает устаревшими все незавершенные фоновые чтения
+            self._metadata_request_id += 1
+            request_id = self._metadata_request_id
+            self._metadata_task = None
+            
+            # Читаем метаданные
+            self.current_metadata = {}
+            if self.should_read_in_background(extension, metadata_tool):
+                # Внешние инструменты читаем в пуле потоков отдельным читателем, а пока показываем заглушку:
+                # определение камеры и построение таблицы выполняются один раз, по готовому результату
+                reader = self.create_reader(DeferredLogger())
+                task = MetadataReadTask(request_id, reader, file_path, extension, metadata_tool)
+                task.signals.finished.connect(
+                    lambda rid, source, metadata, log_entries:
+                        self.on_background_metadata_read(rid, file_path, source, metadata, log_entries, forced_tool))
+                self._metadata_task = task
+                QThreadPool.globalInstance().start(task)
+                
+                self.show_loading(file_path)
+                return
+            
+            metadata_source, self.current_metadata = self.create_reader().read(file_path, extension, metadata_tool)
+            self.complete_metadata_display(file_path, metadata_source, forced_tool)
+            
+        except Exception as e:
+            self.show_error(f"Ошибка чтения метаданных: {str(e)}")
+            self.debug_logger.log(f"Общая ошибка чтения метаданных для {file_path}: {str(e)}", "ERROR")
+
+    def create_reader(self, debug_logger=None):
+        """Создает читатель метаданных со снимком текущих настроек инструментов"""
+        tool_settings = {
+            'default_metadata_tool': self.settings_manager.default_metadata_tool,
+            'use_art_for_mxf': self.settings_manager.use_art_for_mxf,
+            'exiftool_available': self.tool_manager.exiftool_available,
+        }
+        return MetadataReader(tool_settings, self.metadata_cache, debug_logger or self.debug_logger)
+
+    def cancel_background_read(self):
+        """Отменяет отображение результата незавершенного фонового чтения"""
+        self._metadata_request_id += 1
+        self._metadata_task = None
+
+    def should_read_in_background(self, extension, metadata_tool):
+        """Определяет, нужно ли читать метаданные в фоне (все, кроме быстрого чтения заголовка EXR)"""
+        return metadata_tool is not None or extension.lower() != '.exr'
+
+    def on_background_metadata_read(self, request_id, file_path, metadata_source, metadata, log_entries, forced_tool):
+        """Принимает результат фонового чтения и отображает его, если запрос еще актуален"""
+        for message, level in log_entries:
+            self.debug_logger.log(message, level)
+        
+        if request_id != self._metadata_request_id:
+            self.debug_logger.log(f"Отброшен устаревший результат чтения метаданных для {file_path}")
+            return
+        
+        self._metadata_task = None
+        try:
+            self.current_metadata = metadata
+            self.complete_metadata_display(file_path, metadata_source, forced_tool)
+        except Exception as e:
+            self.show_error(f"Ошибка чтения метаданных: {str(e)}")
+            self.debug_logger.log(f"Общая ошибка чтения метаданных для {file_path}: {str(e)}", "ERROR")
+
+    def complete_metadata_display(self, file_path, metadata_source, forced_tool):
+        """Дополняет прочитанные метаданные информацией о файле, сенсоре и отображает их"""
+        # Добавляем базовую информацию о файле
+        self.add_file_info(file_path)
+        
+        # Определяем камеру и сенсор
+        sensor_size, detection_info, resolution_str = self.camera_manager.detect_camera_and_sensor(self.current_metadata)
+        self.current_sensor_info = {
+            'size': sensor_size,
+            'detection_info': detection_info
+        }
+        self.current_resolution_str = resolution_str   # сохраняем разрешение
+
+        # Форматируем и отображаем метаданные
+        self.format_and_display_metadata(metadata_source, forced_tool)
+
+    def recolor_field(self, field_name):
+        """Перекрашивает строку поля на месте; если меняется порядок строк — перестраивает таблицу"""
+        row = self._row_by_field.get(field_name)
+        brush = self.settings_manager.get_field_brush(field_name)
+        if row is None or brush is None or field_name not in self._colored_fields:
+            # Поле переходит между цветной и обычной частью таблицы — нужен полный пересчет порядка
+            self.schedule_color_refresh()
+            return
+        
+        self.metadata_model.set_row_background(row, brush)
+
+    def schedule_color_refresh(self):
+        """Планирует обновление цветов таблицы на следующую итерацию цикла событий"""
+        if not self._colors_refresh_timer.isActive():
+            self._colors_refresh_timer.start(0)
+
+    def update_metadata_colors(self):
+        """Обновляет цвета в таблице метаданных"""
+        self._colors_refresh_timer.stop()
+        if not self.current_metadata:
+            return
+        
+        sorted_metadata, colored_fields, backgrounds = self.build_sorted_metadata()
+        
+        # Порядок строк не изменился — меняем только фон, без сброса модели и пересчета панелей
+        if list(self._row_by_field) == [key for key, _ in sorted_metadata]:
+            self.metadata_model.set_backgrounds(backgrounds)
+            self._colored_fields = colored_fields
+            return
+        
+        # Перерисовываем таблицу с текущими метаданными
+        if hasattr(self, 'last_metadata_source'):
+            self.format_and_display_metadata(self.last_metadata_source, None)
+
+    def add_file_info(self, file_path):
+        """Добавляет базовую информацию о файле"""
+        file_stats = os.stat(file_path)
+        self.current_metadata["Имя файла"] = os.path.basename(file_path)
+        self.current_metadata["Путь"] = file_path
+        self.current_metadata["Размер файла"] = f"{file_stats.st_size} байт ({file_stats.st_size / 1024 / 1024:.2f} MB)"
+        self.current_metadata["Дата создания"] = datetime.datetime.fromtimestamp(file_stats.st_ctime).strftime("%Y-%m-%d %H:%M:%S")
+        self.current_metadata["Дата изменения"] = datetime.datetime.fromtimestamp(file_stats.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+
+    def build_sensor_tooltip(self):
+        """Формирует подсказку для поля Detected Sensor"""
+        detection_info = self.current_sensor_info.get('detection_info', [])
+        if not detection_info:
+            return "Не удалось определить камеру или разрешение"
+        
+        (actual_camera, actual_resolution, camera_info,
+         resolution_info, has_selected) = self._split_detection_info(detection_info)
+        
+        tooltip_parts = []
+        
+        if actual_camera:
+            tooltip_parts.append(f"Камера: {actual_camera}")
+        if actual_resolution:
+            tooltip_parts.append(f"Разрешение: {actual_resolution}")
+        
+        if tooltip_parts:
+            tooltip_parts.append("")  
+        
+        if has_selected:
+            tooltip_parts.append("Стратегия выбора: наибольшее разрешение")
+        
+        if camera_info:
+            tooltip_parts.append("Камера определена по:")
+            tooltip_parts.extend(camera_info)
+        if resolution_info:
+            if tooltip_parts:
+                tooltip_parts.append("")  
+            tooltip_parts.append("Разрешение определено по:")
+            tooltip_parts.extend(resolution_info)
+        
+        return "\n".join(tooltip_parts)
+
+    def _split_detection_info(self, detection_info):
+        """Разбирает строки detection_info на камеру, разрешение и источники их определения"""
+        resolution_info = []
+        camera_info = []
+        actual_resolution = None
+        actual_camera = None
+        has_selected = False
+        
+        for info in detection_info:
+            info_lower = info.lower()
+            if "разрешение:" in info_lower:
+                actual_resolution = info.replace("Разрешение:", "").strip()
+            elif "камера:" in info_lower:
+                actual_camera = info.replace("Камера:", "").strip()
+            elif "разрешение" in info_lower or "width" in info_lower or "height" in info_lower:
+                resolution_info.append(info)
+                if "выбрано:" in info:
+                    has_selected = True
+            else:
+                camera_info.append(info)
+        
+        return actual_camera, actual_resolution, camera_info, resolution_info, has_selected
+
+    def build_sorted_metadata(self):
+        """Возвращает строки таблицы в порядке отображения, набор цветных полей и фоны строк"""
+        # Сортируем метаданные с учетом цветов
+        colored_metadata = {}
+        colored_brushes = {}
+        normal_metadata = {}
+        
+        # Одна хеш-проверка на поле: словарь цветов берется в локальную переменную,
+        # кисть ищется только для цветных полей и сразу при разбиении
+        color_metadata = self.settings_manager.color_metadata
+        get_field_brush = self.settings_manager.get_field_brush
+        for key, value in self.current_metadata.items():
+            color_data = color_metadata.get(key)
+            if color_data is not None and not color_data.get('removed', False):
+                colored_metadata[key] = value
+                colored_brushes[key] = get_field_brush(key)
+            else:
+                normal_metadata[key] = value
+        
+        # Сортируем цветные метаданные по порядку
+        sorted_colored = []
+        for field_name in self.settings_manager.ordered_metadata_fields:
+            if field_name in colored_metadata:
+                sorted_colored.append((field_name, colored_metadata[field_name]))
+        
+        # Добавляем остальные цветные метаданные
+        for field_name, value in colored_metadata.items():
+            if not self.settings_manager.has_ordered_field(field_name):
+                sorted_colored.append((field_name, value))
+        
+        # Сортируем обычные метаданные
+        sorted_normal = sorted(normal_metadata.items())
+        
+        # Объединяем с информацией о сенсоре в начале
+        sorted_metadata = []
+        
+        sensor_display_value = self.current_sensor_info['size'] if self.current_sensor_info['size'] else "не определено"
+        sorted_metadata.append(("Detected Sensor", sensor_display_value))
+
+        sorted_metadata.extend(sorted_colored)
+        sorted_metadata.extend(sorted_normal)
+        
+        # Обычные поля не окрашены, поэтому их фоны заполняются без поиска
+        backgrounds = [get_field_brush("Detected Sensor")]
+        backgrounds.extend(colored_brushes[key] for key, _ in sorted_colored)
+        backgrounds.extend([None] * len(sorted_normal))
+        
+        return sorted_metadata, set(colored_metadata), backgrounds
+
+    def format_and_display_metadata(self, metadata_source, forced_tool=None):
+        """Форматирует и отображает метаданные в таблице"""
+
+            # Сохраняем источник для возможного обновления
+        self.last_metadata_source = metadata_source
+
+        self.debug_logger.log(f"Всего собрано {len(self.current_metadata)} метаданных")
+
+        # Добавляем принудительную пометку к источнику
+        if forced_tool:
+            metadata_source = f"{metadata_source} (принудительно)"
+
+        sorted_metadata, colored_fields, backgrounds = self.build_sorted_metadata()
+        
+        # Передаем в модель строки, цвета и подсказку одним сбросом модели:
+        # представление рисует только видимые строки, а текст значения строится при первом показе
+        tooltips = {0: self.build_sensor_tooltip()}  # Detected Sensor всегда первая строка
+        self.metadata_model.set_rows(sorted_metadata, backgrounds, tooltips)
+        
+        # Запоминаем строки полей и набор цветных полей для точечной перекраски
+        self._row_by_field = {key: row for row, (key, _) in enumerate(sorted_metadata)}
+        self._colored_fields = colored_fields
+
+
+        source_res = self.current_resolution_str if self.current_resolution_str else "не определено"
+
+        # Вычисляем реформат и аспект
+        reformat_res = "не определено"
+        aspect_str = "?"
+        if self.current_resolution_str and 'x' in self.current_resolution_str:
+            try:
+                w_str, h_str = self.current_resolution_str.split('x')
+                w = int(w_str)
+                h = int(h_str)
+                aspect = w / h
+                new_w = 2048
+                new_h = int(round(new_w / aspect))
+                reformat_res = f"{new_w}x{new_h}"
+                aspect_str = f"{aspect:.2f}"
+            except Exception:
+                pass
+
+
+
+        detection_info = self.current_sensor_info.get('detection_info', [])
             
-        except Exception as e:
-            self.debug_logger.log(f"Ошибка форматирования EXIF тега {tag}: {str(e)}", "WARNING")
-            return str(value)
 
-    def format_metadata_value(self, value):
-        """Форматирует значение метаданных, убирая лишние символы"""
-        if hasattr(value, '__class__'):
-            class_name = value.__class__.__name__
+        if detection_info:
+            # Форматируем информацию так же, как и в tooltip
+            actual_camera, actual_resolution, camera_info, resolution_info, _ = self._split_detection_info(detection_info)
             
-            if class_name == 'TimeCode':
-                try:
-                    hours = value.hours
-                    minutes = value.minutes
-                    seconds = value.seconds
-                    frame = value.frame
-                    drop_frame = value.dropFrame
-                    color_frame = value.colorFrame
-                    field_phase = value.fieldPhase
-                    
-                    time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}:{frame:02d}"
-                    return f"{time_str} (dropFrame: {drop_frame}, colorFrame: {color_frame}, fieldPhase: {field_phase})"
-                except Exception as e:
-                    str_repr = str(value)
-                    
-                    match = re.search(r'time:\s*([^,]+)', str_repr)
-                    if match:
-                        time_str = match.group(1).strip()
-                        
-                        drop_match = re.search(r'dropFrame:\s*(\d+)', str_repr)
-                        drop_frame = drop_match.group(1) if drop_match else '?'
-                        
-                        color_match = re.search(r'colorFrame:\s*(\d+)', str_repr)
-                        color_frame = color_match.group(1) if color_match else '?'
-                        
-                        field_match = re.search(r'fieldPhase:\s*(\d+)', str_repr)
-                        field_phase = field_match.group(1) if field_match else '?'
-                        
-                        return f"{time_str} (dropFrame: {drop_frame}, colorFrame: {color_frame}, fieldPhase: {field_phase})"
-                    return str_repr
+            detection_text = ""
             
-            elif class_name in ['Box2i', 'Box2f']:
-                try:
-                    min_x = value.min.x
-                    min_y = value.min.y
-                    max_x = value.max.x
-                    max_y = value.max.y
-                    return f"({min_x}, {min_y}) - ({max_x}, {max_y})"
-                except:
-                    return str(value)
+            if actual_camera:
+                detection_text += f"Камера: {actual_camera}\n"
+            if actual_resolution:
+                detection_text += f"Разрешение: {actual_resolution}\n"
             
-            elif class_name in ['V2i', 'V2f']:
-                try:
-                    x = value.x
-                    y = value.y
-                    return f"({x}, {y})"
-                except:
-                    return str(value)
+            if camera_info:
+                detection_text += "\nКамера определена по:\n"
+                detection_text += "\n".join(camera_info) + "\n"
             
-            elif class_name in ['V3i', 'V3f']:
-                try:
-                    x = value.x
-                    y = value.y
-                    z = value.z
-                    return f"({x}, {y}, {z})"
-                except:
-                    return str(value)
+            if resolution_info:
+                detection_text += "\nРазрешение определено по:\n"
+                detection_text += "\n".join(resolution_info)
             
-            elif class_name == 'Rational':
-                try:
-                    numerator = value.n
-                    denominator = value.d
-                    return f"{numerator}/{denominator}"
-                except:
-                    return str(value)
-        
-        if isinstance(value, bytes):
-            try:
-                decoded = value.decode('utf-8', errors='ignore').strip()
-                
-                if decoded.startswith("b'") and decoded.endswith("'"):
-                    try:
-                        return ast.literal_eval(decoded).decode('utf-8', errors='ignore')
-                    except:
-                        return decoded[2:-1]
-                return decoded
-            except:
-                return str(value)
+            if "выбрано:" in detection_text.lower():
+                detection_text += "\nСтратегия выбора: наибольшее разрешение"
+            
+            self.main_window.detection_info_text.setPlainText(detection_text)
+        else:
+            self.main_window.detection_info_text.setPlainText("Не удалось определить камеру или разрешение")
         
-        elif isinstance(value, str):
-            if value.startswith("b'") and value.endswith("'"):
-                try:
-                    return ast.literal_eval(value).decode('utf-8', errors='ignore')
-                except:
-                    return value[2:-1]
+    # Обновляем правое нижнее поле (итоговые значения) с новым форматом
+        sensor_size = self.current_sensor_info.get('size', 'не определено')
+        camera_name = None
+        for info in detection_info:
+            if info.startswith("Камера:"):
+                camera_name = info.replace("Камера:", "").strip()
+                break
         
-        return str(value)
-
-    def flatten_json(self, json_data, parent_key='', separator='.'):
-        """
-        Рекурсивно разбирает JSON на отдельные ключи и значения
-        """
-        items = {}
-        if isinstance(json_data, dict):
-            for key, value in json_data.items():
-                new_key = f"{parent_key}{separator}{key}" if parent_key else key
-                if isinstance(value, (dict, list)):
-                    items.update(self.flatten_json(value, new_key, separator))
-                else:
-                    items[new_key] = value
-        elif isinstance(json_data, list):
-            for i, value in enumerate(json_data):
-                new_key = f"{parent_key}{separator}{i}" if parent_key else str(i)
-                if isinstance(value, (dict, list)):
-                    items.update(self.flatten_json(value, new_key, separator))
-                else:
-                    items[new_key] = value
-        else:
-            items[parent_key] = json_data
-        return items
-    
+    # Получаем информацию о количестве кадров из текущей последовательности
+        frame_count = "N/A"
+        if hasattr(self.main_window, 'sequence_manager') and self.main_window.sequence_manager.current_sequence_files:
+            frame_count = len(self.main_window.sequence_manager.current_sequence_files)
+        elif self.current_metadata.get("Имя файла"):
+            # Для одиночного файла
+            frame_count = 1
 
-    def get_metadata_dict(self, file_path, extension):
-        """Читает метаданные файла и возвращает словарь, не затрагивая текущее состояние интерфейса"""
-        # Сохраняем текущее состояние
-        old_metadata = self.current_metadata
-        old_source = getattr(self, 'last_metadata_source', None)
+        # Новый формат текста
+        result_text = f"FOCAL LENGTH:\n"
+        result_text += " \n"
+        result_text += f"FILMBACK: {camera_name if camera_name else 'не определена'}\n"
+        result_text += " \n"
+        result_text += f"DETECTED SENSOR {sensor_size}\n"
+        result_text += " \n"
+        result_text += f"SOURCE FRAMES: {frame_count}\n"
+        result_text += " \n"  # пустая строка перед блоком разрешений
+                # Получаем дату съёмки
+        shoot_datetime = self._extract_shoot_datetime(self.current_metadata)
+        if shoot_datetime:
+            result_text += f"Shoot Date: {shoot_datetime}\n"
+        result_text += " \n"   # пустая строка перед блоком разрешений
+        result_text += f"Source Resolution: {source_res}\n"
+        result_text += f"Reformat Resolution: {reformat_res}\n"
+        result_text += f"Aspect: {aspect_str}"
         
-        # Создаём временный словарь
-        self.current_metadata = {}
+        self.main_window.sensor_camera_text.setPlainText(result_text)
+        
+        # Обновляем источник метаданных
+        current_files = self.main_window.sequence_manager.get_current_sequence_files()
+        if self.forced_metadata_tool and self.forced_metadata_file == (current_files[0] if current_files else None):
+            tool_name = METADATA_TOOLS.get(self.forced_metadata_tool, self.forced_metadata_tool)
+            self.metadata_source_label.setText(f"Метаданные выбранного элемента ({tool_name} - принудительно):")
+        else:
+            self.metadata_source_label.setText(f"Метаданные выбранного элемента ({metadata_source}):")
         
-        # Читаем метаданные (метод read_metadata заполнит self.current_metadata)
-        self.read_metadata(file_path, extension, metadata_tool=None)
+        self.clear_search()
+
+    def show_loading(self, file_path):
+        """Показывает в таблице строку-заглушку на время фонового чтения"""
+        self.metadata_model.set_rows([("Чтение метаданных...", os.path.basename(file_path))])
+        self._row_by_field = {}
+        self._colored_fields = set()
+        self.metadata_source_label.setText("Метаданные выбранного элемента (чтение...):")
+
+    def show_error(self, message):
+        """Показывает сообщение об ошибке в таблице"""
+        self.metadata_model.set_rows([("Ошибка", message)])
+        self.metadata_source_label.setText("Метаданные выбранного элемента: Ошибка")
+
+    def filter_metadata(self, search_text):
+        """Фильтрует таблицу метаданных по введенному тексту"""
+        search_text = search_text.lower().strip()
+        previous_text, self._last_filter_text = self._last_filter_text, search_text
         
-        # Копируем результат
-        result_metadata = self.current_metadata.copy()
+        if not search_text:
+            # Строки скрыты только после непустого запроса
+            if previous_text:
+                self.set_rows_hidden(lambda row: False)
+            return
+        if search_text == previous_text:
+            return
         
-        # Восстанавливаем состояние
-        self.current_metadata = old_metadata
-        self.last_metadata_source = old_source
+        search_texts = self.metadata_model.search_texts()
+        if previous_text and previous_text in search_text:
+            # Запрос уточнился: скрытые строки не могут подойти, проверяются только видимые
+            is_row_hidden = self.metadata_table.isRowHidden
+            self.set_rows_hidden(lambda row: is_row_hidden(row)
+                                 or (search_text not in search_texts[row][0]
+                                     and search_text not in search_texts[row][1]))
+            return
         
-        return result_metadata
+        self.set_rows_hidden(lambda row: search_text not in search_texts[row][0]
+                                         and search_text not in search_texts[row][1])
+
+    def schedule_filter(self):
+        """Перезапускает таймер поиска: фильтрация выполняется после паузы в наборе текста"""
+        self._filter_timer.start()
 
+    def apply_search_filter(self):
+        """Фильтрует таблицу по текущему тексту поля поиска"""
+        self.filter_metadata(self.search_input.text())
 
+    def set_rows_hidden(self, is_hidden):
+        """Скрывает строки по условию; перерисовка выключена на время всех изменений"""
+        metadata_table = self.metadata_table
+        metadata_table.setUpdatesEnabled(False)
+        try:
+            for row in range(self.metadata_model.rowCount()):
+                hidden = is_hidden(row)
+                # Строка трогается только при смене состояния: иначе заголовок пересчитывает секции впустую
+                if metadata_table.isRowHidden(row) != hidden:
+                    metadata_table.setRowHidden(row, hidden)
+        finally:
+            metadata_table.setUpdatesEnabled(True)
+
+    def clear_search(self):
+        """Очищает поле поиска и показывает все строки"""
+        # Строки показываются сразу, без отложенного поиска от сигнала изменения текста
+        self._filter_timer.stop()
+        self._last_filter_text = ''
+        if self.search_input.text():
+            self.search_input.blockSignals(True)
+            self.search_input.clear()
+            self.search_input.blockSignals(False)
+        self.set_rows_hidden(lambda row: False)
+
+    def force_read_metadata(self, file_path, extension, tool):
+        """Принудительно читает метаданные с помощью указанного инструмента"""
+        self.debug_logger.log(f"Принудительное чтение метаданных для {file_path} с помощью {tool}")
+        
+        # Явное перечитывание не должно возвращать результат из кэша
+        self.metadata_cache.invalidate(file_path)
+        
+        self.forced_metadata_tool = tool
+        self.forced_metadata_file = file_path
+        
+        self.display_metadata(file_path, extension, forced_tool=tool)
 
+    def prefetch_exr_metadata(self, file_paths):
+        """Читает заголовки EXR в кэш в фоновых потоках, отменяя предыдущее предварительное чтение"""
+        self.cancel_prefetch()
+        if not file_paths:
+            return
+        
+        cancel_event = self._prefetch_cancel
+        workers = min(METADATA_PREFETCH_WORKERS, len(file_paths))
+        # Ссылки на задачи держим, пока они не передадут сообщения лога через сигнал
+        self._prefetch_tasks = []
+        for worker in range(workers):
+            task = MetadataPrefetchTask(self.create_reader(DeferredLogger()), file_paths[worker::workers], cancel_event)
+            task.signals.finished.connect(self.on_prefetch_finished)
+            self._prefetch_tasks.append(task)
+            self._prefetch_pool.start(task)
+        self.debug_logger.log(f"Запущено предварительное чтение {len(file_paths)} заголовков EXR")
+
+    def on_prefetch_finished(self, log_entries):
+        """Переносит в лог сообщения завершившейся задачи предварительного чтения"""
+        for message, level in log_entries:
+            self.debug_logger.log(message, level)
+
+    def cancel_prefetch(self):
+        """Останавливает незавершенное предварительное чтение заголовков"""
+        self._prefetch_cancel.set()
+        self._prefetch_cancel = threading.Event()
 
+    def get_metadata_dict(self, file_path, extension):
+        """Читает метаданные файла и возвращает словарь, не затрагивая текущее состояние интерфейса"""
+        _, metadata = self.create_reader().read(file_path, extension)
+        return metadata
 
 
 class SequenceManager:
@@ -5251,7 +6380,7 @@ class SequenceManager:
         
         # Создаем и запускаем поиск
         self.sequence_finder = SequenceFinder(folder, self.debug_logger)
-        self.sequence_finder.sequence_found.connect(self.on_sequence_found)
+        self.sequence_finder.sequence_found.connect(self.on_sequences_found, Qt.QueuedConnection)
         self.sequence_finder.progress_update.connect(self.update_progress)  # Это подключение должно быть
         self.sequence_finder.finished_signal.connect(self.on_search_finished)
         
@@ -5276,14 +6405,57 @@ class SequenceManager:
             self.sequence_finder.continue_search()
             self.sequence_finder.start()
 
+    def on_sequences_found(self, sequences_batch):
+        """Обрабатывает пакет найденных последовательностей, перерисовывая дерево один раз"""
+        tree = None
+        if hasattr(self.main_window, 'tree_manager'):
+            tree = self.main_window.tree_manager.sequences_tree
+        
+        if tree is None:
+            for sequence_data in sequences_batch:
+                self.on_sequence_found(sequence_data)
+            return
+        
+        stored = [sequence_data for sequence_data in sequences_batch if self.store_sequence(sequence_data)]
+        if not stored:
+            return
+        
+        # Прогресс показывает последнюю последовательность пакета
+        last_data = stored[-1]
+        self.update_progress(f"Найдена последовательность: {last_data.get('display_name', last_data.get('name', 'Unknown'))}")
+        
+        sorting_enabled = tree.isSortingEnabled()
+        tree.setUpdatesEnabled(False)
+        tree.setSortingEnabled(False)
+        tree.blockSignals(True)
+        try:
+            self.main_window.tree_manager.add_sequences_to_tree(stored)
+        finally:
+            tree.blockSignals(False)
+            tree.setSortingEnabled(sorting_enabled)
+            tree.setUpdatesEnabled(True)
+
     def on_sequence_found(self, sequence_data):
         """Обрабатывает найденную последовательность"""
+        if not self.store_sequence(sequence_data):
+            return
+        
+        # Обновляем прогресс - показываем найденную последовательность
+        display_name = sequence_data.get('display_name', sequence_data.get('name', 'Unknown'))
+        self.update_progress(f"Найдена последовательность: {display_name}")
+        
+        # Добавляем в дерево через TreeManager
+        if hasattr(self.main_window, 'tree_manager'):
+            self.main_window.tree_manager.add_sequence_to_tree(sequence_data)
+        
+        self.debug_logger.log(f"--- КОНЕЦ ДОБАВЛЕНИЯ ПОСЛЕДОВАТЕЛЬНОСТИ ---\n")
+
+    def store_sequence(self, sequence_data):
+        """Дополняет и проверяет данные последовательности и сохраняет ее; возвращает True при успехе"""
         self.debug_logger.log(f"\n--- ПОЛУЧЕНА ПОСЛЕДОВАТЕЛЬНОСТЬ ---")
         self.debug_logger.log(f"Данные: {sequence_data}")
         
         # Обеспечиваем наличие всех необходимых ключей
-        required_keys = ['path', 'name', 'frame_range', 'frame_count', 'files', 'extension', 'type']
-        
         if 'name' not in sequence_data:
             sequence_data['name'] = os.path.basename(sequence_data.get('first_file', 'Unknown'))
         if 'display_name' not in sequence_data:
@@ -5296,35 +6468,23 @@ class SequenceManager:
             sequence_data['type'] = 'unknown'
         
         # Проверяем наличие обязательных ключей
-        missing_keys = [key for key in required_keys if key not in sequence_data]
+        missing_keys = [key for key in _SEQUENCE_REQUIRED_KEYS if key not in sequence_data]
         if missing_keys:
             self.debug_logger.log(f"ОШИБКА: Отсутствуют ключи: {missing_keys}", "ERROR")
-            return
+            return False
             
         # Проверяем, что обязательные поля не пустые
-        empty_fields = []
-        for key in ['path', 'name', 'extension']:
-            if not sequence_data.get(key):
-                empty_fields.append(key)
+        empty_fields = [key for key in _SEQUENCE_NONEMPTY_KEYS if not sequence_data.get(key)]
         
         if empty_fields:
             self.debug_logger.log(f"ОШИБКА: Пустые поля: {empty_fields}", "ERROR")
-            return
+            return False
             
-        # Сохраняем последовательность
+        # Сохраняем последовательность (повторный проход после "Продолжить" перезаписывает ту же запись)
         key = f"{sequence_data['path']}/{sequence_data['name']}"
         self.sequences[key] = sequence_data
         self.debug_logger.log(f"  Сохранено в словарь sequences с ключом: '{key}'")
-        
-        # Обновляем прогресс - показываем найденную последовательность
-        display_name = sequence_data.get('display_name', sequence_data.get('name', 'Unknown'))
-        self.update_progress(f"Найдена последовательность: {display_name}")
-        
-        # Добавляем в дерево через TreeManager
-        if hasattr(self.main_window, 'tree_manager'):
-            self.main_window.tree_manager.add_sequence_to_tree(sequence_data)
-        
-        self.debug_logger.log(f"--- КОНЕЦ ДОБАВЛЕНИЯ ПОСЛЕДОВАТЕЛЬНОСТИ ---\n")
+        return True
 
     def on_search_finished(self):
         """Обрабатывает завершение поиска"""
@@ -5345,10 +6505,6 @@ class SequenceManager:
         if hasattr(self.main_window, 'ui_manager'):
             self.main_window.ui_manager.update_progress(message)
 
-    def get_sequence_info(self, sequence_key):
-        """Возвращает информацию о последовательности по ключу"""
-        return self.sequences.get(sequence_key)
-
     def get_all_sequences(self):
         """Возвращает все последовательности"""
         return self.sequences
@@ -5442,7 +6598,6 @@ class ToolManager:
         if self.exiftool_check_completed:
             return True
             
-        import time
         start_time = time.time()
         while not self.exiftool_check_completed and time.time() - start_time < timeout:
             time.sleep(0.1)
@@ -5639,9 +6794,8 @@ class UIManager:
         metadata_source_label = QLabel("Метаданные выбранного элемента:")
         left_layout.addWidget(metadata_source_label)
         
-        metadata_table = QTableWidget()
-        metadata_table.setColumnCount(2)
-        metadata_table.setHorizontalHeaderLabels(["Поле", "Значение"])
+        metadata_table = QTableView()
+        metadata_table.setModel(MetadataModel(metadata_table))
         
         # Настройка размеров колонок
         for i, width in enumerate(DEFAULT_COLUMN_WIDTHS['metadata']):
@@ -5825,7 +6979,7 @@ class UIManager:
     def toggle_art_usage(self, state):
         """Включает/выключает использование ART для MXF файлов"""
         self.main_window.settings_manager.use_art_for_mxf = state == Qt.Checked
-        self.main_window.settings_manager.save_settings()
+        self.main_window.settings_manager.schedule_save()
         if state == Qt.Checked:
             self.debug_logger.log("Включено чтение MXF через ART")
         else:
@@ -5864,6 +7018,9 @@ class EXRMetadataViewer(QMainWindow):
         # Инициализация отладчика
         self.debug_logger = DebugLogger(DEBUG)
         
+        # Буфер обмена получаем один раз и используем во всех действиях копирования
+        self._clipboard = QApplication.clipboard()
+        
         # Инициализация менеджеров
         self.settings_manager = SettingsManager(self)
         self.tool_manager = ToolManager(self)
@@ -5874,6 +7031,20 @@ class EXRMetadataViewer(QMainWindow):
         
         self.detection_info_text = None
         self.sensor_camera_text = None
+        
+        # Диалоги выбора камеры и типа правила создаются при первом использовании
+        self._camera_picker_dialog = None
+        self._rule_type_picker_dialog = None
+        self._color_dialog = None
+        self._message_box = None
+        
+        # Контекстное меню таблицы метаданных строится один раз, при показе меняется только видимость пунктов
+        self._metadata_menu = None
+        self._metadata_menu_actions = None
+        
+        # Единственный toast виджет и очередь сообщений для него
+        self._toast = None
+        self._toast_queue = deque()
         # Инициализация UI
         self.setup_ui()
         
@@ -5928,15 +7099,22 @@ class EXRMetadataViewer(QMainWindow):
         # ИСПРАВЛЕНИЕ: Получаем folder_path через ui_manager
         folder = self.ui_manager.folder_path.text()
         if not folder or not os.path.exists(folder):
-            QMessageBox.warning(self, "Ошибка", "Укажите существующую папку")
+            self.show_message("Ошибка", "Укажите существующую папку")
             return
         
         # Очищаем дерево через TreeManager
         self.tree_manager.clear_tree()
         
+        # Новый поиск: записи кэша метаданных от прошлого сканирования больше не нужны
+        self.metadata_manager.cancel_prefetch()
+        self.metadata_manager.metadata_cache.clear()
+        
         # Инициализируем корневой элемент
         self.tree_manager.initialize_root(folder)
         
+        # Пока идет поиск, дерево не пересортировывается после каждой вставки
+        self.tree_manager.suspend_sorting()
+        
         # Очищаем поиск
         self.clear_search()
         self.clear_sequences_search()
@@ -5947,18 +7125,20 @@ class EXRMetadataViewer(QMainWindow):
         
         # Запускаем поиск через SequenceManager
         if not self.sequence_manager.start_search(folder):
-            QMessageBox.warning(self, "Ошибка", "Не удалось начать поиск")
+            self.show_message("Ошибка", "Не удалось начать поиск")
             return
 
     def stop_search(self):
         """Останавливает поиск последовательностей"""
         self.sequence_manager.stop_search()
+        self.tree_manager.resume_sorting()
         self.ui_manager.set_search_controls_state(False)
         self.ui_manager.set_continue_enabled(True)
         self.ui_manager.update_progress("Поиск приостановлен")
 
     def continue_search(self):
         """Продолжает приостановленный поиск"""
+        self.tree_manager.suspend_sorting()
         self.sequence_manager.continue_search()
         self.ui_manager.set_search_controls_state(True)
         self.ui_manager.set_continue_enabled(False)
@@ -5966,6 +7146,7 @@ class EXRMetadataViewer(QMainWindow):
 
     def on_search_finished(self):
         """Обрабатывает завершение поиска"""
+        self.tree_manager.resume_sorting()
         try:
             sequence_count = self.sequence_manager.get_sequence_count()
             folder_count = len(self.tree_manager.folder_items)
@@ -5979,6 +7160,11 @@ class EXRMetadataViewer(QMainWindow):
             # Очищаем поиск
             self.clear_sequences_search()
             
+            # Заголовки первых EXR последовательностей читаются заранее, пока пользователь смотрит дерево
+            first_files = [seq['files'][0] for seq in self.sequence_manager.get_all_sequences().values()
+                           if seq.get('extension', '').lower() == '.exr' and seq.get('files')]
+            self.metadata_manager.prefetch_exr_metadata(first_files[:METADATA_PREFETCH_COUNT])
+            
         except Exception as e:
             self.debug_logger.log(f"Ошибка при завершении поиска: {str(e)}", "ERROR")
             self.ui_manager.update_progress(f"Ошибка при завершении поиска: {str(e)}")
@@ -6014,7 +7200,8 @@ class EXRMetadataViewer(QMainWindow):
                     self.metadata_manager.display_metadata(current_file, extension)
         else:
             # Очищаем все поля при выборе папки
-            self.metadata_table.setRowCount(0)
+            self.metadata_manager.cancel_background_read()
+            self.metadata_table.model().clear()
             self.sequence_manager.set_current_sequence_files([])
             self.metadata_manager.current_metadata = {}
             self.metadata_manager.forced_metadata_tool = None
@@ -6048,13 +7235,13 @@ class EXRMetadataViewer(QMainWindow):
             expand_all_action = menu.addAction("Раскрыть все вложенные")
             collapse_all_action = menu.addAction("Свернуть все вложенные")
             
-            open_action.triggered.connect(lambda: self.open_in_explorer(item_data['path']))
-            expand_all_action.triggered.connect(lambda: self.tree_manager.expand_folder_recursive(item))
-            collapse_all_action.triggered.connect(lambda: self.tree_manager.collapse_folder_recursive(item))
+            open_action.triggered.connect(partial(self.open_in_explorer, item_data['path']))
+            expand_all_action.triggered.connect(partial(self.tree_manager.expand_folder_recursive, item))
+            collapse_all_action.triggered.connect(partial(self.tree_manager.collapse_folder_recursive, item))
         else:
             seq_info = item_data['info']
             open_action = menu.addAction("Открыть в проводнике")
-            open_action.triggered.connect(lambda: self.open_in_explorer(seq_info['path']))
+            open_action.triggered.connect(partial(self.open_in_explorer, seq_info['path']))
             
             menu.addSeparator()
             
@@ -6067,80 +7254,108 @@ class EXRMetadataViewer(QMainWindow):
                 exiftool_action = menu.addAction("Читать принудительно ExifTool")
                 
                 if self.tool_manager.exiftool_available:
-                    exiftool_action.triggered.connect(lambda: self.metadata_manager.force_read_metadata(file_path, extension, 'exiftool'))
+                    exiftool_action.triggered.connect(partial(self.metadata_manager.force_read_metadata, file_path, extension, 'exiftool'))
                 else:
                     exiftool_action.setEnabled(False)
                     exiftool_action.setToolTip(f"ExifTool недоступен. Проверка завершена: {self.tool_manager.exiftool_check_completed}")
                 
-                mediainfo_action.triggered.connect(lambda: self.metadata_manager.force_read_metadata(file_path, extension, 'mediainfo'))
-                ffprobe_action.triggered.connect(lambda: self.metadata_manager.force_read_metadata(file_path, extension, 'ffprobe'))
+                mediainfo_action.triggered.connect(partial(self.metadata_manager.force_read_metadata, file_path, extension, 'mediainfo'))
+                ffprobe_action.triggered.connect(partial(self.metadata_manager.force_read_metadata, file_path, extension, 'ffprobe'))
                 
                 menu.addSeparator()
             
             color_action = menu.addAction(f"Изменить цвет для '{seq_info['type']}'")
-            color_action.triggered.connect(lambda: self.change_sequence_color(seq_info['type']))
+            color_action.triggered.connect(partial(self.change_sequence_color, seq_info['type']))
         
         menu.exec_(self.sequences_tree.viewport().mapToGlobal(position))
 
+    def get_metadata_context_menu(self):
+        """Создает контекстное меню таблицы метаданных при первом вызове и возвращает его с пунктами"""
+        if self._metadata_menu is None:
+            menu = QMenu(self)
+            actions = {}
+            
+            actions['copy_selected_values'] = menu.addAction("Копировать выделенное: значения")
+            actions['copy_selected_both'] = menu.addAction("Копировать выделенное: поля и значения")
+            actions['selection_separator'] = menu.addSeparator()
+            
+            # Пункты для столбца имени поля
+            actions['copy_name'] = menu.addAction("Копировать имя поля")
+            actions['name_separator'] = menu.addSeparator()
+            actions['change_color'] = menu.addAction("Изменить цвет")
+            actions['remove_color'] = menu.addAction("Удалить из списка")
+            actions['add_color'] = menu.addAction("Задать цвет")
+            actions['color_separator'] = menu.addSeparator()
+            actions['set_camera'] = menu.addAction("Задать камеру для этого поля")
+            actions['set_resolution'] = menu.addAction("Задать разрешение для этого поля")
+            
+            # Пункты для столбца значения
+            actions['copy_value'] = menu.addAction("Копировать значение")
+            actions['copy_both'] = menu.addAction("Копировать имя и значение")
+            
+            self._metadata_menu = menu
+            self._metadata_menu_actions = actions
+        return self._metadata_menu, self._metadata_menu_actions
+
     def show_metadata_table_context_menu(self, position):
         """Показывает контекстное меню для таблицы метаданных"""
         index = self.metadata_table.indexAt(position)
         selected_rows = self.metadata_table.selectionModel().selectedRows()
         
-        menu = QMenu(self)
-        
-        if selected_rows:
-            copy_selected_values_action = menu.addAction("Копировать выделенное: значения")
-            copy_selected_both_action = menu.addAction("Копировать выделенное: поля и значения")
-            
-            copy_selected_values_action.triggered.connect(self.copy_selected_values)
-            copy_selected_both_action.triggered.connect(self.copy_selected_fields_and_values)
-            
-            menu.addSeparator()
+        menu, actions = self.get_metadata_context_menu()
         
+        field_name = field_value = None
+        column = -1
         if index.isValid():
+            metadata_model = self.metadata_table.model()
             row = index.row()
-            column = index.column()
-            
-            field_name_item = self.metadata_table.item(row, 0)
-            value_item = self.metadata_table.item(row, 1)
-            
-            if field_name_item and value_item:
-                field_name = field_name_item.text()
-                field_value = value_item.text()
-                
-                if column == 0:
-                    copy_name_action = menu.addAction("Копировать имя поля")
-                    copy_name_action.triggered.connect(lambda: self.copy_field_name(field_name))
-                    
-                    menu.addSeparator()
-                    
-                    if field_name in self.settings_manager.color_metadata and not self.settings_manager.color_metadata[field_name].get('removed', False):
-                        color_action = menu.addAction("Изменить цвет")
-                        remove_action = menu.addAction("Удалить из списка")
-                        
-                        color_action.triggered.connect(lambda: self.change_field_color(field_name))
-                        remove_action.triggered.connect(lambda: self.remove_field_from_colors(field_name))
-                    else:
-                        color_action = menu.addAction("Задать цвет")
-                        color_action.triggered.connect(lambda: self.add_field_with_color(field_name))
-                    
-                    menu.addSeparator()
-
-                    set_camera_action = menu.addAction("Задать камеру для этого поля")
-                    set_resolution_action = menu.addAction("Задать разрешение для этого поля")
-
-                    set_camera_action.triggered.connect(lambda: self.set_camera_rule(field_name, field_value))
-                    set_resolution_action.triggered.connect(lambda: self.set_resolution_rule(field_name, field_value))
-
-                elif column == 1:
-                    copy_value_action = menu.addAction("Копировать значение")
-                    copy_value_action.triggered.connect(lambda: self.copy_field_value(field_value))
-                    
-                    copy_both_action = menu.addAction("Копировать имя и значение")
-                    copy_both_action.triggered.connect(lambda: self.copy_field_name_and_value(field_name, field_value))
-        
-        menu.exec_(self.metadata_table.viewport().mapToGlobal(position))
+            if row < metadata_model.rowCount():
+                field_name = metadata_model.field_name(row)
+                field_value = metadata_model.field_value(row)
+                column = index.column()
+        
+        name_column = column == 0
+        value_column = column == 1
+        colored = False
+        if name_column:
+            color_data = self.settings_manager.color_metadata.get(field_name)
+            colored = color_data is not None and not color_data.get('removed', False)
+        
+        # Лишние разделители (в начале, в конце и подряд) QMenu скрывает сам
+        for key in ('copy_selected_values', 'copy_selected_both', 'selection_separator'):
+            actions[key].setVisible(bool(selected_rows))
+        for key in ('copy_name', 'name_separator', 'color_separator', 'set_camera', 'set_resolution'):
+            actions[key].setVisible(name_column)
+        actions['change_color'].setVisible(name_column and colored)
+        actions['remove_color'].setVisible(name_column and colored)
+        actions['add_color'].setVisible(name_column and not colored)
+        actions['copy_value'].setVisible(value_column)
+        actions['copy_both'].setVisible(value_column)
+        
+        action = menu.exec_(self.metadata_table.viewport().mapToGlobal(position))
+        
+        if action is None:
+            return
+        if action == actions['copy_selected_values']:
+            self.copy_selected_values()
+        elif action == actions['copy_selected_both']:
+            self.copy_selected_fields_and_values()
+        elif action == actions['copy_name']:
+            self.copy_field_name(field_name)
+        elif action == actions['change_color']:
+            self.change_field_color(field_name)
+        elif action == actions['remove_color']:
+            self.remove_field_from_colors(field_name)
+        elif action == actions['add_color']:
+            self.add_field_with_color(field_name)
+        elif action == actions['set_camera']:
+            self.set_camera_rule(field_name, field_value)
+        elif action == actions['set_resolution']:
+            self.set_resolution_rule(field_name, field_value)
+        elif action == actions['copy_value']:
+            self.copy_field_value(field_value)
+        elif action == actions['copy_both']:
+            self.copy_field_name_and_value(field_name, field_value)
 
     def filter_sequences(self):
         """Фильтрует дерево последовательностей"""
@@ -6149,8 +7364,7 @@ class EXRMetadataViewer(QMainWindow):
 
     def filter_metadata(self):
         """Фильтрует таблицу метаданных"""
-        search_text = self.search_input.text()
-        self.metadata_manager.filter_metadata(search_text)
+        self.metadata_manager.schedule_filter()
 
     def clear_search(self):
         """Очищает поиск по метаданным"""
@@ -6169,18 +7383,19 @@ class EXRMetadataViewer(QMainWindow):
             return
         
         self.settings_manager.default_metadata_tool = tool_key
-        self.settings_manager.save_settings()
+        self.settings_manager.schedule_save()
         self.debug_logger.log(f"Изменен инструмент метаданных на: {METADATA_TOOLS[tool_key]}")
 
+    @pyqtSlot()
     def open_settings(self):
         """Открывает диалог настроек цветов"""
         dialog = SettingsDialog(self)
         if dialog.exec_() == QDialog.Accepted:
             # Обновляем цвета через менеджеры
             if hasattr(self, 'tree_manager'):
-                self.tree_manager.update_sequences_colors()
+                self.tree_manager.schedule_colors_refresh()
             if hasattr(self, 'metadata_manager') and hasattr(self.metadata_manager, 'update_metadata_colors'):
-                self.metadata_manager.update_metadata_colors()
+                self.metadata_manager.schedule_color_refresh()
 
     def open_camera_editor(self):
         """Открывает редактор камер"""
@@ -6227,75 +7442,88 @@ class EXRMetadataViewer(QMainWindow):
             self.log_dialog.show()
         except Exception as e:
             print(f"Error creating log dialog: {e}")
-            QMessageBox.warning(self, "Ошибка", f"Не удалось открыть окно логов: {str(e)}")
+            self.show_message("Ошибка", f"Не удалось открыть окно логов: {str(e)}")
 
     # Методы работы с буфером обмена (оставлены в главном классе для простоты)
+    @pyqtSlot()
     def copy_selected_values(self):
         """Копирует значения выделенных строк в буфер обмена"""
         selected_indexes = self.metadata_table.selectionModel().selectedIndexes()
         if not selected_indexes:
             return
         
-        rows_values = {}
-        for index in selected_indexes:
-            if index.column() == 1:
-                value_item = self.metadata_table.item(index.row(), 1)
-                if value_item:
-                    rows_values[index.row()] = value_item.text()
-        
-        if rows_values:
-            values = [rows_values[row] for row in sorted(rows_values.keys())]
-            clipboard = QApplication.clipboard()
-            clipboard.setText("\n".join(values))
+        # Сначала сводим выделение к уникальным строкам, затем читаем по одному значению на строку
+        metadata_model = self.metadata_table.model()
+        rows = sorted({index.row() for index in selected_indexes if index.column() == 1})
+        values = [metadata_model.field_value(row) for row in rows]
+        
+        if values:
+            self._clipboard.setText("\n".join(values))
             self.show_toast(f"Скопировано {len(values)} значений")
 
+    @pyqtSlot()
     def copy_selected_fields_and_values(self):
         """Копирует поля и значения выделенных строк в буфер обмена"""
         selected_indexes = self.metadata_table.selectionModel().selectedIndexes()
         if not selected_indexes:
             return
         
-        rows_data = {}
-        for index in selected_indexes:
-            row = index.row()
-            if row not in rows_data:
-                field_item = self.metadata_table.item(row, 0)
-                value_item = self.metadata_table.item(row, 1)
-                if field_item and value_item:
-                    rows_data[row] = f"{field_item.text()}: {value_item.text()}"
-        
-        if rows_data:
-            fields_and_values = [rows_data[row] for row in sorted(rows_data.keys())]
-            clipboard = QApplication.clipboard()
-            clipboard.setText("\n".join(fields_and_values))
+        # Сначала сводим выделение к уникальным строкам, затем читаем данные каждой строки один раз
+        metadata_model = self.metadata_table.model()
+        rows = sorted({index.row() for index in selected_indexes})
+        fields_and_values = [f"{metadata_model.field_name(row)}: {metadata_model.field_value(row)}" for row in rows]
+        
+        if fields_and_values:
+            self._clipboard.setText("\n".join(fields_and_values))
             self.show_toast(f"Скопировано {len(fields_and_values)} полей и значений")
 
+    @pyqtSlot(str)
     def copy_field_name(self, field_name):
         """Копирует имя поля в буфер обмена"""
-        clipboard = QApplication.clipboard()
-        clipboard.setText(field_name)
+        self._clipboard.setText(field_name)
         self.show_toast("Имя поля скопировано")
 
+    @pyqtSlot(str)
     def copy_field_value(self, field_value):
         """Копирует значение поля в буфер обмена"""
-        clipboard = QApplication.clipboard()
-        clipboard.setText(field_value)
+        self._clipboard.setText(field_value)
         self.show_toast("Значение поля скопировано")
 
+    @pyqtSlot(str, str)
     def copy_field_name_and_value(self, field_name, field_value):
         """Копирует имя и значение поля в буфер обмена"""
-        clipboard = QApplication.clipboard()
-        clipboard.setText(f"{field_name}: {field_value}")
+        self._clipboard.setText(f"{field_name}: {field_value}")
         self.show_toast("Имя и значение поля скопированы")
 
+    def show_message(self, title, text, icon=QMessageBox.Warning):
+        """Показывает модальное сообщение через единственный переиспользуемый QMessageBox"""
+        if self._message_box is None:
+            self._message_box = QMessageBox(self)
+            self._message_box.setStandardButtons(QMessageBox.Ok)
+        self._message_box.setIcon(icon)
+        self._message_box.setWindowTitle(title)
+        self._message_box.setText(text)
+        self._message_box.exec_()
+
+    def pick_color(self, initial, title):
+        """Выбор цвета через единственный переиспользуемый QColorDialog (при отмене цвет невалиден)"""
+        if self._color_dialog is None:
+            self._color_dialog = QColorDialog(self)
+        self._color_dialog.setWindowTitle(title)
+        self._color_dialog.setCurrentColor(initial)
+        if self._color_dialog.exec_() == QDialog.Accepted:
+            return self._color_dialog.currentColor()
+        return QColor()
+
+    @pyqtSlot(str)
     def add_field_with_color(self, field_name):
         """Добавляет поле с выбранным цветом"""
-        color = QColorDialog.getColor(QColor(200, 200, 255), self, f"Выберите цвет для поля '{field_name}'")
+        color = self.pick_color(QColor(200, 200, 255), f"Выберите цвет для поля '{field_name}'")
         if color.isValid():
             self.settings_manager.add_field_with_color(field_name, color)
             # ЗАМЕНИТЬ display_metadata на update_metadata_colors
-            self.metadata_manager.update_metadata_colors()
-            QMessageBox.information(self, "Успех", f"Поле '{field_name}' добавлено с выбранным цветом")
+            self.metadata_manager.schedule_color_refresh()
+            self.show_toast(f"Поле '{field_name}' добавлено с выбранным цветом")
 
     def change_field_color(self, field_name):
         """Изменяет цвет поля"""
@@ -6303,50 +7531,51 @@ class EXRMetadataViewer(QMainWindow):
             current_color_data = self.settings_manager.color_metadata[field_name]
             current_color = QColor(current_color_data['r'], current_color_data['g'], current_color_data['b'])
             
-            color = QColorDialog.getColor(current_color, self, f"Выберите цвет для поля '{field_name}'")
+            color = self.pick_color(current_color, f"Выберите цвет для поля '{field_name}'")
             if color.isValid():
                 self.settings_manager.change_field_color(field_name, color)
-                # ЗАМЕНИТЬ display_metadata на update_metadata_colors
-                self.metadata_manager.update_metadata_colors()
+                # Меняется только цвет — перекрашиваем строку без перестройки таблицы
+                self.metadata_manager.recolor_field(field_name)
 
+    @pyqtSlot(str)
     def remove_field_from_colors(self, field_name):
         """Удаляет поле из цветных в корзину"""
         self.settings_manager.remove_field_from_colors(field_name)
         # ЗАМЕНИТЬ display_metadata на update_metadata_colors
-        self.metadata_manager.update_metadata_colors()
-        QMessageBox.information(self, "Успех", f"Поле '{field_name}' перемещено в корзину")
+        self.metadata_manager.schedule_color_refresh()
+        self.show_toast(f"Поле '{field_name}' перемещено в корзину")
 
     def change_sequence_color(self, seq_type):
         """Изменяет цвет типа последовательности"""
         current_color_data = self.settings_manager.sequence_colors.get(seq_type)
         current_color = QColor(200, 200, 255)
         
-        if current_color_data and isinstance(current_color_data, dict) and 'r' in current_color_data and 'g' in current_color_data and 'b' in current_color_data:
+        if current_color_data is not None:
             current_color = QColor(current_color_data['r'], current_color_data['g'], current_color_data['b'])
         
-        color = QColorDialog.getColor(current_color, self, f"Выберите цвет для типа '{seq_type}'")
+        color = self.pick_color(current_color, f"Выберите цвет для типа '{seq_type}'")
         if color.isValid():
             self.settings_manager.change_sequence_color(seq_type, color)
-            self.tree_manager.update_sequences_colors()
+            self.tree_manager.schedule_colors_refresh()
 
     def set_camera_rule(self, field, value):
         """Добавляет правило для камеры"""
         cameras = list(self.camera_manager.camera_data.get('cameras', {}).keys())
         if not cameras:
-            QMessageBox.warning(self, "Ошибка", 
-                            "Нет доступных камер. Сначала добавьте камеры в редакторе камер.")
+            self.show_message("Ошибка", 
+                          "Нет доступных камер. Сначала добавьте камеры в редакторе камер.")
             return
         
-        existing_rules = self.settings_manager.camera_detection_settings.get('camera_rules', [])
-        for rule in existing_rules:
-            if rule.get('field') == field and rule.get('value') == value:
-                QMessageBox.information(self, "Информация", "Такое правило уже существует")
-                return
+        if self.settings_manager.has_camera_rule(field, value):
+            self.show_toast("Такое правило уже существует")
+            return
         
-        camera, ok = QInputDialog.getItem(self, "Выбор камеры", "Выберите камеру:", cameras, 0, False)
+        if self._camera_picker_dialog is None:
+            self._camera_picker_dialog = ItemPickerDialog("Выбор камеры", "Выберите камеру:", self)
+        camera, ok = self._camera_picker_dialog.choose(cameras)
         if ok and camera:
             self.camera_manager.add_camera_rule(field, value, camera)
-            QMessageBox.information(self, "Успех", f"Правило добавлено: {field} = {value} → {camera}")
+            self.show_toast(f"Правило добавлено: {field} = {value} → {camera}")
             self.metadata_manager.display_metadata(
                 self.sequence_manager.current_sequence_files[0] if self.sequence_manager.current_sequence_files else "",
                 ""
@@ -6355,16 +7584,16 @@ class EXRMetadataViewer(QMainWindow):
     def set_resolution_rule(self, field, value):
         """Добавляет правило для разрешения"""
         rule_types = ["range", "single_w", "single_h", "combined"]
-        rule_type, ok = QInputDialog.getItem(self, "Тип правила", "Выберите тип правила:", rule_types, 0, False)
+        if self._rule_type_picker_dialog is None:
+            self._rule_type_picker_dialog = ItemPickerDialog("Тип правила", "Выберите тип правила:", self)
+        rule_type, ok = self._rule_type_picker_dialog.choose(rule_types)
         if ok and rule_type:
-            existing_rules = self.settings_manager.camera_detection_settings.get('resolution_rules', [])
-            for rule in existing_rules:
-                if rule.get('field') == field and rule.get('type') == rule_type:
-                    QMessageBox.information(self, "Информация", "Такое правило уже существует")
-                    return
+            if self.settings_manager.has_resolution_rule(field, rule_type):
+                self.show_toast("Такое правило уже существует")
+                return
             
             self.camera_manager.add_resolution_rule(field, rule_type)
-            QMessageBox.information(self, "Успех", "Правило для разрешения добавлено")
+            self.show_toast("Правило для разрешения добавлено")
             self.metadata_manager.display_metadata(
                 self.sequence_manager.current_sequence_files[0] if self.sequence_manager.current_sequence_files else "",
                 ""
@@ -6381,21 +7610,47 @@ class EXRMetadataViewer(QMainWindow):
                 else:
                     subprocess.Popen(["xdg-open", path])
             except Exception as e:
-                QMessageBox.warning(self, "Ошибка", f"Не удалось открыть папку: {str(e)}")
+                self.show_message("Ошибка", f"Не удалось открыть папку: {str(e)}")
         else:
-            QMessageBox.warning(self, "Ошибка", f"Папка не существует: {path}")
+            self.show_message("Ошибка", f"Папка не существует: {path}")
 
     def show_toast(self, message, duration=2000, opacity=0.5):
-        """Показывает toast сообщение"""
-        toast = ToastMessage(message, self, duration, opacity)
-        toast.show_toast()
+        """Ставит toast сообщение в очередь показа"""
+        # Повтор того же сообщения подряд не показываем
+        if self._toast_queue:
+            if self._toast_queue[-1][0] == message:
+                return
+        elif self._toast is not None and self._toast.isVisible() and self._toast.text() == message:
+            if self._toast.is_hiding():
+                # Исчезающее сообщение показываем заново: иначе анимация скроет его и повтор пропадет
+                self._toast.animation.stop()
+                self._toast.show_toast()
+            else:
+                self._toast.timer.start(self._toast.duration)
+            return
+        
+        self._toast_queue.append((message, duration, opacity))
+        if self._toast is None or not self._toast.isVisible():
+            self.show_next_toast()
+
+    def show_next_toast(self):
+        """Показывает следующее сообщение из очереди в единственном toast виджете"""
+        if not self._toast_queue:
+            return
+        message, duration, opacity = self._toast_queue.popleft()
+        if self._toast is None:
+            self._toast = ToastMessage(message, self, duration, opacity)
+            self._toast.closed.connect(self.show_next_toast)
+        else:
+            self._toast.set_message(message, duration, opacity)
+        self._toast.show_toast()
 
 
     def analyze_resolutions(self):
         """Анализирует разрешения всех найденных последовательностей (асинхронно)"""
         sequences = self.sequence_manager.get_all_sequences()
         if not sequences:
-            QMessageBox.information(self, "Информация", "Нет последовательностей для анализа.")
+            self.show_toast("Нет последовательностей для анализа.")
             return
 
         # Фильтруем только настоящие последовательности (не одиночные видео и не группы)
@@ -6405,7 +7660,7 @@ class EXRMetadataViewer(QMainWindow):
                 filtered_seqs.append(seq)
 
         if not filtered_seqs:
-            QMessageBox.information(self, "Информация", "Нет подходящих последовательностей (с несколькими кадрами).")
+            self.show_toast("Нет подходящих последовательностей (с несколькими кадрами).")
             return
 
         # Создаём диалог